@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares scanning pure ASCII documents with the unicode-aware rules
+    and with their re.ASCII variant, which AddressParser picks for ASCII
+    documents.
+
+    Usage: python benchmarks/bench_ascii.py [--documents N] [--size N]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import parser  # noqa: E402
+from corpus import make_documents, timed  # noqa: E402
+
+
+def scan(rules, texts):
+    return [[(m.span(), m.groupdict()) for m in rules.finditer(text)]
+            for text in texts]
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--documents', type=int, default=100)
+    argp.add_argument('--size', type=int, default=2000)
+    args = argp.parse_args()
+
+    for country in ('US', 'CA', 'GB'):
+        ap = parser.AddressParser(country=country)
+        texts = [ap.normalize(text.replace(u'\xe9', 'e')) for text in
+                 make_documents(args.documents, args.size, country)]
+        unicode_time, unicode_result = timed(
+            scan, ap._compiled_rules, texts)
+        ascii_time, ascii_result = timed(
+            scan, parser.load_ascii_rules(country), texts)
+        assert unicode_result == ascii_result
+        print('{0}: re.UNICODE {1:7.3f}s  re.ASCII {2:7.3f}s  '
+              '({3:.2f}x)'.format(country, unicode_time, ascii_time,
+                                  unicode_time / ascii_time))
+
+
+if __name__ == '__main__':
+    main()
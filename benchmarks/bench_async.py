@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Measures event loop responsiveness while concurrent requests parse
+    large bodies, calling pyap.parse directly from coroutines versus
+    awaiting an AsyncAddressParser.
+
+    A heartbeat coroutine ticks every millisecond; the report shows how
+    late its ticks were (loop lag) and the request latency percentiles.
+
+    Usage: python benchmarks/bench_async.py [--requests N] [--size N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pyap  # noqa: E402
+from pyap import aio  # noqa: E402
+from corpus import make_documents  # noqa: E402
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def heartbeat(lags, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def run(docs, handler, concurrency):
+    lags = []
+    latencies = []
+    stop = asyncio.Event()
+    beat = asyncio.ensure_future(heartbeat(lags, stop))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(doc):
+        async with semaphore:
+            start = time.perf_counter()
+            await handler(doc)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*[request(doc) for doc in docs])
+    stop.set()
+    await beat
+    return lags, latencies
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--requests', type=int, default=200)
+    argp.add_argument('--size', type=int, default=20000)
+    argp.add_argument('--concurrency', type=int, default=32)
+    args = argp.parse_args()
+
+    docs = make_documents(args.requests, args.size)
+
+    async def blocking(doc):
+        return pyap.parse(doc, country='US')
+
+    async_parser = aio.AsyncAddressParser(
+        country='US', max_concurrency=os.cpu_count() or 4)
+
+    for name, handler in (('blocking parse', blocking),
+                          ('AsyncAddressParser', async_parser.parse)):
+        lags, latencies = asyncio.run(run(docs, handler, args.concurrency))
+        print('{0:20s} loop lag p50 {1:7.2f}ms max {2:7.2f}ms | '
+              'latency p50 {3:7.1f}ms p99 {4:7.1f}ms'.format(
+                  name,
+                  percentile(lags, 0.5) * 1e3, max(lags) * 1e3,
+                  percentile(latencies, 0.5) * 1e3,
+                  percentile(latencies, 0.99) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
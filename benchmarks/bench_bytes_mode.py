@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares reading, decoding and parsing a large file with scanning the
+    memory-mapped file in bytes mode. Each variant runs in a fresh process
+    so that its peak memory can be reported.
+
+    Usage: python benchmarks/bench_bytes_mode.py [--mb N] [--path FILE]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import parser  # noqa: E402
+from pyap import bytesmode  # noqa: E402
+from corpus import make_documents  # noqa: E402
+
+
+def read_decode_parse(path):
+    with open(path, encoding='utf-8') as f:
+        return len(parser.AddressParser(country='US').parse(f.read()))
+
+
+def bytes_mode(path):
+    return len(bytesmode.BytesAddressParser(country='US').parse_file(path))
+
+
+def _measure(func, path, results):
+    start = time.perf_counter()
+    found = func(path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    results.put((found, elapsed, peak))
+
+
+def measure(func, path):
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measure,
+                                      args=(func, path, results))
+    process.start()
+    found = results.get()
+    process.join()
+    return found
+
+
+def write_corpus(path, mb):
+    block = ''.join(make_documents(100, 10000)).encode('utf-8')
+    with open(path, 'wb') as f:
+        for _ in range(int(mb * 1e6 / len(block)) + 1):
+            f.write(block)
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--mb', type=float, default=20)
+    argp.add_argument('--path', default=None,
+                      help='existing file to parse instead of a '
+                           'generated one')
+    args = argp.parse_args()
+
+    path = args.path
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        write_corpus(path, args.mb)
+    try:
+        mb = os.path.getsize(path) / 1e6
+        print('{0:.1f} MB'.format(mb))
+        for name, func in (('read-decode-parse', read_decode_parse),
+                           ('mmap bytes mode', bytes_mode)):
+            found, elapsed, peak = measure(func, path)
+            print('{0:18s} {1:8.2f}s {2:7.1f} MB/s  peak RSS {3:8.1f} MB  '
+                  '{4} addresses'.format(name, elapsed, mb / elapsed,
+                                         peak, found))
+    finally:
+        if args.path is None:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Measures canonical keys and AddressIndex on a stream of parsed
+    addresses in which every address comes back with other spellings
+    ("Street"/"St.", "Texas"/"TX", case and spacing). Reports the
+    throughput, the distinct keys found next to naive dedup on
+    full_address, and the memory taken by the index.
+
+    Usage: python benchmarks/bench_canonical.py [--entries N] [--distinct N]
+"""
+
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pyap  # noqa: E402
+from pyap import canonical  # noqa: E402
+
+SPELLINGS = {
+    'US': [
+        "{0} E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062",
+        "{0} East John Carpenter Fwy, Ste 1500 irving, TX 75062",
+        "{0} Wall Street, New York, NY 10005",
+        "{0} wall st., new york, New York 10005",
+    ],
+    'CA': [
+        "{0} McPherson Crt. Unit 35, Pickering, ON L1W 3E6",
+        "{0} McPherson Court Unit 35, Pickering, Ontario L1W3E6",
+    ],
+    'GB': [
+        "{0} London Bridge St, London SE1 9SG",
+        "{0} London Bridge St, LONDON se1 9sg",
+    ],
+}
+
+
+def base_fields():
+    '''Field dicts of every spelling, parsed once'''
+    fields = []
+    for country, spellings in sorted(SPELLINGS.items()):
+        for spelling in spellings:
+            address = pyap.parse(spelling.format(1), country=country)[0]
+            fields.append(address.as_dict())
+    return fields
+
+
+def entries(count, distinct, seed=0):
+    '''Yields field dicts of count addresses drawn from distinct
+    street numbers for every base address
+    '''
+    rnd = random.Random(seed)
+    bases = base_fields()
+    numbers = max(1, distinct // len(bases))
+    for _ in range(count):
+        fields = dict(rnd.choice(bases))
+        number = str(rnd.randrange(1, numbers + 1))
+        fields['street_number'] = number
+        fields['full_address'] = number + fields['full_address'][1:]
+        yield fields
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--entries', type=int, default=10000000)
+    argp.add_argument('--distinct', type=int, default=1000000)
+    args = argp.parse_args()
+
+    start = time.perf_counter()
+    generated = sum(1 for _ in entries(args.entries, args.distinct))
+    generate_time = time.perf_counter() - start
+
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    index = canonical.AddressIndex()
+    naive = set()
+    start = time.perf_counter()
+    for fields in entries(args.entries, args.distinct):
+        index.add(fields)
+    index_time = time.perf_counter() - start - generate_time
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for fields in entries(args.entries, args.distinct):
+        naive.add(fields['full_address'])
+
+    stats = index.stats()
+    print('{0} entries, {1} canonical keys, {2} distinct full_address '
+          'strings'.format(generated, stats['keys'], len(naive)))
+    print('key + index: {0:7.2f}s  ({1:.2f}M entries/s)'.format(
+        index_time, generated / index_time / 1e6))
+    print('index arrays: {0:.1f} MB, peak RSS growth: {1:.1f} MB'.format(
+        stats['array_bytes'] / 1048576.0, (after - before) / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
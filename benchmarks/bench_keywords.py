@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares the US rules with street types and states written as
+    keyword tries (pyap.source_US.data.keyword_list_to_regex) against
+    the same rules with plain alternations of every keyword.
+
+    Usage: python benchmarks/bench_keywords.py [--documents N] [--size N]
+"""
+
+import argparse
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import utils  # noqa: E402
+from pyap.source_US import data  # noqa: E402
+from corpus import make_documents, timed  # noqa: E402
+
+
+def alternation(keywords, ignore_case=True):
+    return '|'.join(
+        ''.join('[{0}{1}]'.format(c.upper(), c.lower()) if ignore_case and
+                c.isalpha() else re.escape(c) for c in keyword)
+        for keyword in keywords)
+
+
+def alternation_rules():
+    full_address = data.full_address
+    for keywords, ignore_case in ((data.street_type_list, True),
+                                  (data.state_names, False),
+                                  (data.state_names.values(), True)):
+        trie = data.keyword_list_to_regex(keywords, ignore_case)
+        assert trie in full_address
+        full_address = full_address.replace(
+            trie, '(?:' + alternation(keywords, ignore_case) + ')')
+    return re.compile(full_address, utils.DEFAULT_FLAGS)
+
+
+def scan(rules, texts):
+    return [[(m.span(), m.groupdict()) for m in rules.finditer(text)]
+            for text in texts]
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--documents', type=int, default=100)
+    argp.add_argument('--size', type=int, default=2000)
+    args = argp.parse_args()
+
+    texts = make_documents(args.documents, args.size, 'US')
+    trie_rules = re.compile(data.full_address, utils.DEFAULT_FLAGS)
+    alternation_time, alternation_result = timed(
+        scan, alternation_rules(), texts)
+    trie_time, trie_result = timed(scan, trie_rules, texts)
+    assert alternation_result == trie_result
+    print('US: alternation {0:7.3f}s  trie {1:7.3f}s  ({2:.2f}x)'.format(
+        alternation_time, trie_time, alternation_time / trie_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares scanning one large document in a single pass with
+    AddressParser.parse(text, workers=N).
+
+    Usage: python benchmarks/bench_large_document.py [--mb N] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import parser  # noqa: E402
+from corpus import make_documents  # noqa: E402
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--mb', type=float, default=5)
+    argp.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    args = argp.parse_args()
+
+    text = ''.join(make_documents(int(args.mb * 100), 10000))
+    ap = parser.AddressParser(country='US')
+
+    start = time.perf_counter()
+    serial = ap.parse(text)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = ap.parse(text, workers=args.workers)
+    parallel_time = time.perf_counter() - start
+
+    assert [a.as_dict() for a in serial] == [a.as_dict() for a in parallel]
+    mb = len(text) / 1e6
+    print('{0:.1f} MB, {1} addresses'.format(mb, len(serial)))
+    print('single pass:     {0:8.3f}s  {1:6.1f} MB/s'.format(
+        serial_time, mb / serial_time))
+    print('{0:2d} workers:      {1:8.3f}s  {2:6.1f} MB/s'.format(
+        args.workers, parallel_time, mb / parallel_time))
+
+
+if __name__ == '__main__':
+    main()
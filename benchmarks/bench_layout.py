@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares scanning letter-like documents as a whole with the
+    layout-aware mode, which scans paragraphs and address blocks one by
+    one.
+
+    Usage: python benchmarks/bench_layout.py [--documents N]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import parser  # noqa: E402
+from corpus import ADDRESSES, FILLER, timed  # noqa: E402
+
+
+def make_letters(count, seed=0):
+    '''Letters with a header, paragraphs of running text
+    and address blocks of a few short lines
+    '''
+    rnd = random.Random(seed)
+    letters = []
+    for number in range(count):
+        parts = ['ACME Corp\nInvoice {0}\nPage 1 of 2'.format(number)]
+        for _ in range(rnd.randint(3, 8)):
+            if rnd.random() < 0.3:
+                parts.append('Ship to:\nJohn Smith\n' +
+                             rnd.choice(ADDRESSES['US']).replace(', ', '\n'))
+            else:
+                words = (FILLER * 3).split()
+                lines = [' '.join(words[i:i + 11])
+                         for i in range(0, len(words), 11)]
+                parts.append('\n'.join(lines))
+        letters.append('\n\n'.join(parts))
+    return letters
+
+
+def parse_all(ap, texts):
+    return [ap.parse(text) for text in texts]
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--documents', type=int, default=500)
+    args = argp.parse_args()
+
+    letters = make_letters(args.documents)
+    plain = parser.AddressParser(country='US')
+    layout = parser.AddressParser(country='US', layout=True)
+    plain_time, plain_found = timed(parse_all, plain, letters)
+    layout_time, layout_found = timed(parse_all, layout, letters)
+    print('{0} letters'.format(len(letters)))
+    print('whole text:   {0:7.3f}s  {1} addresses'.format(
+        plain_time, sum(map(len, plain_found))))
+    print('layout=True:  {0:7.3f}s  {1} addresses'.format(
+        layout_time, sum(map(len, layout_found))))
+
+
+if __name__ == '__main__':
+    main()
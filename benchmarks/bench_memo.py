@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Measures building addresses for matches with and without an
+    AddressMemo, on documents repeating a few addresses many times.
+    Only the extraction step is timed; scanning is the same for both.
+
+    Usage: python benchmarks/bench_memo.py [--documents N]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import cache, parser  # noqa: E402
+from corpus import make_documents, timed  # noqa: E402
+
+
+def build_all(ap, matches):
+    return [ap._match_address(match, match.start(), match.end())
+            for match in matches]
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--documents', type=int, default=200)
+    args = argp.parse_args()
+
+    plain = parser.AddressParser(country='US')
+    matches = [match for text in make_documents(args.documents)
+               for match in plain._compiled_rules.finditer(
+                   plain.normalize(text))]
+    memo = cache.AddressMemo()
+    memoized = parser.AddressParser(country='US', memo=memo)
+
+    plain_time, expected = timed(build_all, plain, matches)
+    memo_time, found = timed(build_all, memoized, matches)
+    assert [a.as_dict() for a in found] == [a.as_dict() for a in expected]
+    print('{0} matches, {1} distinct'.format(len(matches), len(memo)))
+    print('extract fields: {0:7.4f}s'.format(plain_time))
+    print('with memo:      {0:7.4f}s  ({1:.1f}x, {2} hits)'.format(
+        memo_time, plain_time / memo_time, memo.hits))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares serial parsing with the thread-pool backend of parse_many.
+
+    On a regular CPython build the GIL serializes the regex work, so the
+    thread pool mostly measures overhead. On a free-threaded build
+    (python3.13t and later) the workers scan in parallel.
+
+    Usage: python benchmarks/bench_parse_many.py [--docs N] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import sysconfig
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pyap  # noqa: E402
+from corpus import make_documents, timed  # noqa: E402
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--docs', type=int, default=2000)
+    argp.add_argument('--size', type=int, default=4000)
+    argp.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    args = argp.parse_args()
+
+    docs = make_documents(args.docs, args.size)
+    free_threaded = bool(sysconfig.get_config_var('Py_GIL_DISABLED'))
+    print('free-threaded build: {0}'.format(free_threaded))
+
+    ap = pyap.parser.AddressParser(country='US')
+    serial, expected = timed(ap.parse_many, docs)
+    threaded, result = timed(ap.parse_many, docs, workers=args.workers)
+    assert [list(map(str, r)) for r in result] == \
+        [list(map(str, r)) for r in expected]
+
+    mb = sum(map(len, docs)) / 1e6
+    print('serial:            {0:8.3f}s  {1:6.1f} MB/s'.format(
+        serial, mb / serial))
+    print('threads (x{0:<3d}):    {1:8.3f}s  {2:6.1f} MB/s'.format(
+        args.workers, threaded, mb / threaded))
+
+
+if __name__ == '__main__':
+    main()
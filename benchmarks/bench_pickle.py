@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Measures how large a pickled AddressParser is and how long it takes
+    to dispatch a parse task bound to it to a process pool, compared with
+    pickling the parser's full instance dict (rules included).
+
+    Usage: python benchmarks/bench_pickle.py [--tasks N]
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import parser  # noqa: E402
+
+
+class FullStateParser(parser.AddressParser):
+    '''Parser which pickles its whole instance dict'''
+
+    def __getstate__(self):
+        return self.__dict__
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+def _noop(ap):
+    return ap.country
+
+
+def dispatch(ap, tasks, workers):
+    with ProcessPoolExecutor(workers) as executor:
+        executor.submit(_noop, ap).result()
+        start = time.perf_counter()
+        for future in [executor.submit(_noop, ap) for _ in range(tasks)]:
+            future.result()
+        return (time.perf_counter() - start) / tasks
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--tasks', type=int, default=2000)
+    argp.add_argument('--workers', type=int, default=2)
+    args = argp.parse_args()
+
+    for name, cls in (('full instance dict', FullStateParser),
+                      ('configuration only', parser.AddressParser)):
+        ap = cls(country='US')
+        size = len(pickle.dumps(ap))
+        seconds = dispatch(ap, args.tasks, args.workers)
+        print('{0:20s} {1:7d} bytes  {2:8.1f} us/task'.format(
+            name, size, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
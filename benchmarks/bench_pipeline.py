@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Runs the staged parsing pipeline over a synthetic corpus with a slow
+    sink and prints per-stage throughput.
+
+    Usage: python benchmarks/bench_pipeline.py [--docs N] [--backend B]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import parser  # noqa: E402
+from pyap.pipeline import Pipeline, parser_stages  # noqa: E402
+from corpus import make_documents  # noqa: E402
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--docs', type=int, default=500)
+    argp.add_argument('--backend', default='thread')
+    argp.add_argument('--maxsize', type=int, default=16)
+    argp.add_argument('--sink-delay', type=float, default=0.0005)
+    args = argp.parse_args()
+
+    docs = make_documents(args.docs, 4000)
+
+    def sink(key, addresses):
+        time.sleep(args.sink_delay)
+
+    pipeline = Pipeline(parser_stages(parser.AddressParser(country='US')),
+                        maxsize=args.maxsize, backend=args.backend)
+    for stage in pipeline.run(docs, sink):
+        print('{stage:10s} {items:6d} items {items_per_second:10.1f}/s '
+              'utilization {utilization:5.0%}'.format(**stage))
+
+
+if __name__ == '__main__':
+    main()
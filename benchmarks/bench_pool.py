@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares a warm ParserPool reused across batches with starting
+    a fresh process pool for every batch.
+
+    Usage: python benchmarks/bench_pool.py [--batches N] [--batch-size N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pyap  # noqa: E402
+from pyap.pool import ParserPool  # noqa: E402
+from corpus import make_documents  # noqa: E402
+
+
+def _parse(text):
+    return pyap.parse(text, country='US')
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--batches', type=int, default=20)
+    argp.add_argument('--batch-size', type=int, default=20)
+    argp.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    args = argp.parse_args()
+
+    batches = [make_documents(args.batch_size, 1000, seed=i)
+               for i in range(args.batches)]
+
+    start = time.perf_counter()
+    for batch in batches:
+        with ProcessPoolExecutor(args.workers) as executor:
+            list(executor.map(_parse, batch))
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ParserPool(countries=['US'], workers=args.workers) as pool:
+        started = time.perf_counter() - start
+        for batch in batches:
+            list(pool.map(batch))
+    warm = time.perf_counter() - start
+
+    print('pool per batch:   {0:8.3f}s'.format(cold))
+    print('warm ParserPool:  {0:8.3f}s (start-up {1:.3f}s)'.format(
+        warm, started))
+    for pid, seconds in sorted(pool.warmup_times.items()):
+        print('  worker {0}: warm-up {1:.4f}s'.format(pid, seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Measures what postal_check=True costs and what it buys on US
+    documents mixing real addresses with invoice lines which the loose
+    street and city patterns take for addresses. Invoice lines carry
+    random ZIP codes, so a few of them agree with their state by chance.
+
+    Usage: python benchmarks/bench_postal_check.py [--documents N]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import parser  # noqa: E402
+from corpus import ADDRESSES, FILLER, timed  # noqa: E402
+
+INVOICE = [
+    "Order {0} Blue Widget Way Paid, {1} {2:05d}\n",
+    "Ref {0} Main St Springfield, {1} {2:05d}\n",
+]
+STATES = ['CA', 'NY', 'TX', 'IL', 'FL', 'WA', 'Ohio', 'Georgia']
+
+
+def make_documents(count, seed=0):
+    rnd = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        parts = []
+        for _ in range(20):
+            roll = rnd.random()
+            if roll < 0.15:
+                parts.append(rnd.choice(ADDRESSES['US']) + '\n')
+            elif roll < 0.3:
+                parts.append(rnd.choice(INVOICE).format(
+                    rnd.randrange(10, 9999), rnd.choice(STATES),
+                    rnd.randrange(1000, 99999)))
+            else:
+                parts.append(FILLER)
+        documents.append(''.join(parts))
+    return documents
+
+
+def parse_all(ap, documents):
+    return [found for text in documents for found in ap.parse(text)]
+
+
+def precision(found):
+    real = set(ADDRESSES['US'])
+    hits = sum(1 for address in found if address.full_address in real)
+    return hits, hits / float(len(found)) if found else 1.0
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--documents', type=int, default=500)
+    args = argp.parse_args()
+
+    documents = make_documents(args.documents)
+    loose = parser.AddressParser(country='US')
+    checked = parser.AddressParser(country='US', postal_check=True)
+    loose_time, loose_found = timed(parse_all, loose, documents)
+    checked_time, checked_found = timed(parse_all, checked, documents)
+
+    loose_hits, loose_precision = precision(loose_found)
+    checked_hits, checked_precision = precision(checked_found)
+    check = checked.postal_check
+    fields = [address.as_dict() for address in loose_found]
+    check_time, _ = timed(lambda: [check(item) for item in fields])
+    per_match = check_time / len(fields) * 1e6
+
+    print('{0} matches without the check, {1} with it'.format(
+        len(loose_found), len(checked_found)))
+    print('precision: {0:.3f} -> {1:.3f} (recall kept: {2}/{3})'.format(
+        loose_precision, checked_precision, checked_hits, loose_hits))
+    print('parse: {0:.3f}s -> {1:.3f}s; check alone {2:.2f}us per match'
+          .format(loose_time, checked_time, per_match))
+    print('precision gained per microsecond per match: {0:.3f}'.format(
+        (checked_precision - loose_precision) / per_match))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Measures the postal code extractors against full address parsing
+    followed by reading postal_code, for every country.
+
+    Usage: python benchmarks/bench_postcodes.py [--documents N]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import parser, postcodes  # noqa: E402
+from corpus import make_documents, timed  # noqa: E402
+
+
+def full_parsing(ap, documents):
+    return [address.postal_code for text in documents
+            for address in ap.parse(text) if address.postal_code]
+
+
+def extraction(extractor, documents):
+    return [code for text in documents
+            for _, _, code in extractor.finditer(text)]
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--documents', type=int, default=200)
+    args = argp.parse_args()
+
+    for country in ('US', 'CA', 'GB'):
+        documents = make_documents(args.documents, country=country)
+        size = sum(len(text) for text in documents) / 1e6
+        parse_time, parsed = timed(
+            full_parsing, parser.AddressParser(country=country), documents)
+        extract_time, extracted = timed(
+            extraction, postcodes.PostalCodeExtractor(country), documents)
+        print('{0}: full parsing {1:6.3f}s ({2:5.1f} MB/s, {3} codes); '
+              'extractor {4:6.3f}s ({5:6.1f} MB/s, {6} codes), {7:.0f}x'
+              .format(country, parse_time, size / parse_time, len(parsed),
+                      extract_time, size / extract_time, len(extracted),
+                      parse_time / extract_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares calling pyap.parse once per record with RecordParser, which
+    normalizes and scans records in batches, and with its anchored mode
+    on records holding only addresses.
+
+    Usage: python benchmarks/bench_records.py [--records N] [--batch-size N]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pyap  # noqa: E402
+from pyap import records  # noqa: E402
+from corpus import ADDRESSES, FILLER, timed  # noqa: E402
+
+
+def make_records(count, address_share, seed=0):
+    rnd = random.Random(seed)
+    return [(i, rnd.choice(ADDRESSES['US']) if rnd.random() < address_share
+             else FILLER[:rnd.randint(10, len(FILLER))])
+            for i in range(count)]
+
+
+def per_record(items):
+    return [(record_id, pyap.parse(text, country='US'))
+            for record_id, text in items]
+
+
+def batched(items, batch_size, anchored=False):
+    rp = records.RecordParser(country='US', batch_size=batch_size,
+                              anchored=anchored)
+    return list(rp.parse(items))
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--records', type=int, default=20000)
+    argp.add_argument('--batch-size', type=int, default=1000)
+    args = argp.parse_args()
+
+    for name, share in (('mixed records', 0.3), ('address-only', 1.0)):
+        items = make_records(args.records, share)
+        base_time, expected = timed(per_record, items)
+        batch_time, result = timed(batched, items, args.batch_size)
+        assert [len(found) for _, found in result] == \
+            [len(found) for _, found in expected]
+        print('{0}: {1} records'.format(name, len(items)))
+        print('  pyap.parse per record {0:7.3f}s  {1:9.0f} records/s'.format(
+            base_time, len(items) / base_time))
+        print('  RecordParser          {0:7.3f}s  {1:9.0f} records/s'.format(
+            batch_time, len(items) / batch_time))
+        if share == 1.0:
+            anchored_time, _ = timed(batched, items, args.batch_size, True)
+            print('  anchored              {0:7.3f}s  {1:9.0f} records/s'.
+                  format(anchored_time, len(items) / anchored_time))
+
+
+if __name__ == '__main__':
+    main()
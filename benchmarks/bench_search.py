@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Measures SearchIndex queries on a memory-mapped index of synthetic
+    extraction results, next to scanning the results for every query.
+
+    Usage: python benchmarks/bench_search.py [--documents N] [--queries N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap import search  # noqa: E402
+
+STREETS = ['Wall Street', 'Grant Ave', 'John Carpenter Freeway',
+           'Main St', 'Oak Drive', 'Maple Rd', 'Park Avenue', 'Elm Ct']
+CITIES = [('New York', 'NY'), ('Irving', 'Texas'), ('San Francisco', 'CA'),
+          ('Santa Monica', 'California'), ('Chicago', 'IL')]
+
+
+def results(documents, per_document=3, seed=0):
+    '''Yields (document, fields) of synthetic US extraction results'''
+    rnd = random.Random(seed)
+    for number in range(documents):
+        document = 'doc-{0:08d}.txt'.format(number)
+        for _ in range(per_document):
+            name, street_type = rnd.choice(STREETS).rsplit(' ', 1)
+            city, region = rnd.choice(CITIES)
+            yield document, {
+                'street_name': '{0} {1}'.format(rnd.randrange(1, 200), name),
+                'street_type': street_type, 'city': city, 'region1': region,
+                'postal_code': '{0:05d}'.format(rnd.randrange(10000, 99999)),
+                'country_id': 'US'}
+
+
+def timed_queries(func, queries):
+    start = time.perf_counter()
+    found = sum(len(func(query)) for query in queries)
+    return time.perf_counter() - start, found
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--documents', type=int, default=200000)
+    argp.add_argument('--queries', type=int, default=2000)
+    args = argp.parse_args()
+
+    start = time.perf_counter()
+    builder = search.SearchIndexBuilder()
+    for document, fields in results(args.documents):
+        builder.add(document, fields)
+    path = os.path.join(tempfile.mkdtemp(), 'bench.idx')
+    builder.save(path)
+    build_time = time.perf_counter() - start
+    print('{0} documents, {1:.1f} MB index, built in {2:.2f}s'.format(
+        args.documents, os.path.getsize(path) / 1048576.0, build_time))
+
+    rnd = random.Random(1)
+    codes = ['{0:05d}'.format(rnd.randrange(10000, 99999))
+             for _ in range(args.queries)]
+    prefixes = [code[:3] for code in codes]
+    streets = ['{0} {1}'.format(rnd.randrange(1, 200), rnd.choice(STREETS))
+               for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = search.SearchIndex.open(path)
+    print('open:          {0:8.4f}s'.format(time.perf_counter() - start))
+    for name, func, queries in (
+            ('postal code', lambda q: index.search(postal_code=q), codes),
+            ('prefix', lambda q: index.search(postal_code=q, prefix=True),
+             prefixes),
+            ('street', lambda q: index.search(street=q), streets)):
+        seconds, found = timed_queries(func, queries)
+        print('{0:14} {1:8.4f}s  ({2:.0f} queries/s, {3} documents)'.format(
+            name + ':', seconds, len(queries) / seconds, found))
+    index.close()
+
+    # without an index every query scans all the results
+    scanned = list(results(args.documents))
+    few = codes[:20]
+    seconds, found = timed_queries(
+        lambda q: set(document for document, fields in scanned
+                      if fields['postal_code'] == q), few)
+    print('scan:          {0:8.4f}s  ({1:.0f} queries/s)'.format(
+        seconds, len(few) / seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Compares handing a batch to ParserPool workers through shared memory
+    (parse_shared) with pickling every text into the pool (map).
+
+    Usage: python benchmarks/bench_shared.py [--docs N] [--size N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyap.pool import ParserPool  # noqa: E402
+from corpus import make_documents  # noqa: E402
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__)
+    argp.add_argument('--docs', type=int, default=2000)
+    argp.add_argument('--size', type=int, default=20000)
+    argp.add_argument('--workers', type=int, default=os.cpu_count() or 4)
+    args = argp.parse_args()
+
+    docs = make_documents(args.docs, args.size)
+    mb = sum(map(len, docs)) / 1e6
+    with ParserPool(countries=['US'], workers=args.workers) as pool:
+        start = time.perf_counter()
+        pickled = sum(len(r) for r in pool.map(docs, chunksize=64))
+        pickled_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        shared = len(pool.parse_shared(docs, chunksize=64))
+        shared_time = time.perf_counter() - start
+
+    assert pickled == shared
+    print('{0:.1f} MB, {1} addresses'.format(mb, shared))
+    print('pickled map:    {0:8.3f}s  {1:6.1f} MB/s'.format(
+        pickled_time, mb / pickled_time))
+    print('shared memory:  {0:8.3f}s  {1:6.1f} MB/s'.format(
+        shared_time, mb / shared_time))
+
+
+if __name__ == '__main__':
+    main()
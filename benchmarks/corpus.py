@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+    benchmarks.corpus
+    ~~~~~~~~~~~~~~~~
+
+    Synthetic documents shared by the benchmark scripts.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import random
+import time
+
+ADDRESSES = {
+    'US': [
+        "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062",
+        "1111 3rd Street, Promenade, Santa Monica, CA 90000",
+        "55 Grant Ave, San Francisco, CA 94108",
+        "8 Wall Street, New York, NY 10005",
+    ],
+    'CA': [
+        "1730 McPherson Crt. Unit 35, Pickering, ON L1W 3E6",
+        "33771 George Ferguson Way Abbotsford, BC V2S 2M5",
+        "775, rue Saint-Viateur Québec (Québec) G2L 2Z3",
+    ],
+    'GB': [
+        "32 London Bridge St, London SE1 9SG",
+        "Flat 2, 9 Grand Parade, Brighton, BN2 9QB",
+        "185-187 Bromley Road, London, SE6 2PT",
+    ],
+}
+
+FILLER = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do "
+    "eiusmod tempor incididunt ut labore et dolore magna aliqua. "
+)
+
+
+def make_documents(count, size=2000, country='US', seed=0):
+    '''Returns count documents of roughly size characters,
+    each with a couple of addresses buried in filler text
+    '''
+    rnd = random.Random(seed)
+    addresses = ADDRESSES[country]
+    documents = []
+    for _ in range(count):
+        parts = []
+        length = 0
+        while length < size:
+            part = FILLER if rnd.random() < 0.8 else \
+                rnd.choice(addresses) + '\n'
+            parts.append(part)
+            length += len(part)
+        documents.append(''.join(parts))
+    return documents
+
+
+def timed(func, *args, **kwargs):
+    '''Returns (seconds, result) for the best of three calls'''
+    best = None
+    result = None
+    for _ in range(3):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
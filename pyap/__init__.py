@@ -3,5 +3,16 @@
 """
 API hooks
 """
-from .api import parse
+__version__ = '0.3.1'
+
+from .api import parse, parse_many, warmup
 from .utils import (match, findall)
+
+
+def __getattr__(name):
+    # asyncio is slow to import, so pyap.aio is only loaded when used
+    if name in ('parse_async', 'parse_stream_async'):
+        from . import aio
+        return getattr(aio, name)
+    raise AttributeError(
+        "module 'pyap' has no attribute {0!r}".format(name))
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+"""
+    Entry point for ``python -m pyap``
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
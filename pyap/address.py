@@ -29,6 +29,16 @@ class Address(object):
             vals.append(v)
         self.data_as_dict = dict(zip(keys, vals))
 
+    def with_offsets(self, start, end):
+        '''Returns a copy of the address found at other offsets'''
+        clone = Address.__new__(Address)
+        clone.__dict__.update(self.__dict__)
+        clone.match_start = start
+        clone.match_end = end
+        clone.data_as_dict = dict(self.data_as_dict, match_start=start,
+                                  match_end=end)
+        return clone
+
     def as_dict(self):
         # Return parsed address parts as a dictionary
         return self.data_as_dict
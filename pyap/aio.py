@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.aio
+    ~~~~~~~~~~~~~~~~
+
+    This module contains asyncio entry points. Parsing runs on an executor
+    so that coroutines awaiting it do not block the event loop.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import asyncio
+import codecs
+
+from . import parser
+
+
+class AsyncAddressParser(object):
+    '''Runs AddressParser work on an executor (the loop's default
+    thread pool unless one is given), with at most max_concurrency
+    documents being parsed at the same time.
+
+    Cancelling a coroutine releases its slot right away; a parse which
+    has already started on the executor runs to completion in the
+    background, one which is still queued is dropped.
+    '''
+
+    def __init__(self, executor=None, max_concurrency=None, **kwargs):
+        self.parser = parser.AddressParser(**kwargs)
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def parse(self, text):
+        '''Returns a list of addresses found in text'''
+        async with self._slot():
+            return await self._run(self.parser.parse, text)
+
+    async def parse_stream(self, stream, encoding='utf-8', chunk_size=65536):
+        '''Yields addresses found in an async stream of bytes or text.
+
+        stream is either an object with a coroutine ``read(n)`` method
+        (asyncio.StreamReader, aiohttp's StreamReader, aiofiles) or an
+        async iterable of chunks
+        '''
+        scanner = parser.ChunkedParser(self.parser)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        async with self._slot():
+            async for chunk in _iter_chunks(stream, chunk_size):
+                if isinstance(chunk, bytes):
+                    chunk = decoder.decode(chunk)
+                for found in await self._run(scanner.feed, chunk):
+                    yield found
+            tail = decoder.decode(b'', final=True)
+            for found in await self._run(scanner.feed, tail):
+                yield found
+            for found in await self._run(scanner.close):
+                yield found
+
+    def _slot(self):
+        if not self.max_concurrency:
+            return _NoLimit()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, func, *args)
+
+
+class _NoLimit(object):
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+async def _iter_chunks(stream, chunk_size):
+    if hasattr(stream, 'read'):
+        while True:
+            chunk = await stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        async for chunk in stream:
+            yield chunk
+
+
+async def parse_async(some_text, executor=None, **kwargs):
+    '''Parses text on an executor without blocking the event loop,
+    returns list of Address objects. Calls are not bounded against each
+    other; share one AsyncAddressParser with max_concurrency for that.
+    '''
+    ap = AsyncAddressParser(executor=executor, **kwargs)
+    return await ap.parse(some_text)
+
+
+async def parse_stream_async(stream, executor=None, encoding='utf-8',
+                             **kwargs):
+    '''Yields addresses found in an async stream of bytes or text.
+    Like parse_async, calls are not bounded against each other.
+    '''
+    ap = AsyncAddressParser(executor=executor, **kwargs)
+    async for found in ap.parse_stream(stream, encoding=encoding):
+        yield found
@@ -10,6 +10,8 @@
     :license: MIT, see LICENSE for more details.
 """
 
+import gc
+
 from . import parser
 
 
@@ -19,3 +21,27 @@ def parse(some_text, **kwargs):
     """
     ap = parser.AddressParser(**kwargs)
     return ap.parse(some_text)
+
+
+def parse_many(texts, workers=None, **kwargs):
+    """Parses each of texts with a single AddressParser
+    and returns a list of Address lists in the same order
+    """
+    ap = parser.AddressParser(**kwargs)
+    return ap.parse_many(texts, workers=workers)
+
+
+def warmup(countries=('US', 'CA', 'GB'), freeze=False):
+    """Imports and compiles detection rules for countries ahead of time.
+
+    Meant to be called in a preloading master process (gunicorn, uwsgi)
+    before workers are forked, so that children start with compiled
+    rules and share their memory pages copy-on-write. With freeze=True
+    all objects alive at this point are moved to the permanent gc
+    generation, which keeps the children's collector from touching
+    (and thereby copying) those pages.
+    """
+    for country in countries:
+        parser.compile_fragments(country.upper())
+    if freeze and hasattr(gc, 'freeze'):
+        gc.freeze()
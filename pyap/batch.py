@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.batch
+    ~~~~~~~~~~~~~~~~
+
+    Resumable batch runner. A manifest of input files is split into
+    shards which are parsed in parallel; every shard is written atomically
+    to its own JSON lines file and recorded in a checkpoint, so an
+    interrupted run only redoes the shards which did not finish.
+
+    Usage: python -m pyap.batch MANIFEST OUTPUT_DIR [--country US] ...
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import cli
+from . import parser
+from . import readers
+from . import exceptions as e
+
+CHECKPOINT = 'checkpoint.jsonl'
+
+
+def read_manifest(manifest):
+    '''Returns input paths listed in a manifest file, one per line'''
+    with open(manifest, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _fsync_write(path, data, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _process_shard(shard_id, paths, options, output_dir):
+    '''Parses the documents of a shard and atomically writes its output.
+    Returns the checkpoint entry of the shard.
+    '''
+    ap = parser.AddressParser(country=options['country'])
+    digest = hashlib.sha256()
+    documents = addresses = 0
+    target = os.path.join(output_dir, shard_id + '.jsonl')
+    tmp = target + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as out:
+        for path in paths:
+            for member, f in readers.iter_documents(path,
+                                                    options['encoding']):
+                records, _ = cli.extract(
+                    ap, readers.document_id(path, member),
+                    readers.iter_chunks(f, options['chunk_size']),
+                    options['detect_only'], options['max_results'])
+                for record in records:
+                    line = json.dumps(record, ensure_ascii=False,
+                                      sort_keys=True) + '\n'
+                    out.write(line)
+                    digest.update(line.encode('utf-8'))
+                documents += 1
+                addresses += len(records)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp, target)
+    return {
+        'shard': shard_id,
+        'documents': documents,
+        'addresses': addresses,
+        'sha256': digest.hexdigest(),
+    }
+
+
+class BatchRunner(object):
+    '''Runs the parser over every file of a manifest in shards of
+    shard_size files. Output for shard N goes to
+    OUTPUT_DIR/shard-0000N.jsonl; finished shards are appended to
+    OUTPUT_DIR/checkpoint.jsonl. Running again over the same manifest
+    skips finished shards and produces byte-identical output.
+    '''
+
+    def __init__(self, paths, output_dir, country='US', shard_size=1000,
+                 workers=None, detect_only=False, max_results=None,
+                 encoding='utf-8', chunk_size=1 << 20):
+        self.paths = list(paths)
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.workers = workers or os.cpu_count() or 1
+        self.options = {
+            'country': country.upper(),
+            'encoding': encoding,
+            'chunk_size': chunk_size,
+            'detect_only': detect_only,
+            'max_results': max_results,
+        }
+        parser.load_rules(self.options['country'])
+        self.checkpoint = os.path.join(output_dir, CHECKPOINT)
+
+    def shards(self):
+        '''Returns (shard_id, paths) pairs in manifest order'''
+        return [('shard-{0:05d}'.format(i // self.shard_size),
+                 self.paths[i:i + self.shard_size])
+                for i in range(0, len(self.paths), self.shard_size)]
+
+    def fingerprint(self):
+        '''Identifies the manifest, sharding and options of a run'''
+        digest = hashlib.sha256()
+        for path in self.paths:
+            digest.update(path.encode('utf-8') + b'\n')
+        digest.update(json.dumps(
+            [self.shard_size, self.options], sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def completed(self):
+        '''Returns checkpoint entries of finished shards by shard id'''
+        return dict((entry['shard'], entry)
+                    for entry in self._read_checkpoint()[1:])
+
+    def _read_checkpoint(self, fingerprint=None):
+        '''Returns the header and entries of the checkpoint, leaving out
+        a line cut short by a crash and shards whose output is missing
+        '''
+        if not os.path.exists(self.checkpoint):
+            return []
+        with open(self.checkpoint, encoding='utf-8') as f:
+            lines = [line for line in f if line.endswith('\n')]
+        if not lines:
+            return []
+        header = json.loads(lines[0])
+        if header.get('fingerprint') != (fingerprint or self.fingerprint()):
+            raise e.CheckpointMismatch(
+                'Checkpoint {0} belongs to a different manifest or '
+                'options.'.format(self.checkpoint), 'Error 3')
+        entries = [header]
+        for line in lines[1:]:
+            entry = json.loads(line)
+            output = os.path.join(self.output_dir, entry['shard'] + '.jsonl')
+            # a shard only counts as done if its output survived as well
+            if os.path.exists(output):
+                entries.append(entry)
+        return entries
+
+    def run(self, progress=None):
+        '''Processes all unfinished shards, calling progress(entry) after
+        each one. Returns a summary of the run. A shard which fails does
+        not stop the others; its error is listed in summary['failed'] by
+        shard id and the shard is redone by the next run.
+        '''
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir)
+        # hash the manifest and split it only once per run
+        fingerprint = self.fingerprint()
+        shards = self.shards()
+        entries = self._read_checkpoint(fingerprint) or \
+            [{'fingerprint': fingerprint}]
+        # start from a clean copy of what is known to be finished
+        tmp = self.checkpoint + '.tmp'
+        _fsync_write(tmp, ''.join(json.dumps(entry, sort_keys=True) + '\n'
+                                  for entry in entries))
+        os.replace(tmp, self.checkpoint)
+        done = set(entry['shard'] for entry in entries[1:])
+        pending = [(shard_id, paths) for shard_id, paths in shards
+                   if shard_id not in done]
+
+        summary = {'shards': len(shards), 'skipped': len(done),
+                   'processed': 0, 'documents': 0, 'addresses': 0,
+                   'failed': {}}
+        with ProcessPoolExecutor(self.workers) as executor:
+            futures = dict((executor.submit(_process_shard, shard_id, paths,
+                                            self.options, self.output_dir),
+                            shard_id)
+                           for shard_id, paths in pending)
+            for future in as_completed(futures):
+                try:
+                    entry = future.result()
+                except Exception as exc:
+                    # keep checkpointing the shards which do finish
+                    summary['failed'][futures[future]] = '{0}: {1}'.format(
+                        type(exc).__name__, exc)
+                    continue
+                _fsync_write(self.checkpoint,
+                             json.dumps(entry, sort_keys=True) + '\n', 'a')
+                summary['processed'] += 1
+                summary['documents'] += entry['documents']
+                summary['addresses'] += entry['addresses']
+                if progress:
+                    progress(entry)
+        return summary
+
+
+def main(argv=None):
+    argp = argparse.ArgumentParser(
+        prog='python -m pyap.batch',
+        description='Resumable sharded address extraction.')
+    argp.add_argument('manifest', help='file listing one input path per line')
+    argp.add_argument('output_dir')
+    argp.add_argument('-c', '--country', default='US')
+    argp.add_argument('-s', '--shard-size', type=int, default=1000)
+    argp.add_argument('-w', '--workers', type=int, default=None)
+    argp.add_argument('--detect-only', action='store_true')
+    argp.add_argument('--max-results', type=int, default=None)
+    argp.add_argument('--encoding', default='utf-8')
+    args = argp.parse_args(argv)
+
+    try:
+        runner = BatchRunner(
+            read_manifest(args.manifest), args.output_dir,
+            country=args.country, shard_size=args.shard_size,
+            workers=args.workers, detect_only=args.detect_only,
+            max_results=args.max_results, encoding=args.encoding)
+        summary = runner.run(
+            lambda entry: sys.stderr.write(
+                '{shard}: {documents} documents, {addresses} addresses\n'.
+                format(**entry)))
+    except (e.AddressParserException, OSError) as exc:
+        sys.stderr.write('pyap: {0}\n'.format(exc))
+        return 2
+    for shard_id, error in sorted(summary['failed'].items()):
+        sys.stderr.write('pyap: {0} failed: {1}\n'.format(shard_id, error))
+    sys.stderr.write(
+        'pyap: {processed} shards processed, {skipped} already done, '
+        '{addresses} addresses\n'.format(**summary))
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
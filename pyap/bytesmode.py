@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.bytesmode
+    ~~~~~~~~~~~~~~~~
+
+    Scans UTF-8 encoded bytes, e.g. a memory-mapped file, without decoding
+    the document. Detection rules are compiled as bytes patterns; only
+    the matched spans are decoded, and offsets are byte offsets into the
+    input.
+
+    Only countries whose rules are plain ASCII can be scanned this way.
+    For ASCII input the results are the same as AddressParser.parse gives
+    for the decoded text. Non-ASCII characters are normalized like in
+    text mode but never count as letters or digits for the rules.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import re
+import mmap
+
+from . import parser
+from . import exceptions as e
+
+# detection rules compiled as bytes patterns, keyed by country id
+_byte_rules_registry = {}
+
+_SEPARATOR = (br'(?:[ \t\n\r\x0b\x0c\x1c-\x1f,]|\xc2[\x85\xa0]|\xe1\x9a\x80|'
+              br'\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80)')
+_SEPARATOR_NO_COMMA = _SEPARATOR.replace(b',', b'')
+# the three passes of AddressParser._normalize_string, done on bytes
+_BREAK_RUNS = re.compile(_SEPARATOR + br'*[,\n]' + _SEPARATOR + b'*')
+_SPACE_RUNS = re.compile(_SEPARATOR_NO_COMMA + b'{2,}|(?! )' +
+                         _SEPARATOR_NO_COMMA)
+_DASHES = re.compile(br'\xe2\x80[\x90-\x95]')
+_SEPARATOR_SEQUENCE = re.compile(_SEPARATOR)
+# a character after which text can be split without changing
+# how either side is normalized
+_SAFE_END = re.compile(br'[\x21-\x2b\x2d-\x7f]')
+
+
+def load_byte_rules(country):
+    '''Returns the detection rules of a country compiled as a bytes
+    pattern. Raises BytesModeUnsupported when the rules are not ASCII.
+    '''
+    try:
+        return _byte_rules_registry[country]
+    except KeyError:
+        pass
+    rules = parser.load_rules(country)[0]
+    try:
+        encoded = rules.encode('ascii')
+    except UnicodeEncodeError:
+        raise e.BytesModeUnsupported(
+            'Detection rules for country "{country}" are not ASCII and '
+            'can not be used in bytes mode.'.format(country=country),
+            'Error 4')
+    compiled = re.compile(encoded, re.VERBOSE)
+    return _byte_rules_registry.setdefault(country, compiled)
+
+
+def normalize_bytes(data):
+    '''Same as AddressParser.normalize for UTF-8 encoded bytes'''
+    data = _BREAK_RUNS.sub(b', ', data)
+    data = _SPACE_RUNS.sub(b' ', data)
+    return _DASHES.sub(b'-', data)
+
+
+class _ByteChunkedParser(parser.OffsetChunkedParser):
+    '''OffsetChunkedParser over bytes, reporting byte offsets'''
+
+    text_type = bytes
+    _safe_end = _SAFE_END
+
+    @staticmethod
+    def _cut(raw):
+        cut = len(raw)
+        while cut:
+            if raw[cut - 1] < 0x80:
+                if raw[cut - 1] not in b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f,':
+                    break
+                cut -= 1
+                continue
+            # find where the trailing UTF-8 sequence starts
+            lead = cut - 1
+            while lead > max(0, cut - 4) and 0x80 <= raw[lead] < 0xc0:
+                lead -= 1
+            size = 2 if raw[lead] < 0xe0 else 3 if raw[lead] < 0xf0 else 4
+            if cut - lead < size or \
+                    _SEPARATOR_SEQUENCE.fullmatch(raw, lead, cut):
+                # an incomplete character or a separator
+                cut = lead
+                continue
+            break
+        return cut
+
+    def _normalize_block(self, block):
+        return normalize_bytes(block)
+
+    def _groups(self, match):
+        return dict(
+            (k, v.decode('utf-8', 'replace') if v is not None else None)
+            for k, v in match.groupdict().items())
+
+
+class BytesAddressParser(object):
+    '''Detects addresses in UTF-8 encoded bytes::
+
+        ap = BytesAddressParser(country='US')
+        for address in ap.parse_file('huge.txt'):
+            print(address.match_start, address.match_end, address)
+
+    Input is read window_size bytes at a time, so memory use does not
+    depend on the size of the input.
+    '''
+
+    window_size = 1 << 22
+
+    def __init__(self, **args):
+        self.parser = parser.AddressParser(**args)
+        self.country = self.parser.country
+        self.rules = load_byte_rules(self.country)
+
+    def parse(self, data):
+        '''Returns a list of addresses found in a bytes-like object'''
+        return list(self.parse_stream(self._windows(data)))
+
+    def parse_file(self, path):
+        '''Returns a list of addresses found in a file, which is
+        memory-mapped instead of read
+        '''
+        with open(path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # an empty file can not be mapped
+                return []
+            with data:
+                return self.parse(data)
+
+    def parse_stream(self, chunks):
+        '''Parses an iterable of bytes chunks as one document, yielding
+        addresses as soon as they are found
+        '''
+        scanner = _ByteChunkedParser(self.parser, self.rules)
+        for chunk in chunks:
+            for found in scanner.feed(chunk):
+                yield found
+        for found in scanner.close():
+            yield found
+
+    def _windows(self, data):
+        view = memoryview(data)
+        try:
+            for start in range(0, len(view), self.window_size):
+                yield view[start:start + self.window_size].tobytes()
+        finally:
+            view.release()
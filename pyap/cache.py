@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.cache
+    ~~~~~~~~~~~~~~~~
+
+    Result caches for AddressParser: an in-process LRU cache, a
+    persistent sqlite cache and a memo of addresses by matched text.
+    Documents are keyed by a hash of their text salted with the parser's
+    country, options, pyap version and a fingerprint of the detection
+    rules, so repeated documents are only normalized and scanned once.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# rough size of an entry and of an address beyond their text
+_ENTRY_OVERHEAD = 128
+_ADDRESS_OVERHEAD = 256
+
+
+def document_key(text, salt=b''):
+    '''Returns a 128-bit blake2b digest of text, salted with the
+    parser configuration
+    '''
+    digest = hashlib.blake2b(salt, digest_size=16)
+    if isinstance(text, str):
+        text = text.encode('utf-8', 'surrogatepass')
+    digest.update(text)
+    return digest.digest()
+
+
+def result_size(results):
+    '''Approximate memory taken by a list of address field dicts'''
+    size = _ENTRY_OVERHEAD
+    for fields in results:
+        size += _ADDRESS_OVERHEAD
+        for value in fields.values():
+            if isinstance(value, str):
+                size += len(value)
+    return size
+
+
+class LRUCache(object):
+    '''Thread-safe least recently used cache, bounded by the number of
+    entries and by their approximate total size in bytes::
+
+        cache = LRUCache(max_entries=10000, max_bytes=64 << 20)
+        ap = AddressParser(country='US', cache=cache)
+
+    One cache can be shared by parsers of different countries or options;
+    they never see each other's entries. Pickling a cache (e.g. to send a
+    parser to another process) gives an empty cache with the same limits.
+    '''
+
+    def __init__(self, max_entries=10000, max_bytes=64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getstate__(self):
+        return {'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        '''Returns the value stored for key, or None'''
+        with self._lock:
+            try:
+                size, value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size):
+        '''Stores value, evicting least recently used entries
+        until the cache is within its limits again
+        '''
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[0]
+            self._entries[key] = (size, value)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or \
+                    self.total_bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted
+                self.evictions += 1
+
+    def get_many(self, keys):
+        '''Returns a dict of the values found for keys'''
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def put_many(self, items):
+        '''Stores (key, value, size) items'''
+        for key, value, size in items:
+            self.put(key, value, size)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        '''Returns the counters of the cache'''
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class SqliteCache(object):
+    '''Persistent cache in a sqlite database, with the get/put interface
+    of LRUCache plus batch lookups and inserts::
+
+        cache = SqliteCache('pyap-cache.sqlite')
+        ap = AddressParser(country='US', cache=cache)
+        results = ap.parse_many(documents)   # one lookup per batch
+
+    The database runs in WAL mode, so any number of threads and processes
+    can read while one writes; every thread uses its own connection.
+    Entries made by another pyap version or other detection rules are
+    never returned, as they are keyed differently. prune() deletes the
+    oldest entries first, so such leftovers are the first to go.
+    '''
+
+    # keys per SELECT, below sqlite's limit on bound parameters
+    batch_size = 500
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key BLOB PRIMARY KEY, value TEXT NOT NULL, '
+                'size INTEGER NOT NULL, created REAL NOT NULL)')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS results_created '
+                'ON results (created)')
+
+    def __getstate__(self):
+        return {'path': self.path, 'timeout': self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        '''Returns the value stored for key, or None'''
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        '''Returns a dict of the values found for keys'''
+        keys = list(keys)
+        unique = list(set(keys))
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(unique), self.batch_size):
+            batch = unique[start:start + self.batch_size]
+            rows = connection.execute(
+                'SELECT key, value FROM results WHERE key IN ({0})'.format(
+                    ','.join('?' * len(batch))), batch)
+            for key, value in rows:
+                found[bytes(key)] = json.loads(value)
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put(self, key, value, size):
+        '''Stores value for key'''
+        self.put_many([(key, value, size)])
+
+    def put_many(self, items):
+        '''Stores (key, value, size) items in one transaction'''
+        now = time.time()
+        with self._connection() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                [(key, json.dumps(value), size, now)
+                 for key, value, size in items])
+
+    def prune(self, max_bytes):
+        '''Deletes the oldest entries until the results stored take at
+        most max_bytes. Returns the number of entries deleted.
+        '''
+        with self._connection() as connection:
+            total = connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+            if total <= max_bytes:
+                return 0
+            cutoff = None
+            for created, size in connection.execute(
+                    'SELECT created, size FROM results ORDER BY created'):
+                total -= size
+                if total <= max_bytes:
+                    cutoff = created
+                    break
+            deleted = connection.execute(
+                'DELETE FROM results WHERE created <= ?',
+                (cutoff,)).rowcount
+        self.evictions += deleted
+        return deleted
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def stats(self):
+        '''Returns the counters of the cache'''
+        entries, size = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        return {
+            'entries': entries,
+            'bytes': size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class AddressMemo(object):
+    '''Bounded memo of the address built for a matched text, keyed by
+    (country, matched text). Repeats of an address (a head office in
+    every invoice footer) are then copied with new offsets instead of
+    having their fields extracted again::
+
+        ap = AddressParser(country='US', memo=AddressMemo(10000))
+
+    When full, the oldest entry makes room for a new one.
+    '''
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        return {'max_entries': self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        '''Returns the address stored for key, or None'''
+        found = self._entries.get(key)
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def put(self, key, value):
+        entries = self._entries
+        if len(entries) >= self.max_entries:
+            try:
+                del entries[next(iter(entries))]
+            except (KeyError, RuntimeError, StopIteration):
+                # another thread changed the memo meanwhile
+                pass
+        entries[key] = value
+
+    def stats(self):
+        '''Returns the counters of the memo'''
+        return {'entries': len(self._entries), 'hits': self.hits,
+                'misses': self.misses}
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.canonical
+    ~~~~~~~~~~~~~~~~
+
+    Canonical keys for parsed addresses and an index which deduplicates
+    them. Spellings which only differ in case, spacing, punctuation or
+    abbreviation ("Street" and "St.", "Texas" and "TX", "l1w3e6" and
+    "L1W 3E6") give the same key.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import re
+import unicodedata
+from array import array
+
+from .source_US import data as us_data
+from .source_CA import data as ca_data
+
+# Canada Post province symbols and the English and French names
+# matched by source_CA.data.region1
+CA_PROVINCES = {
+    'AB': ['Alberta'],
+    'BC': ['British Columbia', 'Colombie-Britannique'],
+    'MB': ['Manitoba'],
+    'NB': ['New Brunswick', 'Nouveau-Brunswick'],
+    'NL': ['Newfoundland and Labrador', 'Newfoundland & Labrador',
+           'Terre-Neuve-et-Labrador'],
+    'NS': ['Nova Scotia', 'Nouvelle-Écosse'],
+    'NT': ['Northwest Territories', 'Territoires du Nord-Ouest'],
+    'NU': ['Nunavut'],
+    'ON': ['Ontario'],
+    'PE': ['Prince Edward Island', 'Île-du-Prince-Édouard'],
+    'QC': ['Quebec', 'Québec'],
+    'SK': ['Saskatchewan'],
+    'YT': ['Yukon'],
+}
+
+DIRECTIONS = {
+    'NORTH': 'N', 'SOUTH': 'S', 'EAST': 'E', 'WEST': 'W',
+    'NORTHEAST': 'NE', 'NORTHWEST': 'NW',
+    'SOUTHEAST': 'SE', 'SOUTHWEST': 'SW',
+    'NORD': 'N', 'SUD': 'S', 'EST': 'E', 'OUEST': 'O',
+}
+
+OCCUPANCY_TYPES = {
+    'SUITE': 'STE', 'APARTMENT': 'APT', 'ROOM': 'RM',
+    'BUILDING': 'BLDG', 'UNITE': 'UNIT',
+}
+
+# fields making up a key, in order
+KEY_FIELDS = ('street_number', 'street_name', 'street_type',
+              'post_direction', 'occupancy', 'building_id', 'floor',
+              'city', 'region1', 'postal_code')
+
+_words = re.compile(r'[^\W_]+')
+
+
+def _words_of(text):
+    '''Upper case words of text without accents and punctuation'''
+    if not text.isascii():
+        text = ''.join(c for c in unicodedata.normalize('NFKD', text)
+                       if not unicodedata.combining(c))
+    return _words.findall(text.upper())
+
+
+def _token(text):
+    '''Upper case text without accents, spaces and punctuation'''
+    return ''.join(_words_of(text))
+
+
+def _us_states():
+    states = dict((_token(abbreviation), abbreviation)
+                  for abbreviation in us_data.state_names)
+    states.update((_token(name), abbreviation)
+                  for abbreviation, name in us_data.state_names.items())
+    return states
+
+
+def _ca_street_types():
+    # every line of the street_type pattern spells one type, its full
+    # name first
+    street_types = {}
+    for line in ca_data.street_type.splitlines():
+        line = line.strip()
+        if not line.startswith('['):
+            continue
+        names = [_token(re.sub(r'\[(.)[^\]]*\]', r'\1',
+                               re.sub(r'\(\?.*', '', name.split('{')[0])))
+                 for name in line.split('|')]
+        names = [name for name in names if name]
+        for name in names:
+            street_types.setdefault(name, names[0])
+    return street_types
+
+
+_street_types = {
+    'US': dict((_token(spelling), abbreviation)
+               for abbreviation, spellings
+               in us_data.street_type_abbreviations.items()
+               for spelling in spellings.split()),
+    'CA': _ca_street_types(),
+}
+
+_regions = {
+    'US': _us_states(),
+    'CA': dict((_token(name), province)
+               for province, names in CA_PROVINCES.items()
+               for name in [province] + names),
+}
+
+
+def normalize_street_type(street_type, country='US'):
+    '''Returns the standard abbreviation of a street type,
+    e.g. "Street", "Str" or "st." give "ST"
+    '''
+    token = _token(street_type or '')
+    return _street_types.get(country, {}).get(token, token)
+
+
+def normalize_region(region, country='US'):
+    '''Returns the abbreviation of a state or province,
+    e.g. "Texas" or "tx" give "TX"
+    '''
+    token = _token(region or '')
+    return _regions.get(country, {}).get(token, token)
+
+
+def normalize_postal_code(postal_code, country='US'):
+    '''Returns a postal code in its standard format: "75062-1234",
+    "L1W 3E6" or "SW1A 2AA"
+    '''
+    token = _token(postal_code or '')
+    if country == 'US' and len(token) == 9:
+        return token[:5] + '-' + token[5:]
+    if country == 'CA' and len(token) == 6:
+        return token[:3] + ' ' + token[3:]
+    if country == 'GB' and len(token) > 3:
+        return token[:-3] + ' ' + token[-3:]
+    return token
+
+
+def postal_code_token(postal_code):
+    '''Returns a postal code in upper case without spaces or punctuation,
+    e.g. "750621234" or "SW1A2AA", so that its start is a prefix of it
+    '''
+    return _token(postal_code or '')
+
+
+def normalize_street(street, country='US'):
+    '''Returns a street name followed by its type in the form used by
+    keys, e.g. "East John Carpenter Freeway" gives "E JOHN CARPENTER FWY"
+    '''
+    words = _normalize_words(street or '').split(' ')
+    street_types = _street_types.get(country, {})
+    if words[-1] in street_types:
+        words[-1] = street_types[words[-1]]
+    return ' '.join(words)
+
+
+def normalize_city(city):
+    '''Returns a city name in the form used by keys'''
+    return _normalize_words(city or '')
+
+
+def _normalize_words(text, country=None):
+    return ' '.join(DIRECTIONS.get(word, word) for word in _words_of(text))
+
+
+def _normalize_occupancy(text, country=None):
+    return ' '.join(OCCUPANCY_TYPES.get(word, word)
+                    for word in _words_of(text))
+
+
+def _normalize_token(text, country=None):
+    return _token(text)
+
+
+_normalizers = {
+    'street_number': _normalize_token,
+    'street_name': _normalize_words,
+    'street_type': normalize_street_type,
+    'post_direction': _normalize_words,
+    'occupancy': _normalize_occupancy,
+    'building_id': _normalize_occupancy,
+    'floor': _normalize_words,
+    'city': _normalize_words,
+    'region1': normalize_region,
+    'postal_code': normalize_postal_code,
+}
+
+
+# field values repeat a lot across addresses (cities, street names,
+# regions), so their normalized forms are kept by country and field
+_known = {}
+_MAX_KNOWN = 1 << 16
+
+
+def _known_values(country):
+    '''Returns (field name, {value: normalized value}) pairs of a country
+    for every field of a key
+    '''
+    try:
+        return _known[country]
+    except KeyError:
+        return _known.setdefault(
+            country, [(name, {}) for name in KEY_FIELDS])
+
+
+def _normalized(name, known, value, country):
+    if len(known) >= _MAX_KNOWN:
+        known.clear()
+    normalized = known[value] = _normalizers[name](value, country)
+    return normalized
+
+
+def canonical_fields(address):
+    '''Returns the normalized fields of an Address (or of its as_dict())
+    which make up its canonical key
+    '''
+    fields = address.as_dict() if hasattr(address, 'as_dict') else address
+    country = fields.get('country_id') or 'US'
+    normalized = {'country_id': country}
+    for name, known in _known_values(country):
+        value = fields.get(name) or ''
+        normalized[name] = known[value] if value in known else \
+            _normalized(name, known, value, country)
+    return normalized
+
+
+def canonical_key(address):
+    '''Returns a string identifying an address regardless of case,
+    spacing, punctuation and abbreviations::
+
+        >>> canonical_key(parse('8 Wall Street, New York, NY 10005',
+        ...                     country='US')[0])
+        'US|8|WALL|ST|||||NEW YORK|NY|10005'
+    '''
+    return '|'.join(canonical_fields(address).values())
+
+
+def _us_prefix_states():
+    states = {}
+    for state, ranges in us_data.postal_code_prefixes.items():
+        for bounds in ranges.split():
+            first, _, last = bounds.partition('-')
+            for prefix in range(int(first), int(last or first) + 1):
+                states.setdefault('{0:03d}'.format(prefix), set()).add(state)
+    return states
+
+
+class PostalCheck(object):
+    '''Tells whether the postal code of an address can go together
+    with its state or province (US ZIP code prefixes, CA forward
+    sortation areas) or is a postcode at all (GB areas). Addresses
+    without a postal code or with a region it knows nothing about pass.
+
+        check = PostalCheck('US')
+        check(address.as_dict())
+    '''
+
+    def __init__(self, country):
+        self.country = country
+        # regions as matched, normalized on first sight
+        self._regions = {}
+        if country == 'US':
+            self._places = _us_prefix_states()
+            self._codes = set(_regions['US'].values())
+            self._agrees = self._agrees_us
+        elif country == 'CA':
+            self._places = dict(
+                (letter, set(provinces.split())) for letter, provinces
+                in ca_data.postal_code_provinces.items())
+            self._codes = set(CA_PROVINCES)
+            self._agrees = self._agrees_ca
+        elif country == 'GB':
+            from .source_GB import data as gb_data
+            self._places = frozenset(gb_data.postal_code_areas)
+            self._agrees = self._agrees_gb
+        else:
+            self._agrees = None
+
+    @property
+    def cache_salt(self):
+        '''Identifies the check in the cache keys of a parser using it'''
+        return 'PostalCheck:' + self.country
+
+    def __call__(self, fields):
+        postal_code = fields.get('postal_code')
+        if not postal_code or self._agrees is None:
+            return True
+        return self._agrees(postal_code, fields.get('region1'))
+
+    def _region(self, region):
+        try:
+            return self._regions[region]
+        except KeyError:
+            if len(self._regions) >= _MAX_KNOWN:
+                self._regions.clear()
+            normalized = self._regions[region] = normalize_region(
+                region, self.country)
+            return normalized
+
+    def _agrees_us(self, postal_code, region):
+        states = self._places.get(postal_code[:3])
+        if not states or not region:
+            return True
+        region = self._region(region)
+        return region in states or region not in self._codes
+
+    def _agrees_ca(self, postal_code, region):
+        provinces = self._places.get(postal_code[:1].upper())
+        if not provinces or not region:
+            return True
+        region = self._region(region)
+        return region in provinces or region not in self._codes
+
+    def _agrees_gb(self, postal_code, region):
+        end = 0
+        while end < len(postal_code) and postal_code[end].isalpha():
+            end += 1
+        return postal_code[:end].upper() in self._places
+
+
+class AddressIndex(object):
+    '''Deduplicates addresses by canonical key and groups the references
+    (e.g. document or record numbers) they were found with::
+
+        index = AddressIndex()
+        for number, address in enumerate(addresses):
+            index.add(address, number)
+        for key, refs in index.groups():
+            ...
+
+    Every distinct key is stored once; references are integers kept in
+    flat arrays chained per key, so an entry takes 16 bytes besides its
+    key.
+    '''
+
+    def __init__(self):
+        self._slots = {}
+        self._keys = []
+        self._counts = array('q')
+        self._heads = array('q')
+        self._tails = array('q')
+        self._refs = array('q')
+        self._next = array('q')
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, address):
+        return self._key(address) in self._slots
+
+    @staticmethod
+    def _key(address):
+        return address if isinstance(address, str) else \
+            canonical_key(address)
+
+    def add(self, address, ref=None):
+        '''Adds an address (or its canonical key) found with ref, which
+        defaults to the number of entries added so far. Returns True if
+        the address was not in the index yet.
+        '''
+        key = self._key(address)
+        entry = len(self._refs)
+        self._refs.append(entry if ref is None else ref)
+        self._next.append(-1)
+        slot = self._slots.get(key)
+        if slot is None:
+            self._slots[key] = len(self._keys)
+            self._keys.append(key)
+            self._counts.append(1)
+            self._heads.append(entry)
+            self._tails.append(entry)
+            return True
+        self._next[self._tails[slot]] = entry
+        self._tails[slot] = entry
+        self._counts[slot] += 1
+        return False
+
+    def update(self, addresses):
+        '''Adds every address of an iterable; returns the number of new
+        ones
+        '''
+        added = 0
+        for address in addresses:
+            added += self.add(address)
+        return added
+
+    def count(self, address):
+        '''Returns how many times an address was added'''
+        slot = self._slots.get(self._key(address))
+        return 0 if slot is None else self._counts[slot]
+
+    def refs(self, address):
+        '''Returns the references an address was added with, in order'''
+        slot = self._slots.get(self._key(address))
+        return [] if slot is None else self._chain(slot)
+
+    def _chain(self, slot):
+        refs = []
+        entry = self._heads[slot]
+        while entry != -1:
+            refs.append(self._refs[entry])
+            entry = self._next[entry]
+        return refs
+
+    def keys(self):
+        '''Returns the distinct keys in the order they were first added'''
+        return list(self._keys)
+
+    def groups(self):
+        '''Yields (key, refs) for every distinct address'''
+        for slot, key in enumerate(self._keys):
+            yield key, self._chain(slot)
+
+    def stats(self):
+        '''Returns the counters of the index'''
+        return {
+            'keys': len(self._keys),
+            'entries': len(self._refs),
+            'duplicates': len(self._refs) - len(self._keys),
+            'array_bytes': sum(
+                a.itemsize * len(a) for a in (
+                    self._counts, self._heads, self._tails,
+                    self._refs, self._next)),
+        }
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.cli
+    ~~~~~~~~~~~~~~~~
+
+    Command-line bulk extractor: ``python -m pyap`` or ``pyap``.
+    Reads files, directories, glob patterns or stdin and writes one JSON
+    line per address found. Compressed files and zip archives are read
+    through pyap.readers.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import argparse
+import collections
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import parser
+from . import readers
+from . import exceptions as e
+from .readers import iter_chunks
+
+STDIN = '-'
+
+
+def iter_paths(sources):
+    '''Expands files, directories (recursively) and glob patterns'''
+    for source in sources:
+        if source == STDIN:
+            yield source
+        elif os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        elif glob.has_magic(source):
+            for path in sorted(glob.glob(source, recursive=True)):
+                if os.path.isfile(path):
+                    yield path
+        else:
+            yield source
+
+
+def iter_records(ap, doc_id, chunks, detect_only=False, max_results=None):
+    '''Yields a dict ready to be written as a JSON line for every
+    address of one document, as soon as it is found. Start and end are
+    character offsets into the document as read.
+    '''
+    scanner = parser.OffsetChunkedParser(ap)
+
+    def addresses():
+        for chunk in chunks:
+            for found in scanner.feed(chunk):
+                yield found
+        for found in scanner.close():
+            yield found
+
+    count = 0
+    for address in addresses():
+        fields = address.as_dict()
+        record = {
+            'document': doc_id,
+            'start': fields['match_start'],
+            'end': fields['match_end'],
+            'full_address': fields['full_address'],
+        }
+        if not detect_only:
+            record['fields'] = dict(
+                (k, v) for k, v in fields.items()
+                if v and k not in ('match_start', 'match_end',
+                                   'full_address'))
+        yield record
+        count += 1
+        if max_results and count >= max_results:
+            break
+
+
+def counting(chunks, counted):
+    '''Passes chunks through, appending their lengths to counted'''
+    for chunk in chunks:
+        counted.append(len(chunk))
+        yield chunk
+
+
+def extract(ap, doc_id, chunks, detect_only=False, max_results=None):
+    '''Returns (records, characters read) for one document, records
+    being the dicts iter_records yields
+    '''
+    counted = []
+    records = list(iter_records(ap, doc_id, counting(chunks, counted),
+                                detect_only, max_results))
+    return records, sum(counted)
+
+
+def _extract_file(unit, options):
+    path, member = unit
+    ap = parser.AddressParser(country=options['country'])
+    archive = None if member is None else readers.shared_archive(path)
+    with readers.open_document(path, member, options['encoding'],
+                               archive=archive) as f:
+        return extract(ap, readers.document_id(path, member),
+                       iter_chunks(f, options['chunk_size']),
+                       options['detect_only'], options['max_results'])
+
+
+def build_argparser():
+    argp = argparse.ArgumentParser(
+        prog='pyap',
+        description='Detect addresses in text files and write them '
+                    'as JSON lines.')
+    argp.add_argument('sources', nargs='*', default=[STDIN],
+                      help='files, directories or glob patterns '
+                           '("-" or nothing reads stdin)')
+    argp.add_argument('-c', '--country', default='US',
+                      help='country of the addresses (US, CA, GB)')
+    argp.add_argument('-w', '--workers', type=int, default=1,
+                      help='number of worker processes')
+    argp.add_argument('--detect-only', action='store_true',
+                      help='only report addresses and offsets, '
+                           'without address parts')
+    argp.add_argument('--max-results', type=int, default=None,
+                      help='maximum number of addresses per document')
+    argp.add_argument('--encoding', default='utf-8')
+    argp.add_argument('--chunk-size', type=int, default=1 << 20,
+                      help='characters read at a time')
+    argp.add_argument('-o', '--output', default=None,
+                      help='output file (default: stdout)')
+    argp.add_argument('-q', '--quiet', action='store_true',
+                      help='do not report throughput on exit')
+    return argp
+
+
+def run(args, out, err):
+    options = {
+        'country': args.country.upper(),
+        'encoding': args.encoding,
+        'chunk_size': args.chunk_size,
+        'detect_only': args.detect_only,
+        'max_results': args.max_results,
+    }
+    # fail on unknown countries before reading anything
+    parser.load_rules(options['country'])
+
+    paths = list(iter_paths(args.sources))
+    files = [path for path in paths if path != STDIN]
+    stats = {'documents': 0, 'addresses': 0, 'characters': 0, 'failed': 0}
+    start = time.perf_counter()
+
+    def write(records):
+        for record in records:
+            out.write(json.dumps(record, ensure_ascii=False))
+            out.write('\n')
+            stats['addresses'] += 1
+
+    def failed(name, exc):
+        # an unreadable file is reported, the others are still parsed
+        err.write('pyap: {0}: {1}\n'.format(name, exc))
+        stats['failed'] += 1
+
+    ap = parser.AddressParser(country=options['country'])
+
+    def scan(doc_id, stream):
+        counted = []
+        # records are written as they are found
+        write(iter_records(
+            ap, doc_id,
+            counting(iter_chunks(stream, options['chunk_size']), counted),
+            options['detect_only'], options['max_results']))
+        stats['documents'] += 1
+        stats['characters'] += sum(counted)
+
+    if STDIN in paths:
+        scan(STDIN, sys.stdin)
+    if args.workers > 1:
+        _run_workers(args.workers, files, options, write, failed, stats)
+    else:
+        for path in files:
+            try:
+                for member, f in readers.iter_documents(
+                        path, options['encoding']):
+                    scan(readers.document_id(path, member), f)
+            except OSError as exc:
+                failed(path, exc)
+
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        err.write(
+            'pyap: {0} documents, {1} addresses, {2:.1f}M characters in '
+            '{3:.2f}s ({4:.1f}M characters/s, {5:.1f} documents/s)'.format(
+                stats['documents'], stats['addresses'],
+                stats['characters'] / 1e6, elapsed,
+                stats['characters'] / 1e6 / elapsed if elapsed else 0.0,
+                stats['documents'] / elapsed if elapsed else 0.0))
+        if stats['failed']:
+            err.write(', {0} failed'.format(stats['failed']))
+        err.write('\n')
+    return 1 if stats['failed'] else 0
+
+
+def _run_workers(workers, files, options, write, failed, stats):
+    '''Parses every document of files in worker processes, keeping at
+    most two documents per worker in flight and writing their records
+    in order
+    '''
+    pending = collections.deque()
+
+    def collect(limit):
+        while len(pending) > limit:
+            unit, future = pending.popleft()
+            try:
+                records, size = future.result()
+            except OSError as exc:
+                failed(readers.document_id(*unit), exc)
+                continue
+            write(records)
+            stats['documents'] += 1
+            stats['characters'] += size
+
+    with ProcessPoolExecutor(workers) as executor:
+        for path in files:
+            try:
+                names = readers.members(path)
+            except OSError as exc:
+                failed(path, exc)
+                continue
+            # every member of a zip archive is a document of its own;
+            # members are decompressed and parsed in the workers
+            for member in names:
+                pending.append(((path, member), executor.submit(
+                    _extract_file, (path, member), options)))
+                collect(2 * workers)
+        collect(0)
+
+
+def main(argv=None):
+    args = build_argparser().parse_args(argv)
+    try:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as out:
+                return run(args, out, sys.stderr)
+        return run(args, sys.stdout, sys.stderr)
+    except e.AddressParserException as exc:
+        sys.stderr.write('pyap: {0}\n'.format(exc))
+        return 2
@@ -27,3 +27,38 @@ class CountryDetectionMissing(AddressParserException):
     def __init__(self, message, errors):
         super(CountryDetectionMissing, self).__init__(message)
         self.errors = errors
+
+
+class PipelineError(AddressParserException):
+    ''' One or more stages of a parsing pipeline failed '''
+    def __init__(self, message, errors):
+        super(PipelineError, self).__init__(message)
+        self.errors = errors
+
+
+class CheckpointMismatch(AddressParserException):
+    ''' Batch checkpoint was written for a different manifest or options '''
+    def __init__(self, message, errors):
+        super(CheckpointMismatch, self).__init__(message)
+        self.errors = errors
+
+
+class BytesModeUnsupported(AddressParserException):
+    ''' Country detection rules can not be applied to bytes '''
+    def __init__(self, message, errors):
+        super(BytesModeUnsupported, self).__init__(message)
+        self.errors = errors
+
+
+class SearchIndexInvalid(AddressParserException):
+    ''' File is not a search index written by pyap '''
+    def __init__(self, message, errors):
+        super(SearchIndexInvalid, self).__init__(message)
+        self.errors = errors
+
+
+class PoolStartFailed(AddressParserException):
+    ''' Worker processes of a ParserPool could not start '''
+    def __init__(self, message, errors):
+        super(PoolStartFailed, self).__init__(message)
+        self.errors = errors
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.layout
+    ~~~~~~~~~~~~~~~~
+
+    Splits a document into blocks which may hold an address: paragraphs
+    of running text and runs of short lines, as found in the address
+    blocks of letters and invoices. Scanning every block on its own keeps
+    matches from spanning unrelated lines.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+
+def _lines(text):
+    '''Yields (start, end, length) of every non-blank line, and None
+    for blank lines
+    '''
+    start = 0
+    for line in text.splitlines(True):
+        stripped = line.strip()
+        if stripped:
+            yield start, start + len(line.rstrip('\r\n')), len(stripped)
+        else:
+            yield None
+        start += len(line)
+
+
+def _windows(lines, max_lines, max_address_lines):
+    '''Splits a run of short lines into windows of at most max_lines
+    lines. Consecutive windows share max_address_lines - 1 lines, just
+    enough for any address of up to max_address_lines lines to lie
+    wholly inside one of them.
+    '''
+    if len(lines) <= max_lines:
+        return [(lines[0][0], lines[-1][1])]
+    step = max(1, max_lines - max_address_lines + 1)
+    windows = []
+    for first in range(0, len(lines), step):
+        last = min(first + max_lines, len(lines)) - 1
+        windows.append((lines[first][0], lines[last][1]))
+        if last == len(lines) - 1:
+            break
+    return windows
+
+
+def _paragraph_blocks(paragraph, max_lines, max_line_length,
+                      max_address_lines):
+    groups = []
+    for line in paragraph:
+        short = line[2] <= max_line_length
+        if groups and groups[-1][0] == short:
+            groups[-1][1].append(line)
+        else:
+            groups.append((short, [line]))
+    if len(groups) > 1 and groups[-1][0] and len(groups[-1][1]) == 1:
+        # a single short line closing running text is the end of
+        # its last sentence
+        groups[-2][1].extend(groups.pop()[1])
+
+    blocks = []
+    for short, lines in groups:
+        if short:
+            blocks.extend(_windows(lines, max_lines, max_address_lines))
+        else:
+            blocks.append((lines[0][0], lines[-1][1]))
+    return blocks
+
+
+def split_blocks(text, max_lines=8, max_line_length=60,
+                 max_address_lines=4):
+    '''Returns (start, end) spans of the blocks of text, in order.
+
+    Blank lines separate paragraphs. Within a paragraph, consecutive lines
+    longer than max_line_length form one block of running text; runs of
+    shorter lines are split into windows of max_lines lines, overlapping
+    by max_address_lines - 1 lines.
+    '''
+    blocks = []
+    paragraph = []
+    for line in _lines(text):
+        if line is None:
+            if paragraph:
+                blocks.extend(_paragraph_blocks(
+                    paragraph, max_lines, max_line_length,
+                    max_address_lines))
+                paragraph = []
+        else:
+            paragraph.append(line)
+    if paragraph:
+        blocks.extend(_paragraph_blocks(paragraph, max_lines,
+                                        max_line_length, max_address_lines))
+    return blocks
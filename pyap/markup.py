@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.markup
+    ~~~~~~~~~~~~~~~~
+
+    HTML front end. Markup is dropped in a single html.parser pass,
+    block-level tags become line breaks for the normalizer, and an offset
+    map leads back from the text to the original markup, so that the
+    offsets of the addresses found point into the HTML.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import bisect
+import html.entities
+import html.parser
+
+from . import parser
+
+# tags which start a new line of text
+BLOCK_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'dd',
+    'div', 'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer',
+    'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li',
+    'main', 'nav', 'ol', 'option', 'p', 'pre', 'section', 'table', 'tbody',
+    'td', 'tfoot', 'th', 'thead', 'title', 'tr', 'ul',
+])
+# tags whose content is not text
+SKIPPED_TAGS = frozenset(['script', 'style', 'template'])
+
+
+class MarkupConverter(html.parser.HTMLParser):
+    '''Turns HTML into text while it is being fed.
+
+    pop_text() returns the text produced so far; offsets.to_raw(pos)
+    gives the position in the markup of a position in the text.
+    Source line breaks outside <pre> are only whitespace in HTML and
+    become spaces; block-level tags become line breaks.
+    '''
+
+    def __init__(self):
+        html.parser.HTMLParser.__init__(self, convert_charrefs=False)
+        self.offsets = parser.OffsetMap([], [])
+        self._pieces = []
+        self._length = 0
+        self._position = 0
+        self._skipping = 0
+        self._pre = 0
+
+    def updatepos(self, i, j):
+        # the position in the markup where the next event starts
+        if i < j:
+            self._position += j - i
+        return html.parser.HTMLParser.updatepos(self, i, j)
+
+    def pop_text(self):
+        '''Returns the text converted since the last call'''
+        text = ''.join(self._pieces)
+        self._pieces = []
+        return text
+
+    def close(self):
+        html.parser.HTMLParser.close(self)
+        self._mark(self._position)
+
+    def discard(self, before):
+        '''Forgets the offsets of text positions before "before"'''
+        first = bisect.bisect_right(self.offsets.norms, before) - 1
+        if first > 0:
+            del self.offsets.norms[:first]
+            del self.offsets.raws[:first]
+
+    def _mark(self, raw):
+        self.offsets.norms.append(self._length)
+        self.offsets.raws.append(raw)
+
+    def _emit(self, text):
+        self._mark(self._position)
+        self._pieces.append(text)
+        self._length += len(text)
+
+    def handle_data(self, data):
+        if self._skipping:
+            return
+        if not self._pre:
+            # same length, so positions inside data map one to one
+            data = data.replace('\r', ' ').replace('\n', ' ')
+        self._emit(data)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in BLOCK_TAGS:
+            self._pre += tag == 'pre'
+            self._emit('\n')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self._emit('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in BLOCK_TAGS:
+            if tag == 'pre':
+                self._pre = max(0, self._pre - 1)
+            self._emit('\n')
+
+    def handle_entityref(self, name):
+        if not self._skipping:
+            codepoint = html.entities.name2codepoint.get(name)
+            self._emit(chr(codepoint) if codepoint else '&' + name)
+
+    def handle_charref(self, name):
+        if self._skipping:
+            return
+        try:
+            codepoint = int(name[1:], 16) if name[:1] in 'xX' else int(name)
+            self._emit(chr(codepoint))
+        except (ValueError, OverflowError):
+            self._emit('&#' + name)
+
+
+def html_to_text(markup):
+    '''Returns (text, offset_map) for a HTML document'''
+    converter = MarkupConverter()
+    converter.feed(markup)
+    converter.close()
+    return converter.pop_text(), converter.offsets
+
+
+class _MarkupChunkedParser(parser.OffsetChunkedParser):
+    '''Reports offsets in the markup the converter was fed'''
+
+    def __init__(self, ap, converter):
+        super(_MarkupChunkedParser, self).__init__(ap)
+        self.converter = converter
+
+    def _to_raw(self, pos):
+        return self.converter.offsets.to_raw(
+            super(_MarkupChunkedParser, self)._to_raw(pos))
+
+
+def parse_html_stream(chunks, address_parser=None, **kwargs):
+    '''Parses HTML arriving in chunks, yielding addresses as soon as they
+    are found. Offsets of the addresses are positions in the markup.
+    address_parser is an AddressParser to reuse instead of building one
+    from kwargs.
+    '''
+    converter = MarkupConverter()
+    scanner = _MarkupChunkedParser(
+        address_parser or parser.AddressParser(**kwargs), converter)
+    for chunk in chunks:
+        converter.feed(chunk)
+        for address in scanner.feed(converter.pop_text()):
+            yield address
+        converter.discard(scanner.raw_start)
+    converter.close()
+    # text held back until now, e.g. after an unterminated tag
+    for address in scanner.feed(converter.pop_text()):
+        yield address
+    for address in scanner.close():
+        yield address
+
+
+def parse_html(markup, address_parser=None, **kwargs):
+    '''Returns the addresses found in a HTML document::
+
+        pyap.markup.parse_html(page, country='US')
+
+    Offsets of the addresses are positions in the markup.
+    '''
+    return list(parse_html_stream([markup], address_parser, **kwargs))
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.messages
+    ~~~~~~~~~~~~~~~~
+
+    Email input adapter. Messages are read one at a time from mbox files,
+    Maildir directories or single RFC 822 files; only their text/plain
+    and text/html parts are decoded and parsed, attachments are left
+    encoded.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import os
+import email
+import email.errors
+import email.header
+import mailbox
+
+from . import markup
+from . import parser
+
+TEXT_TYPES = ('text/plain', 'text/html')
+
+# headers decoded once per message and shared by the results of its parts
+HEADERS = ('message-id', 'from', 'to', 'cc', 'date', 'subject')
+
+
+def iter_messages(source):
+    '''Yields (key, message) pairs from a mailbox.Mailbox, a Maildir
+    directory, an mbox file or a single message file (*.eml)
+    '''
+    if isinstance(source, mailbox.Mailbox):
+        box = source
+    elif os.path.isdir(source):
+        box = mailbox.Maildir(source, factory=None, create=False)
+    elif source.lower().endswith('.eml'):
+        with open(source, 'rb') as f:
+            yield os.path.basename(source), email.message_from_binary_file(f)
+        return
+    else:
+        box = mailbox.mbox(source, factory=None, create=False)
+    try:
+        for key in box.iterkeys():
+            yield key, box[key]
+    finally:
+        if box is not source:
+            box.close()
+
+
+def decode_headers(message):
+    '''Returns the HEADERS of a message decoded to str'''
+    headers = {}
+    for name in HEADERS:
+        value = message.get(name)
+        if value is None:
+            continue
+        try:
+            value = str(email.header.make_header(
+                email.header.decode_header(value)))
+        except (LookupError, UnicodeError, email.errors.HeaderParseError):
+            value = str(value)
+        headers[name] = value
+    return headers
+
+
+def iter_text_parts(message, max_part_size=1 << 20,
+                    include_attachments=False):
+    '''Yields (part number, content type, text) for the text/plain and
+    text/html parts of a message, numbered in walk() order. Parts whose
+    encoded payload is larger than max_part_size are not decoded.
+    '''
+    for number, part in enumerate(message.walk()):
+        if part.is_multipart():
+            continue
+        content_type = part.get_content_type()
+        if content_type not in TEXT_TYPES:
+            continue
+        if not include_attachments and \
+                part.get_content_disposition() == 'attachment':
+            continue
+        encoded = part.get_payload()
+        if not isinstance(encoded, str) or len(encoded) > max_part_size:
+            continue
+        payload = part.get_payload(decode=True) or b''
+        charset = part.get_content_charset() or 'utf-8'
+        try:
+            text = payload.decode(charset, 'replace')
+        except LookupError:
+            text = payload.decode('utf-8', 'replace')
+        yield number, content_type, text
+
+
+class MessageParser(object):
+    '''Finds addresses in the text parts of email messages::
+
+        mp = MessageParser(country='US')
+        for result in mp.parse_mailbox('inbox.mbox'):
+            print(result['message'], result['part'], result['addresses'])
+
+    Offsets of addresses point into the decoded text of their part, the
+    HTML itself for text/html parts.
+    '''
+
+    def __init__(self, max_part_size=1 << 20, include_attachments=False,
+                 **kwargs):
+        self.parser = parser.AddressParser(**kwargs)
+        self.max_part_size = max_part_size
+        self.include_attachments = include_attachments
+
+    def parse_message(self, message, key=None):
+        '''Returns one result dict per text part of a message: message
+        id, part number, content type, headers and addresses
+        '''
+        headers = None
+        results = []
+        for number, content_type, text in iter_text_parts(
+                message, self.max_part_size, self.include_attachments):
+            if headers is None:
+                headers = decode_headers(message)
+            if content_type == 'text/html':
+                addresses = markup.parse_html(text, self.parser)
+            else:
+                # offsets into the decoded part, as for HTML parts
+                scanner = parser.OffsetChunkedParser(self.parser)
+                addresses = scanner.feed(text) + scanner.close()
+            results.append({
+                'message': headers.get('message-id', key),
+                'part': number,
+                'content_type': content_type,
+                'headers': headers,
+                'addresses': addresses,
+            })
+        return results
+
+    def parse_mailbox(self, source):
+        '''Yields the results of every text part of every message of
+        source (see iter_messages), one message at a time
+        '''
+        for key, message in iter_messages(source):
+            for result in self.parse_message(message, key):
+                yield result
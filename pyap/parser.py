@@ -12,76 +12,558 @@
 """
 
 import re
+import bisect
 import importlib
 
+from . import __version__
 from . import exceptions as e
 from . import address
+from . import layout as layout_blocks
 from . import utils
 from .packages import six
 
 
+# compiled detection rules shared by all parsers of this process,
+# keyed by country id
+_rules_registry = {}
+
+
+def load_rules(country):
+    '''Returns (rules, compiled_rules) for the given country id.
+    Detection rules are imported and compiled on first use only.
+    '''
+    try:
+        return _rules_registry[country]
+    except KeyError:
+        pass
+    try:
+        # import detection rules
+        package = 'pyap' + '.source_' + country + \
+            '.data'
+        data = importlib.import_module(package)
+    except ImportError:
+        raise e.CountryDetectionMissing(
+            'Detection rules for country "{country}" not found.'.
+            format(country=country), 'Error 2'
+        )
+    rules = data.full_address
+    entry = (rules, re.compile(rules, utils.DEFAULT_FLAGS))
+    return _rules_registry.setdefault(country, entry)
+
+
+# the same rules compiled with re.ASCII, keyed by country id
+_ascii_rules_registry = {}
+
+
+def load_ascii_rules(country):
+    '''Returns the detection rules of a country compiled with re.ASCII.
+    On pure ASCII text they find exactly what the unicode-aware rules
+    find, only faster.
+    '''
+    try:
+        return _ascii_rules_registry[country]
+    except KeyError:
+        pass
+    compiled = re.compile(load_rules(country)[0], re.VERBOSE | re.ASCII)
+    return _ascii_rules_registry.setdefault(country, compiled)
+
+
+def rules_fingerprint(country):
+    '''Returns a short digest of a country's detection rules'''
+    import hashlib
+    return hashlib.sha1(load_rules(country)[0].encode('utf-8')).hexdigest()
+
+
+def compile_fragments(country):
+    '''Compiles every pattern fragment of a country's detection rules
+    (street_type, postal_code, ...) so that later matches against them
+    are served from the regex cache. Returns the number of fragments.
+    '''
+    load_rules(country)
+    load_ascii_rules(country)
+    data = importlib.import_module('pyap.source_' + country + '.data')
+    compiled = 0
+    for name, value in sorted(vars(data).items()):
+        if name.startswith('_') or not isinstance(value, str):
+            continue
+        try:
+            re.compile(value, utils.DEFAULT_FLAGS)
+        except re.error:
+            # not every fragment is a complete expression on its own
+            continue
+        compiled += 1
+    return compiled
+
+
+# every run of separators which normalization rewrites: anything but
+# a single space, and the dashes normalized to '-'
+_CHANGED_RUNS = {
+    str: re.compile(r'[\s,]{2,}|[^\S ]|,|(?P<dash>[‐‑‒–—―])'),
+    bytes: re.compile(
+        # UTF-8 encodings of the characters str patterns treat as \s
+        br'(?:[ \t\n\r\x0b\x0c\x1c-\x1f,]|\xc2[\x85\xa0]|\xe1\x9a\x80|'
+        br'\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80){2,}|'
+        br'[\t\n\r\x0b\x0c\x1c-\x1f,]|\xc2[\x85\xa0]|\xe1\x9a\x80|'
+        br'\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80|'
+        br'(?P<dash>\xe2\x80[\x90-\x95])'),
+}
+
+
+class OffsetMap(object):
+    '''Maps positions in normalized text back to the text it was
+    normalized from. Breakpoints are (normalized, raw) position pairs
+    around every rewritten run; positions between breakpoints move
+    together, clamped to the next breakpoint.
+    '''
+
+    def __init__(self, norms, raws):
+        self.norms = norms
+        self.raws = raws
+
+    def to_raw(self, pos):
+        '''Returns the raw position of a normalized position'''
+        i = bisect.bisect_right(self.norms, pos) - 1
+        if i < 0:
+            return pos
+        raw = self.raws[i] + pos - self.norms[i]
+        if i + 1 < len(self.raws):
+            raw = min(raw, self.raws[i + 1])
+        return raw
+
+
+def normalize_with_offsets(text):
+    '''Normalizes text exactly like AddressParser.normalize and returns
+    (clean_text, offset_map). Accepts str or UTF-8 encoded bytes.
+    '''
+    if isinstance(text, str):
+        comma, newline, empty = ',', '\n', ''
+        replacements = (', ', ' ', '-')
+    else:
+        comma, newline, empty = b',', b'\n', b''
+        replacements = (b', ', b' ', b'-')
+    pieces = []
+    norms = []
+    raws = []
+    last = shift = 0
+    for match in _CHANGED_RUNS[type(text)].finditer(text):
+        start, end = match.span()
+        run = match.group()
+        if match.lastgroup == 'dash':
+            replace = replacements[2]
+        elif comma in run or newline in run:
+            replace = replacements[0]
+        else:
+            replace = replacements[1]
+        pieces.append(text[last:start])
+        pieces.append(replace)
+        norms.append(start + shift)
+        raws.append(start)
+        shift += len(replace) - (end - start)
+        norms.append(end + shift)
+        raws.append(end)
+        last = end
+    pieces.append(text[last:])
+    return empty.join(pieces), OffsetMap(norms, raws)
+
+
+def _scan_slice(country, text, pos, limit):
+    '''Scans text from pos for addresses starting before limit.
+    Returns (start, end, groupdict) tuples relative to text.
+    '''
+    if text.isascii():
+        compiled_rules = load_ascii_rules(country)
+    else:
+        compiled_rules = load_rules(country)[1]
+    candidates = []
+    for match in compiled_rules.finditer(text, pos):
+        if match.start() >= limit:
+            break
+        candidates.append((match.start(), match.end(), match.groupdict()))
+    return candidates
+
+
+def _salt_value(value):
+    '''Returns a stand-in for an option value which is the same in every
+    process: plain values as they are, objects by their cache_salt or
+    their qualified name, never by a repr holding their address
+    '''
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    salt = getattr(value, 'cache_salt', None)
+    if salt is not None:
+        return salt
+    named = value if hasattr(value, '__qualname__') else type(value)
+    return '{0}.{1}'.format(named.__module__, named.__qualname__)
+
+
 class AddressParser:
+    '''Detects addresses in text using country-specific rules.
+
+    Parsing keeps no per-call state on the instance: the normalized text
+    and the matches only live for the duration of a single ``parse`` call.
+    One parser can therefore be shared by any number of threads.
+
+    Pickling a parser only stores its configuration; the unpickled copy
+    picks up compiled rules from the registry of the receiving process.
+    '''
 
     def __init__(self, **args):
         '''Initialize with custom arguments'''
+        self._options = dict(args)
         for k, v in six.iteritems(args):
             # store country id in uppercase
             if k == 'country':
                 v = v.upper()
             setattr(self, k, v)
         try:
-            # import detection rules
-            package = 'pyap' + '.source_' + self.country + \
-                '.data'
-            data = importlib.import_module(package)
-            self.rules = data.full_address
-
+            country = self.country
         except AttributeError:
             raise e.NoCountrySelected(
                 'No country specified during library initialization.',
                 'Error 1')
+        self.rules, self._compiled_rules = load_rules(country)
+        if self.cache is not None:
+            # cache keys are salted with everything that affects results
+            self._cache_salt = repr(sorted(
+                (k, _salt_value(v)) for k, v in six.iteritems(dict(
+                    self._options, country=country,
+                    version=__version__,
+                    rules=rules_fingerprint(country)))
+                if k not in ('cache', 'memo'))).encode('utf-8')
+        if self.memo is True:
+            from .cache import AddressMemo
+            self.memo = AddressMemo()
+        if self.postal_check is True:
+            from .canonical import PostalCheck
+            self.postal_check = PostalCheck(country)
+
+    def __getstate__(self):
+        return self._options
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    # Longest text an address (or an attempt to match one) may span.
+    # Used as the overlap between pieces of a document scanned in parallel.
+    max_address_length = 1024
+
+    # With layout=True the text is first split into blocks (paragraphs,
+    # runs of at most max_block_lines lines no longer than
+    # max_line_length) and every block is scanned on its own. Runs of
+    # short lines are cut into windows sharing max_address_lines - 1
+    # lines, the most an address can span and still be found whole.
+    layout = False
+    max_block_lines = 8
+    max_line_length = 60
+    max_address_lines = 4
 
-        except ImportError:
-            raise e.CountryDetectionMissing(
-                'Detection rules for country "{country}" not found.'.
-                format(country=self.country), 'Error 2'
-            )
+    # A pyap.cache.LRUCache (or anything with the same get/put methods)
+    # to look documents up in before parsing them.
+    cache = None
+    # A pyap.cache.AddressMemo (or True for a new one) remembering the
+    # address built for every matched text.
+    memo = None
+    # True (or a pyap.canonical.PostalCheck) to drop addresses whose
+    # postal code does not agree with their state or province.
+    postal_check = None
 
-    def parse(self, text):
+    def parse(self, text, workers=None):
         '''Returns a list of addresses found in text
-        together with parsed address parts
+        together with parsed address parts.
+        When workers is set, a large text is split into pieces
+        which are scanned by that many processes; this can not be
+        combined with layout=True.
+
+        Offsets (match_start, match_end) are positions in the normalized
+        text. With layout=True, which scans every block of text on its
+        own, they are positions in text itself.
         '''
+        if workers and workers > 1 and self.layout:
+            raise ValueError('workers can not be used with layout=True.')
+        if self.cache is None:
+            return self._parse(text, workers)
+
+        # caches are optional, and sqlite3 is slow to import
+        from . import cache as result_cache
+        key = result_cache.document_key(text, self._cache_salt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return [address.Address(**fields) for fields in cached]
+        results = self._parse(text, workers)
+        fields = [dict(found.as_dict()) for found in results]
+        self.cache.put(key, fields, result_cache.result_size(fields))
+        return results
+
+    def _parse(self, text, workers=None):
         results = []
-        if isinstance(text, str):
-            if six.PY2:
-                text = unicode(text, 'utf-8')
-        self.clean_text = self._normalize_string(text)
+        if self.layout:
+            return self._checked(self._parse_blocks(text))
+        clean_text = self._normalize_string(text)
+
+        if workers and workers > 1 and \
+                len(clean_text) > 4 * self.max_address_length:
+            candidates = self._scan_parallel(clean_text, workers)
+            return self._checked([self._build_address(groups, start, end)
+                                  for start, end, groups in candidates])
 
         # get addresses
-        address_matches = utils.finditer(self.rules, self.clean_text)
+        address_matches = list(
+            self._rules_for(clean_text).finditer(clean_text))
         if address_matches:
             # append parsed address info
-            results = list(map(self._parse_address, address_matches))
+            results = self._checked(
+                list(map(self._parse_address, address_matches)))
+
+        return results
+
+    # Parsing stages: parse(text) returns the same addresses as
+    # build(extract(scan(normalize(text)))). Running the stages separately
+    # lets pyap.pipeline connect them with queues.
+
+    def normalize(self, text):
+        '''Stage 1: returns normalized text'''
+        return self._normalize_string(text)
+
+    def scan(self, clean_text):
+        '''Stage 2: returns (start, end, groupdict) address candidates
+        found in normalized text
+        '''
+        return [(match.start(), match.end(), match.groupdict())
+                for match in self._rules_for(clean_text).finditer(clean_text)]
+
+    def extract(self, candidates):
+        '''Stage 3: returns a dict of address fields for each candidate'''
+        return [self._extract_fields(groups, start, end)
+                for start, end, groups in candidates]
+
+    def build(self, fields):
+        '''Stage 4: returns Address objects for dicts of fields'''
+        return self._checked([address.Address(**item) for item in fields])
+
+    def _scan_parallel(self, text, workers):
+        '''Scans pieces of text in worker processes and merges the
+        candidates into exactly what a single finditer pass returns
+        '''
+        from concurrent.futures import ProcessPoolExecutor
+
+        overlap = self.max_address_length
+        bounds = self._split_points(text, workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for start, end in zip(bounds, bounds[1:]):
+                # pieces overlap on both sides: the head gives lookbehinds
+                # their context, the tail lets matches run past the end
+                head = max(0, start - overlap)
+                tail = min(len(text), end + overlap)
+                futures.append(executor.submit(
+                    _scan_slice, self.country, text[head:tail],
+                    start - head, end - head))
+            pieces = []
+            for head_start, future in zip(bounds, futures):
+                head = max(0, head_start - overlap)
+                pieces.append([(s + head, e + head, groups)
+                               for s, e, groups in future.result()])
+        return self._merge_pieces(text, bounds, pieces)
+
+    @staticmethod
+    def _split_points(text, pieces):
+        '''Returns piece boundaries, moved forward to the next space
+        so that pieces start at the beginning of a word
+        '''
+        size = len(text) // pieces
+        bounds = [0]
+        for i in range(1, pieces):
+            point = text.find(' ', i * size)
+            point = len(text) if point == -1 else point + 1
+            if point > bounds[-1]:
+                bounds.append(point)
+        if bounds[-1] < len(text):
+            bounds.append(len(text))
+        return bounds
+
+    def _merge_pieces(self, text, bounds, pieces):
+        '''Stitches the candidates of every piece into the sequence of
+        matches a single scan would produce. A piece is only trusted from
+        positions its own scan resumed at (its start and the ends of its
+        matches); anywhere else, e.g. after a match crossing into the next
+        piece, the text is searched directly until both agree again.
+        Candidates touching the end of their piece are searched again too.
+        '''
+        overlap = self.max_address_length
+        resumed = dict((start, index) for index, start in
+                       enumerate(bounds[:-1]))
+        starts = []
+        for index, candidates in enumerate(pieces):
+            starts.append([candidate[0] for candidate in candidates])
+            for candidate in candidates:
+                resumed.setdefault(candidate[1], index)
 
+        compiled_rules = self._rules_for(text)
+        results = []
+        pos = 0
+        while pos < len(text):
+            index = resumed.get(pos)
+            candidate = None
+            if index is not None:
+                i = bisect.bisect_left(starts[index], pos)
+                if i < len(starts[index]):
+                    candidate = pieces[index][i]
+                    if candidate[1] >= bounds[index + 1] + overlap:
+                        # may have been cut short by the end of the piece
+                        index = None
+                elif pos < bounds[index + 1]:
+                    # nothing else starts inside this piece
+                    pos = bounds[index + 1]
+                    continue
+                else:
+                    index = None
+            if index is None:
+                match = compiled_rules.search(text, pos)
+                if match is None:
+                    break
+                candidate = (match.start(), match.end(), match.groupdict())
+            results.append(candidate)
+            pos = max(candidate[1], candidate[0] + 1)
         return results
 
+    def parse_stream(self, chunks):
+        '''Parses an iterable of text chunks as one document, yielding
+        addresses as soon as they are found. Only a small window of the
+        document is kept in memory; offsets are the same as ``parse``
+        reports for the concatenated text
+        '''
+        scanner = ChunkedParser(self)
+        for chunk in chunks:
+            for found in scanner.feed(chunk):
+                yield found
+        for found in scanner.close():
+            yield found
+
+    def parse_many(self, texts, workers=None):
+        '''Returns a list of address lists, one for each text.
+        When workers is set, texts are parsed by a pool of that many
+        threads sharing this parser
+        '''
+        if self.cache is not None:
+            return self._parse_many_cached(texts, workers)
+        if not workers or workers < 2:
+            return [self.parse(text) for text in texts]
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.parse, texts))
+
+    def _parse_blocks(self, text):
+        '''Scans every layout block of text on its own. Offsets of
+        the addresses are positions in text, not in normalized text.
+        '''
+        candidates = []
+        for start, end in layout_blocks.split_blocks(
+                text, self.max_block_lines, self.max_line_length,
+                self.max_address_lines):
+            clean_text, offsets = normalize_with_offsets(text[start:end])
+            for match in self._rules_for(clean_text).finditer(clean_text):
+                candidates.append((start + offsets.to_raw(match.start()),
+                                   start + offsets.to_raw(match.end()),
+                                   match))
+        # overlapping windows may find an address twice, or cut short;
+        # keep the earliest and longest match
+        candidates.sort(key=lambda candidate: (candidate[0], -candidate[1]))
+        results = []
+        end = -1
+        for start, stop, match in candidates:
+            if start >= end:
+                results.append(self._match_address(match, start, stop))
+                end = max(stop, start + 1)
+        return results
+
+    def _rules_for(self, text):
+        '''Returns the compiled rules to scan text with: the cheaper
+        re.ASCII variant when text is pure ASCII (a constant time check).
+        str.isascii and re.ASCII need Python 3.7 or later.
+        '''
+        if text.isascii():
+            return load_ascii_rules(self.country)
+        return self._compiled_rules
+
+    def _parse_many_cached(self, texts, workers):
+        '''parse_many with one batch lookup and one batch insert'''
+        from . import cache as result_cache
+        texts = list(texts)
+        keys = [result_cache.document_key(text, self._cache_salt)
+                for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        # parse every distinct missing document once
+        todo = list(dict((keys[i], texts[i]) for i in missing).items())
+        if not workers or workers < 2:
+            parsed = [self._parse(text) for _, text in todo]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                parsed = list(executor.map(
+                    self._parse, [text for _, text in todo]))
+        items = []
+        for (key, _), results in zip(todo, parsed):
+            fields = [dict(found.as_dict()) for found in results]
+            cached[key] = fields
+            items.append((key, fields, result_cache.result_size(fields)))
+        self.cache.put_many(items)
+        return [[address.Address(**fields) for fields in cached[key]]
+                for key in keys]
+
     def _parse_address(self, match):
         '''Parses address into parts'''
         if isinstance(match, str):
-            # If the address is passed as a match it saves foing the match twice
-            match = utils.match(self.rules, match, flags=re.VERBOSE | re.U)
+            # If the address is passed as a match it saves doing
+            # the match twice
+            match = self._compiled_rules.match(match)
         if match:
-            match_as_dict = match.groupdict()
-            match_as_dict.update({'country_id': self.country})
-            # combine results
-            cleaned_dict = self._combine_results(match_as_dict)
-            cleaned_dict['match_start'] = match.start()
-            cleaned_dict['match_end'] = match.end()
-            # create object containing results
-            return address.Address(**cleaned_dict)
+            return self._match_address(match, match.start(), match.end())
 
         return False
 
+    def _match_address(self, match, start, end, groups=None):
+        '''Builds the address of a match found at start:end. With a memo
+        an address seen before is copied instead of extracted again.
+        groups, if given, turns the match into its groupdict.
+        '''
+        memo = self.memo
+        if memo is None:
+            return self._build_address(
+                groups(match) if groups else match.groupdict(), start, end)
+        key = (self.country, match.group())
+        found = memo.get(key)
+        if found is not None:
+            return found.with_offsets(start, end)
+        result = self._build_address(
+            groups(match) if groups else match.groupdict(), start, end)
+        # keep a copy the caller can not change
+        memo.put(key, result.with_offsets(start, end))
+        return result
+
+    def _checked(self, results):
+        '''Drops addresses failing the postal check, if there is one'''
+        check = self.postal_check
+        if check is None or check is False:
+            return results
+        return [found for found in results if check(found.data_as_dict)]
+
+    def _build_address(self, match_as_dict, start, end):
+        '''Creates Address object from matched groups and offsets'''
+        # create object containing results
+        return address.Address(
+            **self._extract_fields(match_as_dict, start, end))
+
+    def _extract_fields(self, match_as_dict, start, end):
+        '''Turns matched groups into the fields of an Address'''
+        match_as_dict.update({'country_id': self.country})
+        # combine results
+        cleaned_dict = self._combine_results(match_as_dict)
+        cleaned_dict['match_start'] = start
+        cleaned_dict['match_end'] = end
+        return cleaned_dict
+
     @staticmethod
     def _combine_results(match_as_dict):
             '''Combine results from different parsed parts:
@@ -132,3 +614,162 @@ class AddressParser:
         for find, replace in six.iteritems(conversion):
             text = re.sub(find, replace, text, flags=re.UNICODE)
         return text
+
+
+class ChunkedParser(object):
+    '''Incremental parsing of a document which arrives in chunks.
+
+    Chunks are normalized up to their last non-separator character, so
+    the normalized text is the same as if the whole document had been
+    normalized at once. Scanning stops max_address_length characters
+    before the end of what has been received, which keeps every accepted
+    match identical to what a single pass over the whole text finds.
+    '''
+
+    # type of the text taken by feed()
+    text_type = str
+
+    def __init__(self, parser, rules=None):
+        self.parser = parser
+        self.rules = rules
+        self._raw = self._buffer = self.text_type()
+        self._offset = 0
+        self._pos = 0
+
+    def feed(self, text):
+        '''Adds a chunk of text, returns the addresses completed by it'''
+        raw = self._raw + text
+        # keep a trailing run of separators back: the next chunk
+        # may continue it and the run is normalized as a whole
+        cut = self._cut(raw)
+        self._raw = raw[cut:]
+        if cut:
+            self._normalize(raw[:cut])
+        return self._scan(len(self._buffer) - self.parser.max_address_length)
+
+    def close(self):
+        '''Flushes the rest of the document, returns remaining addresses'''
+        if self._raw:
+            self._normalize(self._raw)
+            self._raw = self.text_type()
+        return self._scan(len(self._buffer), final=True)
+
+    @staticmethod
+    def _cut(raw):
+        '''Returns the length of the part of raw which can be normalized
+        without seeing what follows it
+        '''
+        cut = len(raw)
+        while cut and (raw[cut - 1].isspace() or raw[cut - 1] == ','):
+            cut -= 1
+        return cut
+
+    def _normalize(self, raw):
+        '''Appends normalized raw text to the buffer'''
+        self._buffer += self.parser._normalize_string(raw)
+
+    def _address(self, match):
+        '''Builds the address of a match found in the buffer'''
+        return self.parser._match_address(
+            match, match.start() + self._offset, match.end() + self._offset)
+
+    def _discard(self, keep):
+        '''Drops the first keep characters of the buffer'''
+        self._buffer = self._buffer[keep:]
+        self._offset += keep
+
+    def _scan(self, limit, final=False):
+        if not final and limit - self._pos < self.parser.max_address_length:
+            # wait for more text instead of rescanning the same tail
+            return []
+        results = []
+        pos = self._pos
+        rules = self.parser._rules_for(self._buffer) \
+            if self.rules is None else self.rules
+        for match in rules.finditer(self._buffer, pos):
+            if match.start() > limit and not final:
+                break
+            results.append(self._address(match))
+            pos = match.end()
+        results = self.parser._checked(results)
+        # positions up to limit can not start another match now; keep
+        # some text before the resume point as context for lookbehinds
+        resume = len(self._buffer) if final else max(pos, limit + 1)
+        keep = max(0, resume - self.parser.max_address_length)
+        self._discard(keep)
+        self._pos = resume - keep
+        return results
+
+
+class OffsetChunkedParser(ChunkedParser):
+    '''ChunkedParser which reports offsets into the text it is fed
+    rather than into the normalized text.
+
+    Input is normalized in blocks of about block_size characters. The
+    offset map of a block is only worked out once a match lands in it.
+    '''
+
+    block_size = 1 << 16
+    # a character after which text can be split without changing
+    # how either side is normalized
+    _safe_end = re.compile(r'[^\s,]')
+
+    def __init__(self, parser, rules=None):
+        super(OffsetChunkedParser, self).__init__(parser, rules)
+        self._raw_offset = 0
+        # normalized and raw start of every block still in the buffer
+        self._norm_starts = []
+        self._raw_starts = []
+        self._blocks = []
+        self._maps = {}
+
+    @property
+    def raw_start(self):
+        '''Raw offset before which no address can be reported anymore'''
+        return self._raw_starts[0] if self._raw_starts else self._raw_offset
+
+    def _normalize_block(self, block):
+        return self.parser._normalize_string(block)
+
+    def _normalize(self, raw):
+        start = 0
+        pieces = []
+        norm_start = self._offset + len(self._buffer)
+        while start < len(raw):
+            found = self._safe_end.search(raw, start + self.block_size)
+            end = found.end() if found else len(raw)
+            block = raw[start:end]
+            clean = self._normalize_block(block)
+            self._norm_starts.append(norm_start)
+            self._raw_starts.append(self._raw_offset + start)
+            self._blocks.append(block)
+            pieces.append(clean)
+            norm_start += len(clean)
+            start = end
+        self._raw_offset += len(raw)
+        self._buffer += self.text_type().join(pieces)
+
+    def _to_raw(self, pos):
+        i = bisect.bisect_right(self._norm_starts, pos) - 1
+        if i not in self._maps:
+            self._maps = {i: normalize_with_offsets(self._blocks[i])[1]}
+        return self._raw_starts[i] + \
+            self._maps[i].to_raw(pos - self._norm_starts[i])
+
+    def _groups(self, match):
+        return match.groupdict()
+
+    def _address(self, match):
+        return self.parser._match_address(
+            match, self._to_raw(match.start() + self._offset),
+            self._to_raw(match.end() + self._offset), self._groups)
+
+    def _discard(self, keep):
+        super(OffsetChunkedParser, self)._discard(keep)
+        first = max(0, bisect.bisect_right(self._norm_starts,
+                                           self._offset) - 1)
+        if first:
+            del self._norm_starts[:first]
+            del self._raw_starts[:first]
+            del self._blocks[:first]
+            self._maps = {}
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.pipeline
+    ~~~~~~~~~~~~~~~~
+
+    This module connects parsing stages (normalize, scan, extract, build)
+    with bounded queues. Every stage runs in its own thread or process, so
+    a slow stage or sink holds back the reader instead of letting
+    documents pile up in memory.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import time
+import queue
+import threading
+import multiprocessing
+
+from . import exceptions as e
+
+# marks the end of the stream in a queue
+_DONE = '__pyap_pipeline_done__'
+
+
+def parser_stages(parser):
+    '''Returns the stages of AddressParser.parse as (name, function) pairs'''
+    return [
+        ('normalize', parser.normalize),
+        ('scan', parser.scan),
+        ('extract', parser.extract),
+        ('build', parser.build),
+    ]
+
+
+def _run_stage(name, func, inbox, outbox, reports):
+    '''Applies func to every (key, value) item of inbox and puts the
+    results into outbox. After a failure the rest of the input is drained
+    so that upstream stages are never blocked on a full queue.
+    '''
+    items = 0
+    busy = 0.0
+    error = None
+    while True:
+        item = inbox.get()
+        if item == _DONE:
+            break
+        if error is not None:
+            continue
+        key, value = item
+        start = time.perf_counter()
+        try:
+            value = func(value)
+        except Exception as exc:
+            error = '{0}: {1!r}'.format(name, exc)
+            continue
+        busy += time.perf_counter() - start
+        items += 1
+        outbox.put((key, value))
+    outbox.put(_DONE)
+    reports.put((name, items, busy, error))
+
+
+class Pipeline(object):
+    '''Chain of stages connected by queues holding at most maxsize items.
+
+    stages is a list of (name, function) pairs, each function taking the
+    output of the previous one. With backend='process' stages run in
+    separate processes and their functions must be picklable (methods of
+    an AddressParser are)::
+
+        pipeline = Pipeline(parser_stages(AddressParser(country='US')))
+        stats = pipeline.run(documents, sink)
+    '''
+
+    def __init__(self, stages, maxsize=64, backend='thread'):
+        if backend not in ('thread', 'process'):
+            raise ValueError('backend must be "thread" or "process"')
+        self.stages = list(stages)
+        self.maxsize = maxsize
+        self.backend = backend
+
+    def run(self, documents, sink):
+        '''Feeds documents through the stages and calls sink(key, result)
+        for every document in order. documents yields texts or
+        (key, text) pairs; texts are keyed by their position.
+        Returns per-stage statistics.
+        '''
+        if self.backend == 'process':
+            context = multiprocessing.get_context()
+            make_queue = context.Queue
+            reports = context.Queue()
+            start_worker = context.Process
+        else:
+            make_queue = queue.Queue
+            reports = queue.Queue()
+            start_worker = threading.Thread
+
+        queues = [make_queue(self.maxsize)
+                  for _ in range(len(self.stages) + 1)]
+        workers = [
+            start_worker(target=_run_stage,
+                         args=(name, func, queues[i], queues[i + 1],
+                               reports))
+            for i, (name, func) in enumerate(self.stages)]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        sink_stats = {'items': 0, 'busy': 0.0, 'error': None}
+        consumer = threading.Thread(
+            target=self._consume, args=(queues[-1], sink, sink_stats))
+        consumer.start()
+
+        start = time.perf_counter()
+        items = 0
+        try:
+            for key, text in self._keyed(documents):
+                queues[0].put((key, text))
+                items += 1
+        finally:
+            queues[0].put(_DONE)
+            consumer.join()
+            for worker in workers:
+                worker.join()
+        elapsed = time.perf_counter() - start
+
+        finished = dict((report[0], report) for report in
+                        (reports.get() for _ in self.stages))
+        stats = [self._stats('read', items, elapsed, elapsed)]
+        errors = []
+        for name, _ in self.stages:
+            _, done, busy, error = finished[name]
+            stats.append(self._stats(name, done, busy, elapsed))
+            if error:
+                errors.append(error)
+        stats.append(self._stats(
+            'sink', sink_stats['items'], sink_stats['busy'], elapsed))
+        if sink_stats['error']:
+            errors.append(sink_stats['error'])
+        if errors:
+            raise e.PipelineError('; '.join(errors), errors)
+        return stats
+
+    @staticmethod
+    def _keyed(documents):
+        for position, document in enumerate(documents):
+            if isinstance(document, tuple):
+                yield document
+            else:
+                yield position, document
+
+    @staticmethod
+    def _consume(outbox, sink, sink_stats):
+        while True:
+            item = outbox.get()
+            if item == _DONE:
+                break
+            if sink_stats['error']:
+                continue
+            start = time.perf_counter()
+            try:
+                sink(*item)
+            except Exception as exc:
+                sink_stats['error'] = 'sink: {0!r}'.format(exc)
+                continue
+            sink_stats['busy'] += time.perf_counter() - start
+            sink_stats['items'] += 1
+
+    @staticmethod
+    def _stats(name, items, busy, elapsed):
+        return {
+            'stage': name,
+            'items': items,
+            'busy_seconds': busy,
+            # how fast the stage is on its own
+            'items_per_second': items / busy if busy else 0.0,
+            # how busy it kept its worker during the run
+            'utilization': busy / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.pool
+    ~~~~~~~~~~~~~~~~
+
+    This module contains ParserPool, a persistent pool of worker processes
+    which import and compile detection rules once and are then reused
+    for any number of batches. Large batches can be handed to the workers
+    through shared memory instead of pickling every text.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+from concurrent.futures import Future
+
+from . import parser
+from . import exceptions as e
+
+# parsers living in a worker process, keyed by country id
+_worker_parsers = {}
+
+
+def _init_worker(countries, options, reports):
+    '''Imports and compiles rules for every country, then reports
+    the time it took, or why it failed, back to the parent process
+    '''
+    start = time.perf_counter()
+    try:
+        for country in countries:
+            _worker_parsers[country] = parser.AddressParser(
+                country=country, **options)
+            parser.load_ascii_rules(country)
+    except Exception as exc:
+        reports.put((os.getpid(), None, '{0}: {1}'.format(
+            type(exc).__name__, exc)))
+        raise
+    reports.put((os.getpid(), time.perf_counter() - start, None))
+
+
+def _parse_chunk(country, texts):
+    '''Parses a chunk of texts in a worker process'''
+    return [_worker_parsers[country].parse(text) for text in texts]
+
+
+def _attach(name):
+    '''Attaches to a shared memory segment owned by the parent process'''
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13 every attached segment is registered with the
+        # resource tracker, which would unlink it when the worker exits
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+
+def _parse_shared(country, name, index):
+    '''Parses documents packed into a shared memory segment.
+    Returns compact (doc_id, start, end, fields) records.
+    '''
+    segment = _attach(name)
+    records = []
+    try:
+        for doc_id, start, end in index:
+            with segment.buf[start:end] as view:
+                text = str(view, 'utf-8')
+            for address in _worker_parsers[country].parse(text):
+                fields = dict(address.as_dict())
+                records.append((doc_id,
+                                fields.pop('match_start'),
+                                fields.pop('match_end'),
+                                fields))
+    finally:
+        segment.close()
+    return records
+
+
+def pack_documents(texts):
+    '''Packs texts into a new shared memory segment as UTF-8.
+    Returns the segment and a list of (doc_id, start, end) byte offsets.
+    The caller is responsible for closing and unlinking the segment.
+    '''
+    encoded = [text.encode('utf-8') for text in texts]
+    segment = shared_memory.SharedMemory(
+        create=True, size=max(1, sum(map(len, encoded))))
+    index = []
+    offset = 0
+    for doc_id, data in enumerate(encoded):
+        segment.buf[offset:offset + len(data)] = data
+        index.append((doc_id, offset, offset + len(data)))
+        offset += len(data)
+    return segment, index
+
+
+class ParserPool(object):
+    '''Pool of warm worker processes for parsing batches of texts.
+
+    Workers are started and warmed up by the constructor, so the first
+    batch does not pay for importing and compiling detection rules::
+
+        with ParserPool(countries=['US', 'CA'], workers=4) as pool:
+            for addresses in pool.map(texts, country='CA'):
+                ...
+    '''
+
+    # seconds to wait for a worker to report that it is warmed up
+    start_timeout = 60
+
+    def __init__(self, countries=('US',), workers=None, **options):
+        self.countries = [country.upper() for country in countries]
+        if not self.countries:
+            raise ValueError('At least one country is required.')
+        # fail early on unknown countries and bad options instead of in
+        # every worker, which the pool would restart again and again
+        for country in self.countries:
+            parser.AddressParser(country=country, **options)
+        self.workers = workers or os.cpu_count() or 1
+
+        context = multiprocessing.get_context()
+        reports = context.Queue()
+        self._pool = context.Pool(
+            self.workers, _init_worker, (self.countries, options, reports))
+        self._lock = threading.Lock()
+        self._queue_depth = 0
+        self.warmup_times = {}
+        try:
+            while len(self.warmup_times) < self.workers:
+                pid, elapsed, error = reports.get(timeout=self.start_timeout)
+                if error is not None:
+                    raise e.PoolStartFailed(
+                        'Worker {0} failed to start: {1}'.format(pid, error),
+                        'Error 6')
+                self.warmup_times[pid] = elapsed
+        except queue.Empty:
+            self._pool.terminate()
+            raise e.PoolStartFailed(
+                'Workers did not start within {0}s.'.format(
+                    self.start_timeout), 'Error 6')
+        except e.PoolStartFailed:
+            self._pool.terminate()
+            raise
+
+    @property
+    def queue_depth(self):
+        '''Number of submitted texts which are not parsed yet'''
+        return self._queue_depth
+
+    def submit(self, text, country=None):
+        '''Schedules parsing of a single text,
+        returns a Future resolving to its list of addresses
+        '''
+        future = self._submit([text], country)
+        result = Future()
+        result.set_running_or_notify_cancel()
+
+        def done(chunk):
+            if chunk.exception() is not None:
+                result.set_exception(chunk.exception())
+            else:
+                result.set_result(chunk.result()[0])
+
+        future.add_done_callback(done)
+        return result
+
+    def map(self, texts, country=None, chunksize=16):
+        '''Parses texts in the pool, yields lists of addresses
+        in the order of texts
+        '''
+        futures = []
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) >= chunksize:
+                futures.append(self._submit(chunk, country))
+                chunk = []
+        if chunk:
+            futures.append(self._submit(chunk, country))
+        for future in futures:
+            for addresses in future.result():
+                yield addresses
+
+    def parse_shared(self, texts, country=None, chunksize=64):
+        '''Parses texts in the pool without pickling them: documents are
+        packed once into shared memory and workers decode only their
+        slices. Returns (doc_id, start, end, fields) records ordered by
+        doc_id, where doc_id is the position of the text in texts.
+        '''
+        segment, index = pack_documents(texts)
+        try:
+            futures = [
+                self._schedule(_parse_shared,
+                               (self._country(country), segment.name,
+                                index[i:i + chunksize]),
+                               len(index[i:i + chunksize]))
+                for i in range(0, len(index), chunksize)]
+            records = []
+            for future in futures:
+                records.extend(future.result())
+            return records
+        finally:
+            segment.close()
+            segment.unlink()
+
+    def _country(self, country):
+        country = country.upper() if country else self.countries[0]
+        if country not in self.countries:
+            raise ValueError(
+                'Country "{country}" was not warmed up in this pool.'.
+                format(country=country))
+        return country
+
+    def _submit(self, texts, country):
+        return self._schedule(
+            _parse_chunk, (self._country(country), texts), len(texts))
+
+    def _schedule(self, func, args, size):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self._track(size)
+
+        def callback(result):
+            self._track(-size)
+            future.set_result(result)
+
+        def error_callback(exc):
+            self._track(-size)
+            future.set_exception(exc)
+
+        self._pool.apply_async(func, args,
+                               callback=callback,
+                               error_callback=error_callback)
+        return future
+
+    def _track(self, delta):
+        with self._lock:
+            self._queue_depth += delta
+
+    def close(self):
+        '''Waits for pending work and stops the workers'''
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
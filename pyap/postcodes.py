@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.postcodes
+    ~~~~~~~~~~~~~~~~
+
+    Postal code extraction on its own, for jobs which only need the
+    postal codes of a text (routing, sharding by region). The postal_code
+    patterns of the country detection rules are compiled by themselves,
+    between boundary checks, and run over the raw text, so offsets point
+    into the text as given.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import re
+import importlib
+
+from . import utils
+from . import exceptions as e
+from .canonical import normalize_postal_code
+
+# a postal code is not part of a longer word or number,
+# nor of a run of numbers joined by dashes
+_BEFORE = r'(?<![\w\-])'
+_AFTER = r'(?!\w|\-\w)'
+
+# compiled postal code rules keyed by (country id, ascii)
+_postcode_registry = {}
+
+
+def load_postcode_rules(country, ascii=False):
+    '''Returns the compiled postal code rules of a country, the re.ASCII
+    variant if ascii is True
+    '''
+    try:
+        return _postcode_registry[country, ascii]
+    except KeyError:
+        pass
+    try:
+        data = importlib.import_module('pyap.source_' + country + '.data')
+    except ImportError:
+        raise e.CountryDetectionMissing(
+            'Detection rules for country "{country}" not found.'.
+            format(country=country), 'Error 2'
+        )
+    flags = re.VERBOSE | re.ASCII if ascii else utils.DEFAULT_FLAGS
+    compiled = re.compile(_BEFORE + data.postal_code + _AFTER, flags)
+    return _postcode_registry.setdefault((country, ascii), compiled)
+
+
+class PostalCodeExtractor(object):
+    '''Finds postal codes without parsing whole addresses::
+
+        extractor = PostalCodeExtractor('CA')
+        extractor.findall('Ship to H2X1Y4 or k1a 0b1')
+        # [(8, 14, 'H2X 1Y4')]
+
+    Results are (start, end, normalized code) tuples, normalized as by
+    pyap.canonical.normalize_postal_code. Like the address rules, the
+    patterns are case sensitive where the postal code format is.
+    '''
+
+    def __init__(self, country):
+        self.country = country.upper()
+        self._rules = load_postcode_rules(self.country)
+        self._ascii_rules = load_postcode_rules(self.country, ascii=True)
+        # the same codes come back again and again
+        self._normalized = {}
+
+    def _rules_for(self, text):
+        return self._ascii_rules if text.isascii() else self._rules
+
+    def finditer(self, text):
+        '''Yields (start, end, code) for every postal code of text'''
+        normalized = self._normalized
+        for match in self._rules_for(text).finditer(text):
+            found = match.group('postal_code')
+            try:
+                code = normalized[found]
+            except KeyError:
+                if len(normalized) >= 1 << 16:
+                    normalized.clear()
+                code = normalized[found] = normalize_postal_code(
+                    found, self.country)
+            yield match.start('postal_code'), match.end('postal_code'), code
+
+    def findall(self, text):
+        '''Returns (start, end, code) for every postal code of text'''
+        return list(self.finditer(text))
+
+    def codes(self, text):
+        '''Returns the distinct normalized postal codes of text, in the
+        order they first appear
+        '''
+        return list(dict.fromkeys(code for _, _, code in self.finditer(text)))
+
+
+def find_postal_codes(text, country='US'):
+    '''Returns (start, end, code) for every postal code of text'''
+    return PostalCodeExtractor(country).findall(text)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.readers
+    ~~~~~~~~~~~~~~~~
+
+    Input adapters which stream plain, gzip, bz2 and xz compressed files
+    and the members of zip archives straight into the chunked parser,
+    without decompressing anything to disk.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+import zipfile
+import contextlib
+
+from . import parser
+
+# openers of single-stream compressed files, by file extension
+COMPRESSED = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open,
+}
+
+
+def iter_chunks(stream, chunk_size):
+    '''Reads a text stream in chunks instead of loading it whole'''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _opener(name):
+    return COMPRESSED.get(os.path.splitext(name)[1].lower())
+
+
+def members(path):
+    '''Returns the names of the documents in a zip archive,
+    or [None] for any other file
+    '''
+    if not zipfile.is_zipfile(path):
+        return [None]
+    with zipfile.ZipFile(path) as archive:
+        return [info.filename for info in archive.infolist()
+                if not info.is_dir()]
+
+
+def document_id(path, member=None):
+    '''Identifies a file or a member of a zip archive: "path!member"'''
+    return path if member is None else '{0}!{1}'.format(path, member)
+
+
+# the zip archive this process read a member of last, kept open:
+# opening an archive reads its whole central directory, so opening it
+# again for every member makes reading an archive quadratic
+_shared_archive = [None]
+
+
+def shared_archive(path):
+    '''Returns an open ZipFile of path, reused by later calls of this
+    process for the same archive. For workers handed one member at a time.
+    '''
+    archive = _shared_archive[0]
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if archive is None or archive[0] != key:
+        if archive is not None:
+            archive[1].close()
+        archive = _shared_archive[0] = (key, zipfile.ZipFile(path))
+    return archive[1]
+
+
+@contextlib.contextmanager
+def open_document(path, member=None, encoding='utf-8', errors='replace',
+                  archive=None):
+    '''Opens a file, or a member of a zip archive, as a text stream.
+    Files and members named *.gz, *.bz2, *.xz or *.lzma are
+    decompressed on the fly. archive is the zip archive at path if it
+    is already open; otherwise it is opened for this member alone.
+    '''
+    if member is None:
+        opener = _opener(path)
+        if opener is None:
+            with open(path, encoding=encoding, errors=errors) as f:
+                yield f
+        else:
+            with opener(path, 'rt', encoding=encoding,
+                        errors=errors) as f:
+                yield f
+        return
+    if archive is None:
+        with zipfile.ZipFile(path) as archive:
+            with _open_member(archive, member, encoding, errors) as f:
+                yield f
+    else:
+        with _open_member(archive, member, encoding, errors) as f:
+            yield f
+
+
+@contextlib.contextmanager
+def _open_member(archive, member, encoding, errors):
+    with archive.open(member) as raw:
+        opener = _opener(member)
+        if opener is not None:
+            raw = opener(raw)
+        with io.TextIOWrapper(raw, encoding=encoding, errors=errors) as f:
+            yield f
+
+
+def iter_documents(path, encoding='utf-8', errors='replace'):
+    '''Yields (member, text stream) for every document of a file: each
+    member of a zip archive, which is opened only once, or (None, stream)
+    for any other file. A stream is closed when the next one is yielded.
+    '''
+    if not zipfile.is_zipfile(path):
+        with open_document(path, None, encoding, errors) as f:
+            yield None, f
+        return
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            with open_document(path, info.filename, encoding, errors,
+                               archive) as f:
+                yield info.filename, f
+
+
+def parse_document(path, member=None, country='US', chunk_size=1 << 20,
+                   encoding='utf-8', archive=None):
+    '''Returns the addresses found in a file or a member of a zip
+    archive, parsed while it is being decompressed
+    '''
+    ap = parser.AddressParser(country=country)
+    with open_document(path, member, encoding, archive=archive) as f:
+        return list(ap.parse_stream(iter_chunks(f, chunk_size)))
+
+
+def _parse_unit(unit, options):
+    path, member = unit
+    archive = None if member is None else shared_archive(path)
+    return document_id(path, member), parse_document(
+        path, member, archive=archive, **options)
+
+
+def parse_archives(paths, country='US', workers=None, chunk_size=1 << 20,
+                   encoding='utf-8'):
+    '''Yields (document id, addresses) for every file and archive member
+    of paths, in order. With workers > 1 the documents are decompressed
+    and parsed by that many processes at the same time.
+    '''
+    parser.load_rules(country.upper())
+    if not workers or workers < 2:
+        ap = parser.AddressParser(country=country)
+        for path in paths:
+            for member, f in iter_documents(path, encoding):
+                yield document_id(path, member), list(
+                    ap.parse_stream(iter_chunks(f, chunk_size)))
+        return
+
+    options = {'country': country, 'chunk_size': chunk_size,
+               'encoding': encoding}
+    units = [(path, member) for path in paths for member in members(path)]
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(_parse_unit, units,
+                                   [options] * len(units)):
+            yield result
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.records
+    ~~~~~~~~~~~~~~~~
+
+    Record-oriented parsing of corpora with one record per line, or with
+    an address-bearing column of a CSV file or field of a JSON lines file.
+    Records are normalized and scanned in large batches instead of one
+    ``parse`` call per record.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import os
+import csv
+import json
+import bisect
+
+from . import parser
+from . import readers
+
+# joins the records of a batch; no detection rule can match it, and to
+# lookarounds it looks the same as the end of a string
+_SEPARATOR = '\x00'
+
+FORMATS = ('lines', 'csv', 'jsonl')
+
+
+def detect_format(path):
+    '''Guesses the record format from the file name,
+    ignoring a compression suffix
+    '''
+    name = path
+    if os.path.splitext(name)[1].lower() in readers.COMPRESSED:
+        name = os.path.splitext(name)[0]
+    extension = os.path.splitext(name)[1].lower()
+    if extension in ('.csv', '.tsv'):
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    return 'lines'
+
+
+def _lookup(item, field):
+    '''Returns a (dotted) field of a JSON object as text'''
+    for key in field.split('.'):
+        if not isinstance(item, dict) or key not in item:
+            return ''
+        item = item[key]
+    return item if isinstance(item, str) else \
+        '' if item is None else str(item)
+
+
+def iter_records(stream, format='lines', field=None, id_field=None,
+                 delimiter=','):
+    '''Yields (record id, text) pairs from a text stream.
+
+    format is "lines", "csv" or "jsonl". field selects the text of a
+    record: a column name or index for CSV, a key (dotted for nested
+    objects) for JSON lines. Record ids are line numbers unless id_field
+    names a column or key holding them.
+    '''
+    if format == 'lines':
+        for number, line in enumerate(stream, 1):
+            yield number, line.rstrip('\r\n')
+    elif format == 'csv':
+        if isinstance(field, int) or field is None:
+            reader = csv.reader(stream, delimiter=delimiter)
+            column = field or 0
+            for row in reader:
+                yield (row[id_field] if id_field is not None
+                       else reader.line_num,
+                       row[column] if column < len(row) else '')
+        else:
+            reader = csv.DictReader(stream, delimiter=delimiter)
+            for row in reader:
+                yield (row[id_field] if id_field is not None
+                       else reader.line_num,
+                       row.get(field) or '')
+    elif format == 'jsonl':
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            yield (_lookup(item, id_field) if id_field is not None
+                   else number,
+                   _lookup(item, field) if field is not None else
+                   item if isinstance(item, str) else '')
+    else:
+        raise ValueError('format must be one of ' + ', '.join(FORMATS))
+
+
+class RecordParser(object):
+    '''Parses many small records with a few large scans.
+
+    The records of a batch are joined, normalized once and scanned once;
+    matches are then mapped back to their records. Results are the same
+    as ``parse`` gives for every record on its own, offsets included.
+
+    With anchored=True every record is expected to hold one address at
+    its start: only a match at the beginning of each record is tried,
+    which is much cheaper than searching the whole record.
+    '''
+
+    def __init__(self, batch_size=1000, anchored=False, **kwargs):
+        self.parser = parser.AddressParser(**kwargs)
+        self.batch_size = batch_size
+        self.anchored = anchored
+
+    def parse(self, records):
+        '''Yields (record id, addresses) for (record id, text) pairs'''
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                for result in self.parse_batch(batch):
+                    yield result
+                batch = []
+        if batch:
+            for result in self.parse_batch(batch):
+                yield result
+
+    def parse_file(self, path, format=None, field=None, id_field=None,
+                   encoding='utf-8', delimiter=','):
+        '''Yields (record id, addresses) for the records of a file,
+        which may be compressed (see pyap.readers)
+        '''
+        with readers.open_document(path, encoding=encoding) as f:
+            records = iter_records(f, format or detect_format(path),
+                                   field, id_field, delimiter)
+            for result in self.parse(records):
+                yield result
+
+    def parse_batch(self, batch):
+        '''Returns (record id, addresses) for a list of
+        (record id, text) pairs
+        '''
+        texts = [text for _, text in batch]
+        if any(_SEPARATOR in text for text in texts):
+            return [(record_id, self.parser.parse(text))
+                    for record_id, text in batch]
+
+        clean_text = self.parser.normalize(_SEPARATOR.join(texts))
+        # normalization never crosses the separator, so records keep
+        # their order and their own normalized text
+        starts = []
+        position = 0
+        for piece in clean_text.split(_SEPARATOR):
+            starts.append(position)
+            position += len(piece) + 1
+        ends = [start - 1 for start in starts[1:]] + [len(clean_text)]
+
+        rules = self.parser._rules_for(clean_text)
+        found = [[] for _ in batch]
+        if self.anchored:
+            for index, (start, end) in enumerate(zip(starts, ends)):
+                match = rules.match(clean_text, start, end)
+                if match is None:
+                    # try again after the separator normalization
+                    # leaves leading whitespace
+                    pos = start
+                    while pos < end and clean_text[pos] in ' ,':
+                        pos += 1
+                    if pos > start:
+                        match = rules.match(clean_text, pos, end)
+                if match:
+                    found[index].append(self._build(match, start))
+            return [(record_id, self.parser._checked(addresses))
+                    for (record_id, _), addresses in zip(batch, found)]
+
+        stale = set()
+        for match in rules.finditer(clean_text):
+            index = bisect.bisect_right(starts, match.start()) - 1
+            last = bisect.bisect_right(
+                starts, max(match.start(), match.end() - 1)) - 1
+            if last != index:
+                # a match running into the next record; should the rules
+                # ever allow one, parse the records involved on their own
+                stale.update(range(index, last + 1))
+                continue
+            found[index].append(self._build(match, starts[index]))
+        for index in stale:
+            found[index] = self.parser.parse(texts[index])
+        return [(record_id, self.parser._checked(addresses))
+                for (record_id, _), addresses in zip(batch, found)]
+
+    def _build(self, match, base):
+        return self.parser._match_address(
+            match, match.start() - base, match.end() - base)
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+
+"""
+    pyap.search
+    ~~~~~~~~~~~~~~~~
+
+    Inverted index over extraction results: postal codes, streets,
+    cities and regions point to the documents they were found in. The
+    index is written to a single file which is memory-mapped for
+    queries, so opening it costs nothing and only the pages a query
+    touches are read.
+
+    :copyright: (c) 2015 by Vladimir Goncharov.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import os
+import io
+import json
+import mmap
+import bisect
+import struct
+from array import array
+
+from . import canonical
+from . import exceptions as e
+
+MAGIC = b'PYAPIDX1'
+FIELDS = ('postal_code', 'street', 'city', 'region')
+
+# magic and header length
+_PREAMBLE = struct.Struct('<8sQ')
+
+
+def index_terms(address):
+    '''Returns (field, term) pairs an Address (or its as_dict(), or the
+    "fields" of a pyap command line record) is indexed under
+    '''
+    fields = address.as_dict() if hasattr(address, 'as_dict') else address
+    country = fields.get('country_id') or 'US'
+    street = ' '.join(part for part in (fields.get('street_name'),
+                                        fields.get('street_type')) if part)
+    postal_code = canonical.postal_code_token(fields.get('postal_code'))
+    terms = [('postal_code', postal_code)]
+    if country == 'US' and len(postal_code) == 9:
+        # a ZIP+4 code is found by its ZIP code too
+        terms.append(('postal_code', postal_code[:5]))
+    return terms + [
+        ('street', canonical.normalize_street(street, country)),
+        ('city', canonical.normalize_city(fields.get('city'))),
+        ('region', canonical.normalize_region(fields.get('region1'),
+                                              country)),
+    ]
+
+
+def query_term(field, text, country='US'):
+    '''Normalizes a query the way index_terms normalizes addresses'''
+    if field == 'postal_code':
+        return canonical.postal_code_token(text)
+    if field == 'street':
+        return canonical.normalize_street(text, country)
+    if field == 'city':
+        return canonical.normalize_city(text)
+    if field == 'region':
+        return canonical.normalize_region(text, country)
+    raise ValueError('unknown field {0!r}'.format(field))
+
+
+class SearchIndexBuilder(object):
+    '''Collects the terms of extraction results and writes them as a
+    SearchIndex::
+
+        builder = SearchIndexBuilder()
+        for path in paths:
+            for address in ap.parse(read(path)):
+                builder.add(path, address)
+        builder.save('addresses.idx')
+
+        index = SearchIndex.open('addresses.idx')
+        index.search(postal_code='750', prefix=True)
+
+    Document ids are stored as strings.
+    '''
+
+    def __init__(self):
+        self._numbers = {}
+        self._documents = []
+        self._postings = dict((field, {}) for field in FIELDS)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _number(self, document):
+        document = str(document)
+        number = self._numbers.get(document)
+        if number is None:
+            number = self._numbers[document] = len(self._documents)
+            self._documents.append(document)
+        return number
+
+    def add(self, document, address):
+        '''Indexes an address found in a document'''
+        number = self._number(document)
+        for field, term in index_terms(address):
+            if not term:
+                continue
+            postings = self._postings[field].get(term)
+            if postings is None:
+                self._postings[field][term] = array('I', [number])
+            elif postings[-1] != number:
+                # documents mostly come one after the other
+                postings.append(number)
+
+    def add_records(self, records):
+        '''Indexes records written by the pyap command line or the batch
+        runner (dicts with "document" and "fields")
+        '''
+        for record in records:
+            if record.get('fields'):
+                self.add(record['document'], record['fields'])
+            else:
+                self._number(record['document'])
+
+    def add_jsonl(self, path):
+        '''Indexes a JSON lines file written by the pyap command line'''
+        with open(path, encoding='utf-8') as f:
+            self.add_records(json.loads(line) for line in f if line.strip())
+
+    def write(self, out):
+        '''Writes the index to a binary stream'''
+        sections = []
+        layout = {}
+
+        def section(data):
+            offset = sum(len(chunk) for chunk in sections)
+            padding = -offset % 8
+            if padding:
+                sections.append(b'\0' * padding)
+                offset += padding
+            sections.append(data)
+            return [offset, len(data)]
+
+        def string_table(strings):
+            encoded = [s.encode('utf-8') for s in strings]
+            offsets = array('Q', [0])
+            for s in encoded:
+                offsets.append(offsets[-1] + len(s))
+            return {'strings': section(b''.join(encoded)),
+                    'offsets': section(offsets.tobytes())}
+
+        layout['documents'] = string_table(self._documents)
+        for field in FIELDS:
+            postings = self._postings[field]
+            terms = sorted(postings, key=lambda term: term.encode('utf-8'))
+            offsets = array('Q', [0])
+            merged = array('I')
+            for term in terms:
+                # a document may come back after others
+                numbers = postings[term]
+                if any(a >= b for a, b in zip(numbers, numbers[1:])):
+                    numbers = array('I', sorted(set(numbers)))
+                merged.extend(numbers)
+                offsets.append(len(merged))
+            layout[field] = {
+                'terms': string_table(terms),
+                'offsets': section(offsets.tobytes()),
+                'postings': section(merged.tobytes()),
+            }
+        header = json.dumps(layout, sort_keys=True).encode('utf-8')
+        header += b' ' * (-len(header) % 8)
+        out.write(_PREAMBLE.pack(MAGIC, len(header)))
+        out.write(header)
+        for chunk in sections:
+            out.write(chunk)
+
+    def to_bytes(self):
+        out = io.BytesIO()
+        self.write(out)
+        return out.getvalue()
+
+    def save(self, path):
+        '''Atomically writes the index to a file'''
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as out:
+            self.write(out)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, path)
+
+    def build(self):
+        '''Returns a SearchIndex of what was added, kept in memory'''
+        return SearchIndex(self.to_bytes())
+
+
+class _Strings(object):
+    '''Sequence of the utf-8 strings of a string table, as bytes'''
+
+    def __init__(self, strings, offsets):
+        self._strings = strings
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._strings[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+
+class SearchIndex(object):
+    '''Read-only inverted index written by SearchIndexBuilder.
+    Queries are normalized like the addresses were (case, spacing,
+    abbreviations); see SearchIndexBuilder for an example.
+    '''
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        try:
+            magic, size = _PREAMBLE.unpack_from(view)
+            if magic != MAGIC:
+                raise ValueError(magic)
+            start = _PREAMBLE.size + size
+            layout = json.loads(
+                view[_PREAMBLE.size:start].tobytes().decode('utf-8'))
+        except (ValueError, struct.error):
+            raise e.SearchIndexInvalid(
+                'Not a pyap search index.', 'Error 5')
+
+        def section(entry, format):
+            offset, length = entry
+            return view[start + offset:start + offset + length].cast(format)
+
+        def string_table(entry):
+            return _Strings(section(entry['strings'], 'B'),
+                            section(entry['offsets'], 'Q'))
+
+        self._documents = string_table(layout['documents'])
+        self._fields = dict(
+            (field, (string_table(layout[field]['terms']),
+                     section(layout[field]['offsets'], 'Q'),
+                     section(layout[field]['postings'], 'I')))
+            for field in FIELDS)
+
+    @classmethod
+    def open(cls, path):
+        '''Memory-maps an index file'''
+        with open(path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty file
+                raise e.SearchIndexInvalid(
+                    'Not a pyap search index: {0}.'.format(path), 'Error 5')
+        return cls(mapped)
+
+    def close(self):
+        '''Releases the views of the index and unmaps its file'''
+        self._documents = self._fields = None
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def document(self, number):
+        '''Returns the id of a document by its number'''
+        return self._documents[number].decode('utf-8')
+
+    def terms(self, field, prefix=''):
+        '''Returns the terms of a field starting with a prefix'''
+        terms = self._fields[field][0]
+        start, end = self._range(terms, prefix.encode('utf-8'), True)
+        return [terms[i].decode('utf-8') for i in range(start, end)]
+
+    @staticmethod
+    def _range(terms, term, prefix):
+        start = bisect.bisect_left(terms, term)
+        if not prefix:
+            found = start < len(terms) and terms[start] == term
+            return start, start + 1 if found else start
+        # no utf-8 sequence contains 0xff, so every term starting with
+        # the prefix sorts before prefix + 0xff
+        return start, bisect.bisect_left(terms, term + b'\xff', start)
+
+    def postings(self, field, term, prefix=False):
+        '''Returns the sorted numbers of the documents containing a
+        normalized term, or any term starting with it if prefix is True
+        '''
+        terms, offsets, postings = self._fields[field]
+        start, end = self._range(terms, term.encode('utf-8'), prefix)
+        if end - start == 1:
+            return postings[offsets[start]:offsets[end]].tolist()
+        return sorted(set(postings[offsets[start]:offsets[end]]))
+
+    def search(self, postal_code=None, street=None, city=None, region=None,
+               country='US', prefix=False):
+        '''Returns ids of the documents mentioning all the given address
+        parts. With prefix=True postal_code may be the start of postal
+        codes, e.g. "750" or "SW1A".
+        '''
+        criteria = [(field, text) for field, text in (
+            ('postal_code', postal_code), ('street', street),
+            ('city', city), ('region', region)) if text]
+        if not criteria:
+            return []
+        found = None
+        for field, text in criteria:
+            numbers = self.postings(field, query_term(field, text, country),
+                                    prefix and field == 'postal_code')
+            found = set(numbers) if found is None else \
+                found.intersection(numbers)
+            if not found:
+                return []
+        return [self.document(number) for number in sorted(found)]
@@ -572,3 +572,12 @@ full_address = r"""
     postal_code_b=postal_code_b,
     postal_code_c=postal_code_c,
 )
+
+# Provinces by the first letter of the postal code (the forward sortation
+# area). Used to drop matches whose postal code and province can not go
+# together.
+postal_code_provinces = {
+    'A': 'NL', 'B': 'NS', 'C': 'PE', 'E': 'NB', 'G': 'QC', 'H': 'QC',
+    'J': 'QC', 'K': 'ON', 'L': 'ON', 'M': 'ON', 'N': 'ON', 'P': 'ON',
+    'R': 'MB', 'S': 'SK', 'T': 'AB', 'V': 'BC', 'X': 'NT NU', 'Y': 'YT',
+}
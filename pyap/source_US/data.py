@@ -14,6 +14,7 @@
     :license: MIT, see LICENSE for more details.
 """
 
+import re
 import string
 
 
@@ -125,115 +126,260 @@ post_direction = r"""
                     )
                 """
 
+# USPS standard suffix abbreviations and the street types they stand for.
 # This list was taken from: https://pe.usps.com/text/pub28/28apc_002.htm
 # Broadway and Lp (abbreviation for Loop) were added to the list
-street_type_list = [
-    'Allee', 'Alley', 'Ally', 'Aly', 'Anex', 'Annex',
-    'Annx', 'Anx', 'Arc', 'Arcade', 'Av', 'Ave',
-    'Aven', 'Avenu', 'Avenue', 'Avn', 'Avnue', 'Bayoo',
-    'Bayou', 'Bch', 'Beach', 'Bend', 'Bg', 'Bgs',
-    'Blf', 'Blfs', 'Bluf', 'Bluff', 'Bluffs', 'Blvd',
-    'Bnd', 'Bot', 'Bottm', 'Bottom', 'Boul', 'Boulevard',
-    'Boulv', 'Br', 'Branch', 'Brdge', 'Brg', 'Bridge',
-    'Brk', 'Brks', 'Brnch', 'Broadway', 'Brook', 'Brooks',
-    'Btm', 'Burg', 'Burgs', 'Byp', 'Bypa', 'Bypas',
-    'Bypass', 'Byps', 'Byu', 'Camp', 'Canyn', 'Canyon',
-    'Cape', 'Causeway', 'Causwa', 'Cen', 'Cent', 'Center',
-    'Centers', 'Centr', 'Centre', 'Cir', 'Circ', 'Circl',
-    'Circle', 'Circles', 'Cirs', 'Clb', 'Clf', 'Clfs',
-    'Cliff', 'Cliffs', 'Club', 'Cmn', 'Cmns', 'Cmp',
-    'Cnter', 'Cntr', 'Cnyn', 'Common', 'Commons', 'Cor',
-    'Corner', 'Corners', 'Cors', 'Course', 'Court', 'Courts',
-    'Cove', 'Coves', 'Cp', 'Cpe', 'Crcl', 'Crcle',
-    'Creek', 'Cres', 'Crescent', 'Crest', 'Crk', 'Crossing',
-    'Crossroad', 'Crossroads', 'Crse', 'Crsent', 'Crsnt', 'Crssng',
-    'Crst', 'Cswy', 'Ct', 'Ctr', 'Ctrs', 'Cts',
-    'Curv', 'Curve', 'Cv', 'Cvs', 'Cyn', 'Dale',
-    'Dam', 'Div', 'Divide', 'Dl', 'Dm', 'Dr',
-    'Driv', 'Drive', 'Drives', 'Drs', 'Drv', 'Dv',
-    'Dvd', 'Est', 'Estate', 'Estates', 'Ests', 'Exp',
-    'Expr', 'Express', 'Expressway', 'Expw', 'Expy', 'Ext',
-    'Extension', 'Extensions', 'Extn', 'Extnsn', 'Exts', 'Fall',
-    'Falls', 'Ferry', 'Field', 'Fields', 'Flat', 'Flats',
-    'Fld', 'Flds', 'Fls', 'Flt', 'Flts', 'Ford',
-    'Fords', 'Forest', 'Forests', 'Forg', 'Forge', 'Forges',
-    'Fork', 'Forks', 'Fort', 'Frd', 'Frds', 'Freeway',
-    'Freewy', 'Frg', 'Frgs', 'Frk', 'Frks', 'Frry',
-    'Frst', 'Frt', 'Frway', 'Frwy', 'Fry', 'Ft',
-    'Fwy', 'Garden', 'Gardens', 'Gardn', 'Gateway', 'Gatewy',
-    'Gatway', 'Gdn', 'Gdns', 'Glen', 'Glens', 'Gln',
-    'Glns', 'Grden', 'Grdn', 'Grdns', 'Green', 'Greens',
-    'Grn', 'Grns', 'Grov', 'Grove', 'Groves', 'Grv',
-    'Grvs', 'Gtway', 'Gtwy', 'Harb', 'Harbor', 'Harbors',
-    'Harbr', 'Haven', 'Hbr', 'Hbrs', 'Heights', 'Highway',
-    'Highwy', 'Hill', 'Hills', 'Hiway', 'Hiwy', 'Hl',
-    'Hllw', 'Hls', 'Hollow', 'Hollows', 'Holw', 'Holws',
-    'Hrbor', 'Ht', 'Hts', 'Hvn', 'Hway', 'Hwy',
-    'Inlet', 'Inlt', 'Is', 'Island', 'Islands', 'Isle',
-    'Isles', 'Islnd', 'Islnds', 'Iss', 'Jct', 'Jction',
-    'Jctn', 'Jctns', 'Jcts', 'Junction', 'Junctions', 'Junctn',
-    'Juncton', 'Key', 'Keys', 'Knl', 'Knls', 'Knol',
-    'Knoll', 'Knolls', 'Ky', 'Kys', 'Lake', 'Lakes',
-    'Land', 'Landing', 'Lane', 'Lck', 'Lcks', 'Ldg',
-    'Ldge', 'Lf', 'Lgt', 'Lgts', 'Light', 'Lights',
-    'Lk', 'Lks', 'Ln', 'Lndg', 'Lndng', 'Loaf',
-    'Lock', 'Locks', 'Lodg', 'Lodge', 'Loop', 'Loops',
-    'Lp', 'Mall', 'Manor', 'Manors', 'Mdw', 'Mdws',
-    'Meadow', 'Meadows', 'Medows', 'Mews', 'Mill', 'Mills',
-    'Mission', 'Missn', 'Ml', 'Mls', 'Mnr', 'Mnrs',
-    'Mnt', 'Mntain', 'Mntn', 'Mntns', 'Motorway', 'Mount',
-    'Mountain', 'Mountains', 'Mountin', 'Msn', 'Mssn', 'Mt',
-    'Mtin', 'Mtn', 'Mtns', 'Mtwy', 'Nck', 'Neck',
-    'Opas', 'Orch', 'Orchard', 'Orchrd', 'Oval', 'Overpass',
-    'Ovl', 'Park', 'Parks', 'Parkway', 'Parkways', 'Parkwy',
-    'Pass', 'Passage', 'Path', 'Paths', 'Pike', 'Pikes',
-    'Pine', 'Pines', 'Pkway', 'Pkwy', 'Pkwys', 'Pky',
-    'Pl', 'Place', 'Plain', 'Plains', 'Plaza', 'Pln',
-    'Plns', 'Plz', 'Plza', 'Pne', 'Pnes', 'Point',
-    'Points', 'Port', 'Ports', 'Pr', 'Prairie', 'Prk',
-    'Prr', 'Prt', 'Prts', 'Psge', 'Pt', 'Pts',
-    'Rad', 'Radial', 'Radiel', 'Radl', 'Ramp', 'Ranch',
-    'Ranches', 'Rapid', 'Rapids', 'Rd', 'Rdg', 'Rdge',
-    'Rdgs', 'Rds', 'Rest', 'Ridge', 'Ridges', 'Riv',
-    'River', 'Rivr', 'Rnch', 'Rnchs', 'Road', 'Roads',
-    'Route', 'Row', 'Rpd', 'Rpds', 'Rst', 'Rte',
-    'Rue', 'Run', 'Rvr', 'Shl', 'Shls', 'Shoal',
-    'Shoals', 'Shoar', 'Shoars', 'Shore', 'Shores', 'Shr',
-    'Shrs', 'Skwy', 'Skyway', 'Smt', 'Spg', 'Spgs',
-    'Spng', 'Spngs', 'Spring', 'Springs', 'Sprng', 'Sprngs',
-    'Spur', 'Spurs', 'Sq', 'Sqr', 'Sqre', 'Sqrs',
-    'Sqs', 'Squ', 'Square', 'Squares', 'St', 'Sta',
-    'Station', 'Statn', 'Stn', 'Str', 'Stra', 'Strav',
-    'Straven', 'Stravenue', 'Stravn', 'Stream', 'Street', 'Streets',
-    'Streme', 'Strm', 'Strt', 'Strvn', 'Strvnue', 'Sts',
-    'Sumit', 'Sumitt', 'Summit', 'Ter', 'Terr', 'Terrace',
-    'Throughway', 'Tpke', 'Trace', 'Traces', 'Track', 'Tracks',
-    'Trafficway', 'Trail', 'Trailer', 'Trails', 'Trak', 'Trce',
-    'Trfy', 'Trk', 'Trks', 'Trl', 'Trlr', 'Trlrs',
-    'Trls', 'Trnpk', 'Trwy', 'Tunel', 'Tunl', 'Tunls',
-    'Tunnel', 'Tunnels', 'Tunnl', 'Turnpike', 'Turnpk', 'Un',
-    'Underpass', 'Union', 'Unions', 'Uns', 'Upas', 'Valley',
-    'Valleys', 'Vally', 'Vdct', 'Via', 'Viadct', 'Viaduct',
-    'View', 'Views', 'Vill', 'Villag', 'Village', 'Villages',
-    'Ville', 'Villg', 'Villiage', 'Vis', 'Vist', 'Vista',
-    'Vl', 'Vlg', 'Vlgs', 'Vlly', 'Vly', 'Vlys',
-    'Vst', 'Vsta', 'Vw', 'Vws', 'Walk', 'Walks',
-    'Wall', 'Way', 'Ways', 'Well', 'Wells', 'Wl',
-    'Wls', 'Wy', 'Xing', 'Xrd', 'Xrds',
-]
+street_type_abbreviations = {
+    'ALY': 'Allee Alley Ally Aly',
+    'ANX': 'Anex Annex Annx Anx',
+    'ARC': 'Arc Arcade',
+    'AVE': 'Av Ave Aven Avenu Avenue Avn Avnue',
+    'BCH': 'Bch Beach',
+    'BG': 'Bg Burg',
+    'BGS': 'Bgs Burgs',
+    'BLF': 'Blf Bluf Bluff',
+    'BLFS': 'Blfs Bluffs',
+    'BLVD': 'Blvd Boul Boulevard Boulv',
+    'BND': 'Bend Bnd',
+    'BR': 'Br Branch Brnch',
+    'BRG': 'Brdge Brg Bridge',
+    'BRK': 'Brk Brook',
+    'BRKS': 'Brks Brooks',
+    'BROADWAY': 'Broadway',
+    'BTM': 'Bot Bottm Bottom Btm',
+    'BYP': 'Byp Bypa Bypas Bypass Byps',
+    'BYU': 'Bayoo Bayou Byu',
+    'CIR': 'Cir Circ Circl Circle Crcl Crcle',
+    'CIRS': 'Circles Cirs',
+    'CLB': 'Clb Club',
+    'CLF': 'Clf Cliff',
+    'CLFS': 'Clfs Cliffs',
+    'CMN': 'Cmn Common',
+    'CMNS': 'Cmns Commons',
+    'COR': 'Cor Corner',
+    'CORS': 'Corners Cors',
+    'CP': 'Camp Cmp Cp',
+    'CPE': 'Cape Cpe',
+    'CRES': 'Cres Crescent Crsent Crsnt',
+    'CRK': 'Creek Crk',
+    'CRSE': 'Course Crse',
+    'CRST': 'Crest Crst',
+    'CSWY': 'Causeway Causwa Cswy',
+    'CT': 'Court Ct',
+    'CTR': 'Cen Cent Center Centr Centre Cnter Cntr Ctr',
+    'CTRS': 'Centers Ctrs',
+    'CTS': 'Courts Cts',
+    'CURV': 'Curv Curve',
+    'CV': 'Cove Cv',
+    'CVS': 'Coves Cvs',
+    'CYN': 'Canyn Canyon Cnyn Cyn',
+    'DL': 'Dale Dl',
+    'DM': 'Dam Dm',
+    'DR': 'Dr Driv Drive Drv',
+    'DRS': 'Drives Drs',
+    'DV': 'Div Divide Dv Dvd',
+    'EST': 'Est Estate',
+    'ESTS': 'Estates Ests',
+    'EXPY': 'Exp Expr Express Expressway Expw Expy',
+    'EXT': 'Ext Extension Extn Extnsn',
+    'EXTS': 'Extensions Exts',
+    'FALL': 'Fall',
+    'FLD': 'Field Fld',
+    'FLDS': 'Fields Flds',
+    'FLS': 'Falls Fls',
+    'FLT': 'Flat Flt',
+    'FLTS': 'Flats Flts',
+    'FRD': 'Ford Frd',
+    'FRDS': 'Fords Frds',
+    'FRG': 'Forg Forge Frg',
+    'FRGS': 'Forges Frgs',
+    'FRK': 'Fork Frk',
+    'FRKS': 'Forks Frks',
+    'FRST': 'Forest Forests Frst',
+    'FRY': 'Ferry Frry Fry',
+    'FT': 'Fort Frt Ft',
+    'FWY': 'Freeway Freewy Frway Frwy Fwy',
+    'GDN': 'Garden Gardn Gdn Grden Grdn',
+    'GDNS': 'Gardens Gdns Grdns',
+    'GLN': 'Glen Gln',
+    'GLNS': 'Glens Glns',
+    'GRN': 'Green Grn',
+    'GRNS': 'Greens Grns',
+    'GRV': 'Grov Grove Grv',
+    'GRVS': 'Groves Grvs',
+    'GTWY': 'Gateway Gatewy Gatway Gtway Gtwy',
+    'HBR': 'Harb Harbor Harbr Hbr Hrbor',
+    'HBRS': 'Harbors Hbrs',
+    'HL': 'Hill Hl',
+    'HLS': 'Hills Hls',
+    'HOLW': 'Hllw Hollow Hollows Holw Holws',
+    'HTS': 'Heights Ht Hts',
+    'HVN': 'Haven Hvn',
+    'HWY': 'Highway Highwy Hiway Hiwy Hway Hwy',
+    'INLT': 'Inlet Inlt',
+    'IS': 'Is Island Islnd',
+    'ISLE': 'Isle Isles',
+    'ISS': 'Islands Islnds Iss',
+    'JCT': 'Jct Jction Jctn Junction Junctn Juncton',
+    'JCTS': 'Jctns Jcts Junctions',
+    'KNL': 'Knl Knol Knoll',
+    'KNLS': 'Knls Knolls',
+    'KY': 'Key Ky',
+    'KYS': 'Keys Kys',
+    'LAND': 'Land',
+    'LCK': 'Lck Lock',
+    'LCKS': 'Lcks Locks',
+    'LDG': 'Ldg Ldge Lodg Lodge',
+    'LF': 'Lf Loaf',
+    'LGT': 'Lgt Light',
+    'LGTS': 'Lgts Lights',
+    'LK': 'Lake Lk',
+    'LKS': 'Lakes Lks',
+    'LN': 'Lane Ln',
+    'LNDG': 'Landing Lndg Lndng',
+    'LOOP': 'Loop Loops Lp',
+    'MALL': 'Mall',
+    'MDW': 'Mdw Meadow',
+    'MDWS': 'Mdws Meadows Medows',
+    'MEWS': 'Mews',
+    'ML': 'Mill Ml',
+    'MLS': 'Mills Mls',
+    'MNR': 'Manor Mnr',
+    'MNRS': 'Manors Mnrs',
+    'MSN': 'Mission Missn Msn Mssn',
+    'MT': 'Mnt Mount Mt',
+    'MTN': 'Mntain Mntn Mountain Mountin Mtin Mtn',
+    'MTNS': 'Mntns Mountains Mtns',
+    'MTWY': 'Motorway Mtwy',
+    'NCK': 'Nck Neck',
+    'OPAS': 'Opas Overpass',
+    'ORCH': 'Orch Orchard Orchrd',
+    'OVAL': 'Oval Ovl',
+    'PARK': 'Park Parks Prk',
+    'PASS': 'Pass',
+    'PATH': 'Path Paths',
+    'PIKE': 'Pike Pikes',
+    'PKWY': 'Parkway Parkways Parkwy Pkway Pkwy Pkwys Pky',
+    'PL': 'Pl Place',
+    'PLN': 'Plain Pln',
+    'PLNS': 'Plains Plns',
+    'PLZ': 'Plaza Plz Plza',
+    'PNE': 'Pine Pne',
+    'PNES': 'Pines Pnes',
+    'PR': 'Pr Prairie Prr',
+    'PRT': 'Port Prt',
+    'PRTS': 'Ports Prts',
+    'PSGE': 'Passage Psge',
+    'PT': 'Point Pt',
+    'PTS': 'Points Pts',
+    'RADL': 'Rad Radial Radiel Radl',
+    'RAMP': 'Ramp',
+    'RD': 'Rd Road',
+    'RDG': 'Rdg Rdge Ridge',
+    'RDGS': 'Rdgs Ridges',
+    'RDS': 'Rds Roads',
+    'RIV': 'Riv River Rivr Rvr',
+    'RNCH': 'Ranch Ranches Rnch Rnchs',
+    'ROW': 'Row',
+    'RPD': 'Rapid Rpd',
+    'RPDS': 'Rapids Rpds',
+    'RST': 'Rest Rst',
+    'RTE': 'Route Rte',
+    'RUE': 'Rue',
+    'RUN': 'Run',
+    'SHL': 'Shl Shoal',
+    'SHLS': 'Shls Shoals',
+    'SHR': 'Shoar Shore Shr',
+    'SHRS': 'Shoars Shores Shrs',
+    'SKWY': 'Skwy Skyway',
+    'SMT': 'Smt Sumit Sumitt Summit',
+    'SPG': 'Spg Spng Spring Sprng',
+    'SPGS': 'Spgs Spngs Springs Sprngs',
+    'SPUR': 'Spur Spurs',
+    'SQ': 'Sq Sqr Sqre Squ Square',
+    'SQS': 'Sqrs Sqs Squares',
+    'ST': 'St Str Street Strt',
+    'STA': 'Sta Station Statn Stn',
+    'STRA': 'Stra Strav Straven Stravenue Stravn Strvn Strvnue',
+    'STRM': 'Stream Streme Strm',
+    'STS': 'Streets Sts',
+    'TER': 'Ter Terr Terrace',
+    'TPKE': 'Tpke Trnpk Turnpike Turnpk',
+    'TRAK': 'Track Tracks Trak Trk Trks',
+    'TRCE': 'Trace Traces Trce',
+    'TRFY': 'Trafficway Trfy',
+    'TRL': 'Trail Trails Trl Trls',
+    'TRLR': 'Trailer Trlr Trlrs',
+    'TRWY': 'Throughway Trwy',
+    'TUNL': 'Tunel Tunl Tunls Tunnel Tunnels Tunnl',
+    'UN': 'Un Union',
+    'UNS': 'Unions Uns',
+    'UPAS': 'Underpass Upas',
+    'VIA': 'Vdct Via Viadct Viaduct',
+    'VIS': 'Vis Vist Vista Vst Vsta',
+    'VL': 'Ville Vl',
+    'VLG': 'Vill Villag Village Villg Villiage Vlg',
+    'VLGS': 'Villages Vlgs',
+    'VLY': 'Valley Vally Vlly Vly',
+    'VLYS': 'Valleys Vlys',
+    'VW': 'View Vw',
+    'VWS': 'Views Vws',
+    'WALK': 'Walk Walks',
+    'WALL': 'Wall',
+    'WAY': 'Way Wy',
+    'WAYS': 'Ways',
+    'WL': 'Well Wl',
+    'WLS': 'Wells Wls',
+    'XING': 'Crossing Crssng Xing',
+    'XRD': 'Crossroad Xrd',
+    'XRDS': 'Crossroads Xrds',
+}
+
+street_type_list = sorted(
+    street_type
+    for street_types in street_type_abbreviations.values()
+    for street_type in street_types.split()
+)
+
+
+def keyword_list_to_regex(keywords, ignore_case=True):
+    """Converts a list of keywords into a regex matching any of them.
+    Keywords are merged into a trie, so that keywords sharing their
+    first letters share one branch: the regex engine decides on every
+    character once instead of trying each keyword in turn. With
+    ignore_case letters match in either case, like '[Ss][Tt]'.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in (keyword.lower() if ignore_case else keyword):
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def char_regex(char):
+        if ignore_case and char in string.ascii_lowercase:
+            return '[{upper}{lower}]'.format(upper=char.upper(), lower=char)
+        return '\\ ' if char == ' ' else re.escape(char)
+
+    def node_regex(node):
+        branches = [char_regex(char) + node_regex(node[char])
+                    for char in sorted(node) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        # a keyword ending here makes the longer ones optional
+        return '(?:' + '|'.join(branches) + ')' + ('?' if '' in node else '')
+
+    return node_regex(trie)
 
 
 def street_type_list_to_regex(street_type_list):
     """Converts a list of street types into a regex"""
-    street_types = '|'.join(set(street_type_list)).lower()
-    for letter in string.ascii_lowercase:
-        street_types = street_types.replace(letter, '[{upper}{lower}]'.format(upper=letter.upper(), lower=letter))
-
     # Use \b to check that there are word boundaries before and after the street type
     # Optionally match zero to two of " ", ",", or "." after the street name
-    street_types = street_types.replace('|', r'\b{div}|\b')
-    street_types = r'\b' + street_types + r'\b{div}'
-    return street_types.format(
+    return r'\b(?:{street_types})\b{div}'.format(
+        street_types=keyword_list_to_regex(street_type_list),
         div=r'[\.\ ,]{0,2}',
     )
 
@@ -351,82 +497,47 @@ full_street = r"""
                 po_box=po_box,
                 )
 
+# States and territories with their abbreviations
+state_names = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas',
+    'CA': 'California', 'CO': 'Colorado', 'CT': 'Connecticut',
+    'DE': 'Delaware', 'DC': 'District of Columbia', 'FL': 'Florida',
+    'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho', 'IL': 'Illinois',
+    'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas', 'KY': 'Kentucky',
+    'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland',
+    'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota',
+    'MS': 'Mississippi', 'MO': 'Missouri', 'MT': 'Montana',
+    'NE': 'Nebraska', 'NV': 'Nevada', 'NH': 'New Hampshire',
+    'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio',
+    'OK': 'Oklahoma', 'OR': 'Oregon', 'PA': 'Pennsylvania',
+    'RI': 'Rhode Island', 'SC': 'South Carolina', 'SD': 'South Dakota',
+    'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah', 'VT': 'Vermont',
+    'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia',
+    'WI': 'Wisconsin', 'WY': 'Wyoming',
+    # unincorporated & commonwealth territories
+    'AS': 'American Samoa', 'GU': 'Guam',
+    'MP': 'Northern Mariana Islands', 'PR': 'Puerto Rico',
+    'VI': 'Virgin Islands',
+}
+
 # region1 is actually a "state"
 region1 = r"""
         (?P<region1>
             (?:
                 # states abbreviations
-                AL|AK|AZ|AR|CA|CO|CT|DE|DC|FL|GA|HI|ID|IL|IN|IA|KS|KY|LA|ME|MD|MA|MI|
-                MN|MS|MO|MT|NE|NV|NH|NJ|NM|NY|NC|ND|OH|OK|OR|PA|RI|SC|SD|TN|TX|UT|VT|
-                VA|WA|WV|WI|WY|
-                # unincorporated & commonwealth territories
-                AS|GU|MP|PR|VI
+                {abbreviations}
             )
             |
             (?:
                 # states full
-                [Aa][Ll][Aa][Bb][Aa][Mm][Aa]|
-                [Aa][Ll][Aa][Ss][Kk][Aa]|
-                [Aa][Rr][Ii][Zz][Oo][Nn][Aa]|
-                [Aa][Rr][Kk][Aa][Nn][Ss][Aa][Ss]|
-                [Cc][Aa][Ll][Ii][Ff][Oo][Rr][Nn][Ii][Aa]|
-                [Cc][Oo][Ll][Oo][Rr][Aa][Dd][Oo]|
-                [Cc][Oo][Nn][Nn][Ee][Cc][Tt][Ii][Cc][Uu][Tt]|
-                [Dd][Ee][Ll][Aa][Ww][Aa][Rr][Ee]|
-                [Dd][Ii][Ss][Tt][Rr][Ii][Cc][Tt]\ [Oo][Ff]\ 
-                [Cc][Oo][Ll][Uu][Mm][Bb][Ii][Aa]|
-                [Ff][Ll][Oo][Rr][Ii][Dd][Aa]|
-                [Gg][Ee][Oo][Rr][Gg][Ii][Aa]|
-                [Hh][Aa][Ww][Aa][Ii][Ii]|
-                [Ii][Dd][Aa][Hh][Oo]|
-                [Ii][Ll][Ll][Ii][Nn][Oo][Ii][Ss]|
-                [Ii][Nn][Dd][Ii][Aa][Nn][Aa]|
-                [Ii][Oo][Ww][Aa]|
-                [Kk][Aa][Nn][Ss][Aa][Ss]|
-                [Kk][Ee][Nn][Tt][Uu][Cc][Kk][Yy]|
-                [Ll][Oo][Uu][Ii][Ss][Ii][Aa][Nn][Aa]|
-                [Mm][Aa][Ii][Nn][Ee]|
-                [Mm][Aa][Rr][Yy][Ll][Aa][Nn][Dd]|
-                [Mm][Aa][Ss][Ss][Aa][Cc][Hh][Uu][Ss][Ee][Tt][Tt][Ss]|
-                [Mm][Ii][Cc][Hh][Ii][Gg][Aa][Nn]|
-                [Mm][Ii][Nn][Nn][Ee][Ss][Oo][Tt][Aa]|
-                [Mm][Ii][Ss][Ss][Ii][Ss][Ss][Ii][Pp][Pp][Ii]|
-                [Mm][Ii][Ss][Ss][Oo][Uu][Rr][Ii]|
-                [Mm][Oo][Nn][Tt][Aa][Nn][Aa]|
-                [Nn][Ee][Bb][Rr][Aa][Ss][Kk][Aa]|
-                [Nn][Ee][Vv][Aa][Dd][Aa]|
-                [Nn][Ee][Ww]\ [Hh][Aa][Mm][Pp][Ss][Hh][Ii][Rr][Ee]|
-                [Nn][Ee][Ww]\ [Jj][Ee][Rr][Ss][Ee][Yy]|
-                [Nn][Ee][Ww]\ [Mm][Ee][Xx][Ii][Cc][Oo]|
-                [Nn][Ee][Ww]\ [Yy][Oo][Rr][Kk]|
-                [Nn][Oo][Rr][Tt][Hh]\ [Cc][Aa][Rr][Oo][Ll][Ii][Nn][Aa]|
-                [Nn][Oo][Rr][Tt][Hh]\ [Dd][Aa][Kk][Oo][Tt][Aa]|
-                [Oo][Hh][Ii][Oo]|
-                [Oo][Kk][Ll][Aa][Hh][Oo][Mm][Aa]|
-                [Oo][Rr][Ee][Gg][Oo][Nn]|
-                [Pp][Ee][Nn][Nn][Ss][Yy][Ll][Vv][Aa][Nn][Ii][Aa]|
-                [Rr][Hh][Oo][Dd][Ee]\ [Ii][Ss][Ll][Aa][Nn][Dd]|
-                [Ss][Oo][Uu][Tt][Hh]\ [Cc][Aa][Rr][Oo][Ll][Ii][Nn][Aa]|
-                [Ss][Oo][Uu][Tt][Hh]\ [Dd][Aa][Kk][Oo][Tt][Aa]|
-                [Tt][Ee][Nn][Nn][Ee][Ss][Ss][Ee][Ee]|
-                [Tt][Ee][Xx][Aa][Ss]|
-                [Uu][Tt][Aa][Hh]|
-                [Vv][Ee][Rr][Mm][Oo][Nn][Tt]|
-                [Vv][Ii][Rr][Gg][Ii][Nn][Ii][Aa]|
-                [Ww][Aa][Ss][Hh][Ii][Nn][Gg][Tt][Oo][Nn]|
-                [Ww][Ee][Ss][Tt]\ [Vv][Ii][Rr][Gg][Ii][Nn][Ii][Aa]|
-                [Ww][Ii][Ss][Cc][Oo][Nn][Ss][Ii][Nn]|
-                [Ww][Yy][Oo][Mm][Ii][Nn][Gg]|
-                # unincorporated & commonwealth territories
-                [Aa][Mm][Ee][Rr][Ii][Cc][Aa][Nn]\ [Ss][Aa][Mm][Oo][Aa]
-                |[Gg][Uu][Aa][Mm]|
-                [Nn][Oo][Rr][Tt][Hh][Ee][Rr][Nn]\ [Mm][Aa][Rr][Ii][Aa][Nn][Aa]\ 
-                [Ii][Ss][Ll][Aa][Nn][Dd][Ss]|
-                [Pp][Uu][Ee][Rr][Tt][Oo]\ [Rr][Ii][Cc][Oo]|
-                [Vv][Ii][Rr][Gg][Ii][Nn]\ [Ii][Ss][Ll][Aa][Nn][Dd][Ss]
+                {names}
             )
         )
-        """
+        """.format(
+    abbreviations=keyword_list_to_regex(state_names, ignore_case=False),
+    names=keyword_list_to_regex(state_names.values()),
+)
 
 # TODO: doesn't catch cities containing French characters
 city = r"""
@@ -465,3 +576,26 @@ full_address = r"""
     country=country,
     postal_code=postal_code,
 )
+
+# First three digits of the ZIP codes of every state and territory
+# (USPS "L002" three-digit ZIP code prefix table); ranges are inclusive.
+# Used to drop matches whose ZIP code and state can not go together.
+postal_code_prefixes = {
+    'AL': '350-369', 'AK': '995-999', 'AZ': '850-865', 'AR': '716-729',
+    'CA': '900-961', 'CO': '800-816', 'CT': '060-069', 'DE': '197-199',
+    'DC': '200 202-205 569', 'FL': '320-339 341-349',
+    'GA': '300-319 398-399', 'HI': '967-968', 'ID': '832-838',
+    'IL': '600-629', 'IN': '460-479', 'IA': '500-528', 'KS': '660-679',
+    'KY': '400-427', 'LA': '700-714', 'ME': '039-049', 'MD': '206-219',
+    'MA': '010-027 055', 'MI': '480-499', 'MN': '550-567',
+    'MS': '386-397', 'MO': '630-658', 'MT': '590-599', 'NE': '680-693',
+    'NV': '889-898', 'NH': '030-038', 'NJ': '070-089', 'NM': '870-884',
+    'NY': '005 100-149', 'NC': '270-289', 'ND': '580-588',
+    'OH': '430-459', 'OK': '730-732 734-749', 'OR': '970-979',
+    'PA': '150-196', 'RI': '028-029', 'SC': '290-299', 'SD': '570-577',
+    'TN': '370-385', 'TX': '733 750-799 885', 'UT': '840-847',
+    'VT': '050-054 056-059', 'VA': '201 220-246', 'WA': '980-994',
+    'WV': '247-268', 'WI': '530-549', 'WY': '820-831',
+    'AS': '967', 'GU': '969', 'MP': '969', 'PR': '006-007 009',
+    'VI': '008',
+}
@@ -20,18 +20,19 @@ setup(name='pyap',
       packages=['pyap', 'pyap.packages', 'pyap.source_CA', 'pyap.source_US', 'pyap.source_GB'],
       download_url='https://github.com/vladimarius/pyap',
       zip_safe=False,
+      python_requires='>=3.8',
+      entry_points={
+          'console_scripts': ['pyap = pyap.cli:main'],
+      },
       classifiers=[
           'Intended Audience :: Developers',
           'Development Status :: 4 - Beta',
           'License :: OSI Approved :: MIT License',
           'Natural Language :: English',
           'Programming Language :: Python',
-          'Programming Language :: Python :: 2.7',
           'Programming Language :: Python :: 3',
-          'Programming Language :: Python :: 3.1',
-          'Programming Language :: Python :: 3.2',
-          'Programming Language :: Python :: 3.3',
-          'Programming Language :: Python :: 3.4',
+          'Programming Language :: Python :: 3 :: Only',
+          'Programming Language :: Python :: 3.8',
           'Topic :: Software Development :: Libraries',
           'Topic :: Scientific/Engineering :: Information Analysis',
           'Topic :: Utilities'
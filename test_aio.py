@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+""" Test for asyncio entry points and chunked parsing """
+
+import asyncio
+import os
+import subprocess
+import sys
+import pytest
+import pyap as ap
+from pyap import aio
+from pyap import parser
+
+TEXT = "Lorem ipsum 225 E. John Carpenter Freeway, Suite 1500\n" +\
+    "Irving, Texas 75062 dolor 8 Wall Street, New York, NY 10005\n"
+
+
+def as_dicts(addresses):
+    return [a.as_dict() for a in addresses]
+
+
+@pytest.mark.parametrize("size", [1, 13, 1000])
+def test_parse_stream_equals_parse(size):
+    ap_us = parser.AddressParser(country='US')
+    ap_us.max_address_length = 80
+    text = TEXT * 10
+    chunks = [text[i:i + size] for i in range(0, len(text), size)]
+    assert as_dicts(ap_us.parse_stream(chunks)) == \
+        as_dicts(ap_us.parse(text))
+
+
+def test_parse_async():
+    result = asyncio.run(ap.parse_async(TEXT, country='US'))
+    assert as_dicts(result) == as_dicts(ap.parse(TEXT, country='US'))
+
+
+def test_parse_stream_async_bytes_and_text():
+    data = (TEXT * 5).encode('utf-8')
+
+    class Reader(object):
+        def __init__(self):
+            self.pos = 0
+
+        async def read(self, n):
+            chunk = data[self.pos:self.pos + 7]
+            self.pos += 7
+            return chunk
+
+    async def text_chunks():
+        for line in (TEXT * 5).splitlines(True):
+            yield line
+
+    async def collect(stream):
+        return [a async for a in ap.parse_stream_async(stream, country='US')]
+
+    expected = as_dicts(ap.parse(TEXT * 5, country='US'))
+    assert as_dicts(asyncio.run(collect(Reader()))) == expected
+    assert as_dicts(asyncio.run(collect(text_chunks()))) == expected
+
+
+def test_async_parser_bounded_concurrency():
+    async def run():
+        parser_ = aio.AsyncAddressParser(country='US', max_concurrency=2)
+        results = await asyncio.gather(
+            *[parser_.parse(TEXT) for _ in range(6)])
+        return results
+
+    results = asyncio.run(run())
+    assert all(as_dicts(r) == as_dicts(results[0]) for r in results)
+    assert len(results[0]) == 2
+
+
+def test_async_parser_cancellation():
+    async def run():
+        parser_ = aio.AsyncAddressParser(country='US', max_concurrency=1)
+        task = asyncio.ensure_future(parser_.parse(TEXT * 200))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # the slot has been released
+        return await asyncio.wait_for(parser_.parse(TEXT), 5)
+
+    assert len(asyncio.run(run())) == 2
+
+
+def test_import_pyap_leaves_asyncio_and_sqlite3_out():
+    code = ('import sys, pyap; '
+            'print(sorted(m for m in ("asyncio", "sqlite3") '
+            'if m in sys.modules))')
+    output = subprocess.check_output(
+        [sys.executable, '-c', code],
+        cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert output.strip() == b'[]'
+    assert ap.parse_async is aio.parse_async
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+""" Test for the resumable batch runner """
+
+import os
+import json
+import zipfile
+import pytest
+from pyap import batch
+from pyap import exceptions as e
+
+ADDRESS = "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062"
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    paths = []
+    for i in range(7):
+        path = tmp_path / 'doc{0}.txt'.format(i)
+        path.write_text("Lorem {0} ipsum\n".format(ADDRESS) * (i % 3))
+        paths.append(str(path))
+    manifest = tmp_path / 'manifest.txt'
+    manifest.write_text('\n'.join(paths) + '\n')
+    return str(manifest)
+
+
+def read_outputs(output_dir):
+    return dict((name, open(os.path.join(output_dir, name)).read())
+                for name in sorted(os.listdir(output_dir))
+                if name.startswith('shard-'))
+
+
+def test_batch_runner_resumes(inputs, tmp_path):
+    output_dir = str(tmp_path / 'out')
+    paths = batch.read_manifest(inputs)
+    runner = batch.BatchRunner(paths, output_dir, shard_size=3, workers=2)
+    summary = runner.run()
+    assert summary['shards'] == 3
+    assert summary['processed'] == 3
+    assert summary['addresses'] == 6
+    first = read_outputs(output_dir)
+    assert sorted(first) == \
+        ['shard-00000.jsonl', 'shard-00001.jsonl', 'shard-00002.jsonl']
+
+    # simulate a crash: one shard lost its output, the checkpoint
+    # got a half-written line
+    os.remove(os.path.join(output_dir, 'shard-00001.jsonl'))
+    with open(runner.checkpoint, 'a') as f:
+        f.write('{"shard": "shard-000')
+
+    runner = batch.BatchRunner(paths, output_dir, shard_size=3, workers=2)
+    assert sorted(runner.completed()) == ['shard-00000', 'shard-00002']
+    summary = runner.run()
+    assert summary['skipped'] == 2
+    assert summary['processed'] == 1
+    assert read_outputs(output_dir) == first
+    assert sorted(runner.completed()) == \
+        ['shard-00000', 'shard-00001', 'shard-00002']
+
+    # rerunning from scratch gives identical output
+    fresh_dir = str(tmp_path / 'fresh')
+    batch.BatchRunner(paths, fresh_dir, shard_size=3, workers=1).run()
+    assert read_outputs(fresh_dir) == first
+
+
+def test_batch_runner_checkpoint_mismatch(inputs, tmp_path):
+    output_dir = str(tmp_path / 'out')
+    paths = batch.read_manifest(inputs)
+    batch.BatchRunner(paths, output_dir, shard_size=3, workers=1).run()
+    with pytest.raises(e.CheckpointMismatch):
+        batch.BatchRunner(paths, output_dir, shard_size=2).run()
+
+
+def test_batch_main(inputs, tmp_path):
+    output_dir = str(tmp_path / 'out')
+    assert batch.main([inputs, output_dir, '-s', '4', '-w', '1']) == 0
+    assert len(read_outputs(output_dir)) == 2
+
+
+def test_batch_offsets_point_into_documents(inputs, tmp_path):
+    output_dir = str(tmp_path / 'out')
+    batch.BatchRunner(batch.read_manifest(inputs), output_dir,
+                      workers=1).run()
+    records = [json.loads(line) for output in
+               read_outputs(output_dir).values()
+               for line in output.splitlines()]
+    assert len(records) == 6
+    for record in records:
+        text = open(record['document']).read()
+        assert text[record['start']:record['end']] == ADDRESS
+
+
+def test_batch_counts_archive_members(tmp_path):
+    archive = tmp_path / 'drop.zip'
+    with zipfile.ZipFile(str(archive), 'w') as z:
+        for i in range(3):
+            z.writestr('letters/{0}.txt'.format(i), "Lorem " + ADDRESS)
+    summary = batch.BatchRunner([str(archive)], str(tmp_path / 'out'),
+                                workers=1).run()
+    assert summary['documents'] == 3
+    assert summary['addresses'] == 3
+
+
+def test_batch_checkpoints_shards_around_a_failure(inputs, tmp_path, capsys):
+    paths = batch.read_manifest(inputs)
+    paths[4] = str(tmp_path / 'missing.txt')
+    manifest = tmp_path / 'broken.txt'
+    manifest.write_text('\n'.join(paths) + '\n')
+    output_dir = str(tmp_path / 'out')
+    assert batch.main([str(manifest), output_dir, '-s', '3', '-w', '2']) == 1
+    assert 'shard-00001 failed: FileNotFoundError' in capsys.readouterr()[1]
+    runner = batch.BatchRunner(paths, output_dir, shard_size=3, workers=1)
+    assert sorted(runner.completed()) == ['shard-00000', 'shard-00002']
+    assert batch.main([str(tmp_path / 'nope.txt'), output_dir]) == 2
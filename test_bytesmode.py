@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+""" Test for bytes-mode scanning """
+
+import pytest
+from pyap import parser
+from pyap import bytesmode
+from pyap import exceptions as e
+
+TEXT = (
+    "xxx 225 E. John Carpenter Freeway,\r\n Suite 1500 Irving, Texas 75062 "
+    "xxx\n\n 8 Wall Street, New York, NY 10005 and 55 Grant Ave,\t"
+    "San Francisco, CA 94108 ")
+
+
+def fields(address):
+    result = address.as_dict()
+    del result['match_start']
+    del result['match_end']
+    return result
+
+
+def test_normalize_with_offsets():
+    text = u"a \n\t b,,c\xa0d—e  f"
+    for raw in (text, text.encode('utf-8')):
+        clean, offsets = parser.normalize_with_offsets(raw)
+        if isinstance(raw, bytes):
+            clean = clean.decode('utf-8')
+        assert clean == parser.AddressParser._normalize_string(text)
+    clean, offsets = parser.normalize_with_offsets(text)
+    for pos, char in enumerate(clean):
+        if char not in ' ,-':
+            assert text[offsets.to_raw(pos)] == char
+
+
+@pytest.mark.parametrize("window_size", [1, 17, 1 << 22])
+def test_same_addresses_as_text_mode(window_size):
+    bp = bytesmode.BytesAddressParser(country='US')
+    bp.window_size = window_size
+    data = TEXT.encode('utf-8')
+    found = bp.parse(data)
+    expected = parser.AddressParser(country='US').parse(TEXT)
+
+    assert len(found) == 3
+    assert [fields(a) for a in found] == [fields(a) for a in expected]
+    for address in found:
+        span = data[address.match_start:address.match_end].decode('utf-8')
+        assert parser.AddressParser._normalize_string(span).strip() == \
+            address.full_address
+
+
+def test_byte_offsets_with_multibyte_text():
+    prefix = u"Caf\xe9 —  "
+    data = (prefix + TEXT).encode('utf-8')
+    found = bytesmode.BytesAddressParser(country='US').parse(data)
+    assert data[found[0].match_start:found[0].match_end].startswith(b'225 E.')
+
+
+def test_parse_file(tmpdir):
+    path = tmpdir.join('big.txt')
+    path.write_binary(TEXT.encode('utf-8') * 50)
+    bp = bytesmode.BytesAddressParser(country='US')
+    bp.window_size = 1000
+    assert len(bp.parse_file(str(path))) == 150
+
+    empty = tmpdir.join('empty.txt')
+    empty.write_binary(b'')
+    assert bp.parse_file(str(empty)) == []
+
+
+def test_non_ascii_rules_unsupported():
+    with pytest.raises(e.BytesModeUnsupported):
+        bytesmode.BytesAddressParser(country='CA')
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+""" Test for the parser result cache """
+
+import os
+import pickle
+import subprocess
+import sys
+import threading
+from pyap import parser
+from pyap import cache
+
+TEXT = "xxx 225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062 xxx"
+
+
+def test_lru_eviction_and_counters():
+    lru = cache.LRUCache(max_entries=2, max_bytes=1000)
+    lru.put('a', 1, 100)
+    lru.put('b', 2, 100)
+    assert lru.get('a') == 1
+    lru.put('c', 3, 100)
+    assert lru.get('b') is None
+    assert lru.get('c') == 3
+    lru.put('d', 4, 950)
+    assert len(lru) == 1 and lru.total_bytes == 950
+    lru.put('e', 5, 5000)
+    assert lru.get('e') is None
+    assert lru.stats() == {'entries': 1, 'bytes': 950, 'hits': 2,
+                           'misses': 2, 'evictions': 3}
+
+
+def test_cache_hit_skips_regex(monkeypatch):
+    lru = cache.LRUCache()
+    ap = parser.AddressParser(country='US', cache=lru)
+    first = ap.parse(TEXT)
+
+    def fail(*args):
+        raise AssertionError('regex used on a cache hit')
+    monkeypatch.setattr(ap, '_normalize_string', fail)
+    monkeypatch.setattr(ap, '_rules_for', fail)
+    second = ap.parse(TEXT)
+    assert [a.as_dict() for a in second] == [a.as_dict() for a in first]
+    assert second[0] is not first[0]
+    assert (lru.hits, lru.misses) == (1, 1)
+
+
+def test_cache_keys_include_configuration():
+    lru = cache.LRUCache()
+    text = "Lorem ipsum\n8 Wall Street,  New York, NY 10005"
+    plain = parser.AddressParser(country='US', cache=lru).parse(text)
+    layout = parser.AddressParser(country='us', cache=lru,
+                                  layout=True).parse(text)
+    assert plain[0].match_start != layout[0].match_start
+    assert lru.misses == 2
+    parser.AddressParser(country='US', cache=lru).parse(text)
+    assert lru.hits == 1
+
+
+SALT = '''
+from pyap import cache, canonical, parser
+ap = parser.AddressParser(country='US', cache=cache.LRUCache(),
+                          postal_check=canonical.PostalCheck('US'))
+print(ap._cache_salt.decode('utf-8'))
+'''
+
+
+def test_cache_salt_is_the_same_in_every_process():
+    salts = [subprocess.check_output(
+        [sys.executable, '-c', SALT],
+        cwd=os.path.dirname(os.path.abspath(__file__))) for _ in range(2)]
+    assert salts[0] == salts[1]
+    assert b' at 0x' not in salts[0]
+    assert b'PostalCheck:US' in salts[0]
+
+
+def test_shared_cache_threads_and_pickle():
+    lru = cache.LRUCache(max_entries=3)
+    ap = parser.AddressParser(country='US', cache=lru)
+    texts = [TEXT + str(i) for i in range(5)]
+
+    def work():
+        for _ in range(10):
+            for text in texts:
+                assert len(ap.parse(text)) == 1
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert lru.hits + lru.misses == 200 and len(lru) == 3
+
+    restored = pickle.loads(pickle.dumps(ap))
+    assert len(restored.cache) == 0
+    assert restored.cache.max_entries == 3
+
+
+def _count_cached(path, keys):
+    return len(cache.SqliteCache(path).get_many(keys))
+
+
+def test_sqlite_cache_persists_across_runs(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    texts = [TEXT, "No address here", TEXT, TEXT + " 8 Wall Street, " +
+             "New York, NY 10005"]
+    first = parser.AddressParser(country='US', cache=cache.SqliteCache(path))
+    expected = first.parse_many(texts)
+    assert first.cache.stats()['entries'] == 3
+
+    # a later run only looks documents up
+    db = cache.SqliteCache(path)
+    second = parser.AddressParser(country='US', cache=db)
+    second._parse = None
+    found = second.parse_many(texts)
+    assert [[a.as_dict() for a in r] for r in found] == \
+        [[a.as_dict() for a in r] for r in expected]
+    assert (db.hits, db.misses) == (4, 0)
+    assert [a.as_dict() for a in second.parse(TEXT)] == \
+        [a.as_dict() for a in expected[0]]
+
+    # other options never see these entries
+    other = parser.AddressParser(country='US', layout=True,
+                                 cache=cache.SqliteCache(path))
+    other.parse(TEXT)
+    assert other.cache.hits == 0
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(2) as executor:
+        keys = [row[0] for row in db._connection().execute(
+            'SELECT key FROM results')]
+        assert list(executor.map(_count_cached, [path] * 3,
+                                 [keys] * 3)) == [4, 4, 4]
+
+
+def test_sqlite_prune(tmp_path):
+    db = cache.SqliteCache(str(tmp_path / 'cache.sqlite'))
+    for i in range(10):
+        db.put(b'key%d' % i, [{'n': i}], 100)
+    assert db.prune(2000) == 0
+    assert db.prune(450) == 6
+    assert db.stats()['bytes'] == 400
+    assert db.get(b'key9') == [{'n': 9}] and db.get(b'key0') is None
+
+
+def test_address_memo():
+    footer = " Acme Inc, 8 Wall Street, New York, NY 10005."
+    texts = ["Invoice {0}.{1}".format(i, footer * 2) for i in range(5)]
+    memo = cache.AddressMemo(max_entries=10)
+    ap = parser.AddressParser(country='US', memo=memo)
+    found = [ap.parse(text) for text in texts]
+    expected = [parser.AddressParser(country='US').parse(text)
+                for text in texts]
+    assert [[a.as_dict() for a in r] for r in found] == \
+        [[a.as_dict() for a in r] for r in expected]
+    assert found[0][1].match_start > found[0][0].match_start
+    assert (memo.hits, memo.misses) == (9, 1)
+
+    # changing a result does not change what the memo hands out
+    found[0][0].street_name = 'changed'
+    assert ap.parse(texts[0])[0].street_name == 'Wall'
+
+    assert parser.AddressParser(country='US', memo=True).memo.max_entries \
+        == 10000
+    small = cache.AddressMemo(max_entries=2)
+    for i in range(5):
+        small.put(i, i)
+    assert len(small) == 2 and small.get(4) == 4 and small.get(0) is None
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+""" Test for canonical address keys and the dedup index """
+
+import pyap
+from pyap import canonical
+from pyap.source_US import data as us_data
+
+
+def test_every_street_type_has_a_usps_abbreviation():
+    for street_type in us_data.street_type_list:
+        abbreviation = canonical.normalize_street_type(street_type)
+        assert abbreviation in us_data.street_type_abbreviations
+    assert canonical.normalize_street_type('Street') == 'ST'
+    assert canonical.normalize_street_type('st.') == 'ST'
+    assert canonical.normalize_street_type('Crt.', 'CA') == \
+        canonical.normalize_street_type('Court', 'CA')
+
+
+def test_regions_and_postal_codes():
+    assert canonical.normalize_region('Texas') == 'TX'
+    assert canonical.normalize_region('district of columbia') == 'DC'
+    assert canonical.normalize_region('Puerto Rico') == 'PR'
+    assert canonical.normalize_region('Québec', 'CA') == 'QC'
+    assert canonical.normalize_region('Quebec', 'CA') == 'QC'
+    assert canonical.normalize_postal_code('750621234') == '75062-1234'
+    assert canonical.normalize_postal_code('l1w3e6', 'CA') == 'L1W 3E6'
+    assert canonical.normalize_postal_code('sw1a  2aa', 'GB') == 'SW1A 2AA'
+
+
+def test_spelling_variants_share_a_key():
+    first, second, other = [pyap.parse(text, country='US')[0] for text in (
+        "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062",
+        "225 East John Carpenter Fwy, Ste 1500 irving, TX 75062",
+        "226 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062")]
+    assert canonical.canonical_key(first) == \
+        canonical.canonical_key(second) == \
+        'US|225|E JOHN CARPENTER|FWY||STE 1500|||IRVING|TX|75062'
+    assert canonical.canonical_key(first.as_dict()) == \
+        canonical.canonical_key(first)
+    assert canonical.canonical_key(other) != canonical.canonical_key(first)
+
+
+def test_index_groups_duplicates():
+    addresses = [pyap.parse(text, country='CA')[0] for text in (
+        "1730 McPherson Crt. Unit 35, Pickering, ON L1W 3E6",
+        "33771 George Ferguson Way Abbotsford, BC V2S 2M5",
+        "1730 McPherson Court Unit 35, Pickering, Ontario L1W3E6")]
+    index = canonical.AddressIndex()
+    assert [index.add(address, ref) for ref, address
+            in zip((10, 20, 30), addresses)] == [True, True, False]
+    assert len(index) == 2
+    assert addresses[2] in index
+    assert index.count(addresses[0]) == 2
+    assert index.refs(addresses[2]) == [10, 30]
+    assert [refs for key, refs in index.groups()] == [[10, 30], [20]]
+    assert index.update(addresses) == 0
+    assert index.refs(addresses[1]) == [20, 4]
+    assert index.stats()['duplicates'] == 4
+
+
+def test_postal_check_tables():
+    us = canonical.PostalCheck('US')
+    assert set(us_data.postal_code_prefixes) == \
+        set(canonical._regions['US'].values())
+    assert us({'postal_code': '75062-1234', 'region1': 'Texas'})
+    assert not us({'postal_code': '75062', 'region1': 'New York'})
+    # unknown prefixes, regions and missing parts are not judged
+    assert us({'postal_code': '09001', 'region1': 'NY'})
+    assert us({'postal_code': '10005', 'region1': None})
+    assert us({'postal_code': None, 'region1': 'NY'})
+    ca = canonical.PostalCheck('CA')
+    assert ca({'postal_code': 'x0a 1h0', 'region1': 'Nunavut'})
+    assert not ca({'postal_code': 'H2X 1Y4', 'region1': 'Ontario'})
+    gb = canonical.PostalCheck('GB')
+    assert gb({'postal_code': 'EC1A 1BB'}) and gb({'postal_code': 'W1A 0AX'})
+    assert not gb({'postal_code': 'AA1 2AA'})
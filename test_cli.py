@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+""" Test for the command-line extractor """
+
+import io
+import json
+import pytest
+from pyap import cli
+
+ADDRESS = "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062"
+
+
+def read_records(output):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+@pytest.fixture
+def documents(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'a.txt').write_text(
+        "xxx {0} xxx\n{0}\n".format(ADDRESS))
+    (tmp_path / 'sub' / 'b.txt').write_text("No address here")
+    (tmp_path / 'sub' / 'c.txt').write_text("Lorem " + ADDRESS)
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_cli_directory(documents, capsys, workers):
+    assert cli.main([str(documents), '-w', workers, '--chunk-size', '7']) == 0
+    out, err = capsys.readouterr()
+    records = read_records(out)
+    assert [r['document'] for r in records] == \
+        [str(documents / 'a.txt')] * 2 + [str(documents / 'sub' / 'c.txt')]
+    assert records[0]['full_address'] == ADDRESS
+    assert records[0]['start'] == 4
+    assert records[0]['fields']['postal_code'] == '75062'
+    assert '3 documents, 3 addresses' in err
+
+
+def test_cli_glob_detect_only_max_results(documents, capsys):
+    cli.main([str(documents / '**' / '*.txt'), '--detect-only',
+              '--max-results', '1', '-q'])
+    out, err = capsys.readouterr()
+    records = read_records(out)
+    assert len(records) == 2
+    assert 'fields' not in records[0]
+    assert err == ''
+
+
+def test_cli_offsets_point_into_document(tmp_path, capsys):
+    raw = ADDRESS.replace(', Suite', ',\n\n   Suite')
+    text = "Dear  Sir,\n\n\tplease write to {0}\n  or {0}.".format(raw)
+    (tmp_path / 'letter.txt').write_text(text)
+    cli.main([str(tmp_path / 'letter.txt'), '-q', '--chunk-size', '5'])
+    records = read_records(capsys.readouterr()[0])
+    assert len(records) == 2
+    for record in records:
+        assert text[record['start']:record['end']] == raw
+
+
+def test_cli_stdin(monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO(ADDRESS))
+    cli.main(['-q'])
+    records = read_records(capsys.readouterr()[0])
+    assert records[0]['document'] == '-'
+    assert records[0]['full_address'] == ADDRESS
+
+
+def test_cli_unknown_country(capsys):
+    assert cli.main(['--country', 'TheMoon']) == 2
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_cli_reports_unreadable_files_and_goes_on(documents, capsys,
+                                                  workers):
+    missing = str(documents / 'missing.txt')
+    assert cli.main([missing, str(documents / 'a.txt'), '-w', workers]) == 1
+    out, err = capsys.readouterr()
+    assert len(read_records(out)) == 2
+    assert 'pyap: {0}: '.format(missing) in err
+    assert '1 documents, 2 addresses' in err and '1 failed' in err
+
+
+def test_cli_writes_records_as_found(documents, monkeypatch):
+    written = []
+
+    class Output(object):
+        def write(self, text):
+            written.append(text)
+
+    def chunks(stream, size):
+        yield ADDRESS + ' xxx\n' + 'filler ' * 300
+        # the first address is out before the rest is read
+        assert written
+        yield ADDRESS
+
+    monkeypatch.setattr(cli, 'iter_chunks', chunks)
+    args = cli.build_argparser().parse_args([str(documents / 'a.txt'), '-q'])
+    assert cli.run(args, Output(), io.StringIO()) == 0
+    assert ''.join(written).count('\n') == 2
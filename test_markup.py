@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+""" Test for the HTML front end """
+
+import pytest
+from pyap import markup
+from pyap import parser
+
+PAGE = (
+    '<html><head><title>Contact</title><style>p {color: red}</style>'
+    '<script>var a = "8 Wall Street, New York, NY 10005";</script></head>\n'
+    '<body><div>Visit us at <b>225 E. John Carpenter Freeway</b>,<br>'
+    'Suite 1500\nIrving, Texas&nbsp;75062</div>\n'
+    '<p>Or 8 Wall Street, New York, NY 10005</p>'
+    '<p>55 Grant Ave, San Francisco, CA&#32;94108</p></body></html>'
+)
+
+
+def test_html_to_text():
+    text, offsets = markup.html_to_text(PAGE)
+    assert 'var a' not in text and 'color' not in text
+    assert 'Freeway,\nSuite 1500 Irving, Texas\xa075062\n' in text
+    for pos, char in enumerate(text):
+        if char.isalnum():
+            assert PAGE[offsets.to_raw(pos)] == char
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 10000])
+def test_parse_html_offsets_point_into_markup(chunk_size):
+    chunks = [PAGE[i:i + chunk_size]
+              for i in range(0, len(PAGE), chunk_size)]
+    found = list(markup.parse_html_stream(chunks, country='US'))
+    assert [a.full_address for a in found] == [
+        '225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062',
+        '8 Wall Street, New York, NY 10005',
+        '55 Grant Ave, San Francisco, CA 94108']
+    assert [PAGE[a.match_start:a.match_end] for a in found] == [
+        '225 E. John Carpenter Freeway</b>,<br>Suite 1500\n'
+        'Irving, Texas&nbsp;75062',
+        '8 Wall Street, New York, NY 10005',
+        '55 Grant Ave, San Francisco, CA&#32;94108']
+    assert found[1].as_dict()['match_start'] == found[1].match_start
+
+
+def test_parse_html():
+    assert [a.full_address for a in markup.parse_html(
+        '<p>8 Wall Street, <i>New York</i>, NY 10005', country='US')] == \
+        ['8 Wall Street, New York, NY 10005']
+
+
+def test_text_released_at_close_is_parsed():
+    ap_us = parser.AddressParser(country='US')
+    filler = 'lorem ipsum ' * (2 * ap_us.max_address_length // 12 + 1)
+    page = '<div ' + filler + '8 Wall Street, New York, NY 10005' + filler
+    found = markup.parse_html(page, ap_us)
+    assert [a.full_address for a in found] == \
+        ['8 Wall Street, New York, NY 10005']
+    assert page[found[0].match_start:found[0].match_end] == \
+        '8 Wall Street, New York, NY 10005'
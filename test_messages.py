@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+""" Test for the email input adapter """
+
+import email.header
+import mailbox
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+import pytest
+from pyap import messages
+
+PLAIN = "Ship to 225 E. John Carpenter Freeway, Suite 1500 Irving, " \
+    "Texas 75062 please."
+HTML = "<p>Visit <b>8 Wall Street</b>, New York, NY 10005</p>"
+ATTACHED = "55 Grant Ave, San Francisco, CA 94108"
+
+
+def make_message(number):
+    message = MIMEMultipart()
+    message['Message-ID'] = '<m{0}@example.com>'.format(number)
+    message['Subject'] = '=?utf-8?q?Caf=C3=A9_order?='
+    body = MIMEMultipart('alternative')
+    body.attach(MIMEText(PLAIN, 'plain', 'utf-8'))
+    body.attach(MIMEText(HTML, 'html', 'utf-8'))
+    message.attach(body)
+    attachment = MIMEText(ATTACHED, 'plain')
+    attachment.add_header('Content-Disposition', 'attachment',
+                          filename='a.txt')
+    message.attach(attachment)
+    message.attach(MIMEApplication(b'%PDF ' + ATTACHED.encode('ascii')))
+    message.attach(MIMEText('x' * 5000 + ' ' + ATTACHED, 'plain'))
+    return message
+
+
+@pytest.fixture
+def mbox_path(tmp_path):
+    path = str(tmp_path / 'inbox.mbox')
+    box = mailbox.mbox(path)
+    for number in range(3):
+        box.add(make_message(number))
+    box.close()
+    return path
+
+
+def test_parse_mailbox(mbox_path):
+    mp = messages.MessageParser(country='US', max_part_size=4000)
+    results = list(mp.parse_mailbox(mbox_path))
+    assert [(r['message'], r['part'], r['content_type']) for r in results] \
+        == [('<m{0}@example.com>'.format(n), part, content_type)
+            for n in range(3)
+            for part, content_type in ((2, 'text/plain'), (3, 'text/html'))]
+    assert [a.full_address for a in results[0]['addresses']] == \
+        ['225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062']
+    assert [a.full_address for a in results[1]['addresses']] == \
+        ['8 Wall Street, New York, NY 10005']
+    # headers are decoded once and shared by the parts of a message
+    assert results[0]['headers'] is results[1]['headers']
+    assert results[0]['headers']['subject'] == u'Caf\xe9 order'
+
+
+def test_attachments_and_size_limit(mbox_path):
+    mp = messages.MessageParser(country='US', include_attachments=True)
+    results = list(mp.parse_mailbox(mbox_path))[:4]
+    assert [r['part'] for r in results] == [2, 3, 4, 6]
+    assert [a.full_address for a in results[2]['addresses']] == [ATTACHED]
+
+
+def test_eml_and_maildir(tmp_path):
+    eml = tmp_path / 'one.eml'
+    eml.write_bytes(make_message(7).as_bytes())
+    results = list(messages.MessageParser(country='US').parse_mailbox(
+        str(eml)))
+    assert results[0]['message'] == '<m7@example.com>'
+
+    box = mailbox.Maildir(str(tmp_path / 'maildir'))
+    box.add(make_message(8))
+    results = list(messages.MessageParser(country='US').parse_mailbox(
+        str(tmp_path / 'maildir')))
+    assert len(results) == 3
+
+
+def test_header_object_disposition(monkeypatch):
+    message = MIMEMultipart()
+    attachment = MIMEText(ATTACHED, 'plain')
+    attachment['Content-Disposition'] = email.header.Header(
+        'attachment; filename="a.txt"')
+    message.attach(attachment)
+    message.attach(MIMEText(HTML, 'html', 'utf-8'))
+    mp = messages.MessageParser(country='US')
+    # html parts reuse the parser of the MessageParser
+    monkeypatch.setattr(messages.markup.parser, 'AddressParser', None)
+    results = mp.parse_message(message)
+    assert [r['content_type'] for r in results] == ['text/html']
+    assert len(results[0]['addresses']) == 1
+
+
+def test_offsets_point_into_decoded_parts():
+    raw = "225 E. John Carpenter Freeway,\n  Suite 1500 Irving, Texas 75062"
+    message = MIMEMultipart()
+    message.attach(MIMEText("Ship  to\n\n" + raw, 'plain', 'utf-8'))
+    message.attach(MIMEText(HTML, 'html', 'utf-8'))
+    texts = [text for _, _, text in messages.iter_text_parts(message)]
+    results = messages.MessageParser(country='US').parse_message(message)
+    for text, result, expected in zip(texts, results,
+                                      [raw, '8 Wall Street</b>, New York, '
+                                            'NY 10005']):
+        found = result['addresses'][0]
+        assert text[found.match_start:found.match_end] == expected
@@ -3,6 +3,7 @@
 """ Test for parser classes """
 
 import re
+import pickle
 import pytest
 import pyap as ap
 from pyap import parser
@@ -84,3 +85,182 @@ def test_parse_address():
     addresses = ap.parse(test_address)
     assert addresses[0].full_address == \
         "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062"
+
+
+def test_parse_keeps_no_state():
+    ap = parser.AddressParser(country='US')
+    ap.parse("xxx 225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062")
+    assert not hasattr(ap, 'clean_text')
+
+
+def test_parse_many():
+    texts = [
+        "xxx 225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062",
+        "No address here",
+        "1111 3rd Street, Promenade, Santa Monica, CA 90000",
+    ]
+    expected = [[str(a) for a in ap.parse(t, country='US')] for t in texts]
+    for workers in (None, 4):
+        result = ap.parse_many(texts, workers=workers, country='US')
+        assert [[str(a) for a in r] for r in result] == expected
+
+
+def test_shared_parser_thread_stress():
+    import threading
+    shared = parser.AddressParser(country='US')
+    streets = ["225 E. John Carpenter Freeway", "1111 3rd Street",
+               "55 Grant Ave", "8 Wall Street"]
+    texts = ["Lorem {0}, Irving, Texas 75062 ipsum ".format(street) * (i + 1)
+             for i, street in enumerate(streets)]
+    expected = [[a.as_dict() for a in shared.parse(t)] for t in texts]
+    errors = []
+
+    def worker(n):
+        for i in range(50):
+            idx = (n + i) % len(texts)
+            got = [a.as_dict() for a in shared.parse(texts[idx])]
+            if got != expected[idx]:
+                errors.append((idx, got))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_warmup():
+    ap.warmup(countries=['us', 'CA', 'GB'])
+    for country in ('US', 'CA', 'GB'):
+        assert country in parser._rules_registry
+    assert parser.compile_fragments('US') > 10
+    with pytest.raises(e.CountryDetectionMissing):
+        ap.warmup(countries=['TheMoon'])
+
+
+def test_parser_pickles_configuration_only():
+    ap = parser.AddressParser(country='us')
+    ap.parse("225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062")
+    dumped = pickle.dumps(ap)
+    assert len(dumped) < 200
+    assert b'street_number' not in dumped
+
+    restored = pickle.loads(dumped)
+    assert restored.country == 'US'
+    assert restored._compiled_rules is ap._compiled_rules
+    assert [a.as_dict() for a in restored.parse(
+        "xxx 225 E. John Carpenter Freeway, Irving, Texas 75062 xxx")] == \
+        [a.as_dict() for a in ap.parse(
+            "xxx 225 E. John Carpenter Freeway, Irving, Texas 75062 xxx")]
+
+
+@pytest.mark.parametrize("workers", [2, 3, 5])
+def test_parse_with_workers_equals_serial(workers):
+    ap = parser.AddressParser(country='US')
+    # keep pieces small so that many addresses cross piece boundaries
+    ap.max_address_length = 100
+    text = "Lorem ipsum 225 E. John Carpenter Freeway, Suite 1500 " +\
+        "Irving, Texas 75062 dolor 8 Wall Street, New York, NY 10005\n"
+    text *= 20
+    expected = [a.as_dict() for a in ap.parse(text)]
+    assert len(expected) == 40
+    assert [a.as_dict() for a in ap.parse(text, workers=workers)] == \
+        expected
+
+
+@pytest.mark.parametrize("country,text", [
+    ('US', "xxx 225 E. John Carpenter Freeway, Suite 1500 Irving, "
+           "Texas 75062 xxx 8 Wall Street, New York, NY 10005"),
+    ('CA', "xxx 33771 George Ferguson Way Abbotsford, BC V2S 2M5 xxx "
+           "1730 McPherson Crt. Unit 35, Pickering, ON L1W 3E6"),
+    ('GB', "xxx 32 London Bridge St, London SE1 9SG xxx "
+           "Flat 2, 9 Grand Parade, Brighton, BN2 9QB"),
+])
+def test_ascii_rules_find_the_same(country, text):
+    ap = parser.AddressParser(country=country)
+    clean = ap.normalize(text)
+    assert ap._rules_for(clean) is parser.load_ascii_rules(country)
+    expected = [(m.span(), m.groupdict())
+                for m in ap._compiled_rules.finditer(clean)]
+    assert len(expected) == 2
+    assert [(m.span(), m.groupdict())
+            for m in ap._rules_for(clean).finditer(clean)] == expected
+    # non-ASCII text keeps the unicode-aware rules
+    assert ap._rules_for(clean + u'\xe9') is ap._compiled_rules
+
+
+LETTER = """ACME Corp
+Box 1200 Main
+
+Street, New York, NY 10005
+
+Ship to:
+John Smith
+225 E. John Carpenter Freeway, Suite 1500
+Irving, Texas 75062
+
+Your order was shipped today to our branch at 8 Wall
+Street, New York, NY 10005.
+"""
+
+
+def test_layout_blocks():
+    from pyap import layout
+    assert layout.split_blocks(LETTER) == \
+        [(0, 23), (25, 51), (53, 134), (136, 216)]
+    lines = '\n'.join('line {0}'.format(i) for i in range(10))
+    blocks = layout.split_blocks(lines, max_lines=4, max_address_lines=2)
+    assert [lines[s:e].count('\n') + 1 for s, e in blocks] == [4, 4, 4]
+    assert blocks[0][0] == 0 and blocks[-1][1] == len(lines)
+    # windows share max_address_lines - 1 lines
+    assert [lines[s:e].split('\n')[0] for s, e in blocks] == \
+        ['line 0', 'line 3', 'line 6']
+
+
+def test_parse_with_layout():
+    plain = ap.parse(LETTER, country='US')
+    assert plain[0].full_address == '1200 Main, Street, New York, NY 10005'
+    found = ap.parse(LETTER, country='US', layout=True)
+    assert [a.full_address for a in found] == [
+        '225 E. John Carpenter Freeway, Suite 1500, Irving, Texas 75062',
+        '8 Wall, Street, New York, NY 10005']
+    # offsets point into the original text
+    assert LETTER[found[0].match_start:found[0].match_end] == \
+        '225 E. John Carpenter Freeway, Suite 1500\nIrving, Texas 75062'
+
+
+def test_layout_rejects_workers():
+    ap_us = parser.AddressParser(country='US', layout=True)
+    with pytest.raises(ValueError):
+        ap_us.parse(LETTER, workers=2)
+
+
+def test_layout_windows_keep_whole_addresses():
+    text = '\n'.join(['Line one', 'Line two', 'Line three',
+                      '225 E. John Carpenter Freeway', 'Suite 1500',
+                      'Irving, Texas 75062', 'Line seven'])
+    found = ap.parse(text, country='US', layout=True, max_block_lines=6)
+    assert [a.full_address for a in found] == \
+        ['225 E. John Carpenter Freeway, Suite 1500, Irving, Texas 75062']
+
+
+@pytest.mark.parametrize("country,text,kept", [
+    ('US', "8 Wall Street, New York, NY 10005 and "
+           "1200 Order Total Way Paid, NY 75062", 1),
+    ('CA', "1730 McPherson Crt. Unit 35, Pickering, ON L1W 3E6 and "
+           "1730 McPherson Crt. Unit 35, Pickering, QC L1W 3E6", 1),
+    ('GB', "10 Downing Street, London, SW1A 2AA and "
+           "10 Downing Street, London, AA1 2AA", 1),
+])
+def test_postal_check(country, text, kept):
+    loose = parser.AddressParser(country=country)
+    checked = parser.AddressParser(country=country, postal_check=True)
+    assert len(loose.parse(text)) == 2
+    found = checked.parse(text)
+    assert len(found) == kept
+    assert [a.as_dict() for a in found] == \
+        [a.as_dict() for a in loose.parse(text)][:1]
+    assert [a.as_dict() for a in checked.parse_stream([text])] == \
+        [a.as_dict() for a in found]
+    assert len(pickle.loads(pickle.dumps(checked)).parse(text)) == kept
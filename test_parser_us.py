@@ -191,6 +191,25 @@ def test_street_type(input, expected):
     execute_matching_test(input, expected, data_us.street_type)
 
 
+@pytest.mark.parametrize("keywords", [
+    data_us.street_type_list,
+    list(data_us.state_names.values()),
+    ['a', 'ab', 'abc', 'b.c', 'x y'],
+])
+def test_keyword_list_to_regex(keywords):
+    ''' keyword tries match exactly what a plain alternation does '''
+    trie = re.compile(r'(?:{0})\Z'.format(
+        data_us.keyword_list_to_regex(keywords)))
+    alternation = re.compile(r'(?:{0})\Z'.format(
+        '|'.join(re.escape(keyword) for keyword in keywords)), re.IGNORECASE)
+    words = set(keywords)
+    for keyword in keywords:
+        words.update([keyword.upper(), keyword.title(), keyword[:-1],
+                      keyword + 's', keyword[1:], keyword.replace(' ', '')])
+    for word in words:
+        assert bool(trie.match(word)) == bool(alternation.match(word)), word
+
+
 @pytest.mark.parametrize("input,expected", [
     # positive assertions
     ("floor 3 ", True),
@@ -470,6 +489,15 @@ def test_region1(input, expected):
     execute_matching_test(input, expected, data_us.region1)
 
 
+def test_region1_state_names():
+    ''' every state matches by abbreviation and by name '''
+    for abbreviation, name in data_us.state_names.items():
+        execute_matching_test(abbreviation, True, data_us.region1)
+        execute_matching_test(abbreviation.lower(), False, data_us.region1)
+        for spelling in (name, name.lower()):
+            execute_matching_test(spelling, True, data_us.region1)
+
+
 @pytest.mark.parametrize("input,expected", [
     # positive assertions
     ("USA", True),
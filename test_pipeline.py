@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+""" Test for staged parsing pipelines """
+
+import pytest
+import pyap as ap
+from pyap import parser
+from pyap import pipeline
+from pyap import exceptions as e
+
+TEXTS = [
+    "xxx 225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062 xxx",
+    "No address here",
+    "8 Wall Street, New York, NY 10005 and 55 Grant Ave, " +
+    "San Francisco, CA 94108",
+]
+
+
+def test_stages_compose_to_parse():
+    ap_us = parser.AddressParser(country='US')
+    for text in TEXTS:
+        result = ap_us.build(ap_us.extract(ap_us.scan(ap_us.normalize(text))))
+        assert [a.as_dict() for a in result] == \
+            [a.as_dict() for a in ap_us.parse(text)]
+
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_pipeline(backend):
+    ap_us = parser.AddressParser(country='US')
+    results = []
+    p = pipeline.Pipeline(pipeline.parser_stages(ap_us), maxsize=1,
+                          backend=backend)
+    stats = p.run(TEXTS * 3, lambda key, found: results.append((key, found)))
+
+    assert [key for key, _ in results] == list(range(9))
+    assert [[str(a) for a in found] for _, found in results] == \
+        [[str(a) for a in found] for found in ap.parse_many(TEXTS * 3,
+                                                            country='US')]
+    assert [s['stage'] for s in stats] == \
+        ['read', 'normalize', 'scan', 'extract', 'build', 'sink']
+    assert all(s['items'] == 9 for s in stats)
+
+
+def test_pipeline_stage_failure():
+    def broken(value):
+        raise ValueError('boom')
+
+    p = pipeline.Pipeline([('upper', str.upper), ('broken', broken)],
+                          maxsize=1)
+    with pytest.raises(e.PipelineError) as error:
+        p.run(['a', 'b', 'c'], lambda key, value: None)
+    assert 'broken' in str(error.value)
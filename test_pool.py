@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+""" Test for parser worker pools """
+
+import multiprocessing
+import pytest
+import pyap as ap
+from pyap import pool
+from pyap import exceptions as e
+
+US_ADDRESS = "xxx 225 E. John Carpenter Freeway, " +\
+    "Suite 1500 Irving, Texas 75062 xxx"
+CA_ADDRESS = "xxx 33771 George Ferguson Way Abbotsford, BC V2S 2M5 xxx"
+
+
+def as_strings(results):
+    return [[str(a) for a in addresses] for addresses in results]
+
+
+def test_parser_pool():
+    texts = [US_ADDRESS, "No address here", US_ADDRESS * 2]
+    with pool.ParserPool(countries=['us', 'CA'], workers=2) as p:
+        assert len(p.warmup_times) == 2
+        assert all(t >= 0 for t in p.warmup_times.values())
+
+        expected = as_strings(ap.parse_many(texts, country='US'))
+        assert as_strings(p.map(texts, chunksize=2)) == expected
+        # workers are reused across batches
+        assert as_strings(p.map(texts)) == expected
+
+        future = p.submit(CA_ADDRESS, country='ca')
+        assert as_strings([future.result()]) == \
+            as_strings([ap.parse(CA_ADDRESS, country='CA')])
+        assert p.queue_depth == 0
+
+
+def test_parser_pool_unknown_country():
+    with pool.ParserPool(countries=['US'], workers=1) as p:
+        with pytest.raises(ValueError):
+            p.submit(US_ADDRESS, country='GB')
+
+
+def test_parser_pool_shared_memory():
+    texts = [US_ADDRESS, u"No address — here", US_ADDRESS * 2, u""]
+    expected = []
+    for doc_id, addresses in enumerate(ap.parse_many(texts, country='US')):
+        for address in addresses:
+            fields = dict(address.as_dict())
+            expected.append((doc_id,
+                             fields.pop('match_start'),
+                             fields.pop('match_end'),
+                             fields))
+    with pool.ParserPool(countries=['US'], workers=2) as p:
+        assert p.parse_shared(texts, chunksize=1) == expected
+        assert p.queue_depth == 0
+
+
+def test_parser_pool_bad_options_fail_fast():
+    with pytest.raises(TypeError):
+        pool.ParserPool(countries=['US'], workers=1, country='US')
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='workers must inherit the patched module')
+def test_parser_pool_worker_start_failure(monkeypatch):
+    # the parent checks options fine, the workers fail to start
+    monkeypatch.setattr(pool, '_worker_parsers', None)
+    with pytest.raises(e.PoolStartFailed):
+        pool.ParserPool(countries=['US'], workers=2)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+""" Test for the postal code extractors """
+
+import pytest
+import pyap
+from pyap import canonical
+from pyap import postcodes
+from pyap import exceptions as e
+
+
+@pytest.mark.parametrize("country,text,expected", [
+    ('US', "Irving, Texas 75062 or 10005-1234.",
+     [(14, 19, '75062'), (23, 33, '10005-1234')]),
+    ('US', "not 123456, 555-12345, 12345-678, ab12345 or 4155551234",
+     []),
+    ('CA', "Ship to H2X1Y4 or (L1W 3E6)",
+     [(8, 14, 'H2X 1Y4'), (19, 26, 'L1W 3E6')]),
+    ('CA', "Ref XH2X1Y4 and H2X1Y42", []),
+    ('GB', "London SE1 9SG, sw1a2aa",
+     [(7, 14, 'SE1 9SG'), (16, 23, 'SW1A 2AA')]),
+])
+def test_find_postal_codes(country, text, expected):
+    assert postcodes.find_postal_codes(text, country) == expected
+    for start, end, code in expected:
+        assert canonical.normalize_postal_code(
+            text[start:end], country) == code
+
+
+def test_codes_agree_with_full_parsing():
+    text = ("8 Wall Street, New York, NY 10005\n"
+            "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062\n"
+            "call 10005 again")
+    extractor = postcodes.PostalCodeExtractor('us')
+    assert extractor.codes(text) == ['10005', '75062']
+    found = extractor.findall(text)
+    for address in pyap.parse(text, country='US'):
+        assert address.postal_code in [text[s:end] for s, end, _ in found]
+    # non-ASCII text uses the unicode-aware rules
+    assert extractor.findall(u'Qu\xe9bec ' + text)[0][2] == '10005'
+
+
+def test_unknown_country():
+    with pytest.raises(e.CountryDetectionMissing):
+        postcodes.PostalCodeExtractor('XX')
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+""" Test for compressed input readers """
+
+import bz2
+import gzip
+import lzma
+import zipfile
+import pytest
+from pyap import cli
+from pyap import readers
+
+ADDRESS = "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062"
+TEXT = "xxx {0} xxx\n8 Wall Street, New York, NY 10005\n".format(ADDRESS)
+
+
+@pytest.fixture
+def archives(tmp_path):
+    data = TEXT.encode('utf-8')
+    (tmp_path / 'plain.txt').write_bytes(data)
+    (tmp_path / 'doc.txt.gz').write_bytes(gzip.compress(data))
+    (tmp_path / 'doc.txt.bz2').write_bytes(bz2.compress(data))
+    (tmp_path / 'doc.txt.xz').write_bytes(lzma.compress(data))
+    with zipfile.ZipFile(str(tmp_path / 'drop.zip'), 'w') as archive:
+        archive.writestr('dir/', b'')
+        archive.writestr('dir/one.txt', data)
+        archive.writestr('two.txt.gz', gzip.compress(data))
+        archive.writestr('empty.txt', b'')
+    return tmp_path
+
+
+def test_members(archives):
+    assert readers.members(str(archives / 'doc.txt.gz')) == [None]
+    assert readers.members(str(archives / 'drop.zip')) == \
+        ['dir/one.txt', 'two.txt.gz', 'empty.txt']
+
+
+@pytest.mark.parametrize("name,member", [
+    ('plain.txt', None),
+    ('doc.txt.gz', None),
+    ('doc.txt.bz2', None),
+    ('doc.txt.xz', None),
+    ('drop.zip', 'dir/one.txt'),
+    ('drop.zip', 'two.txt.gz'),
+])
+def test_parse_document(archives, name, member):
+    found = readers.parse_document(str(archives / name), member,
+                                   chunk_size=5)
+    assert [a.full_address for a in found] == \
+        [ADDRESS, "8 Wall Street, New York, NY 10005"]
+    assert found[0].match_start == 4
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_parse_archives(archives, workers):
+    paths = [str(archives / 'doc.txt.gz'), str(archives / 'drop.zip')]
+    results = list(readers.parse_archives(paths, workers=workers))
+    assert [doc_id for doc_id, _ in results] == [
+        paths[0], paths[1] + '!dir/one.txt', paths[1] + '!two.txt.gz',
+        paths[1] + '!empty.txt']
+    assert [len(found) for _, found in results] == [2, 2, 2, 0]
+
+
+def test_cli_reads_archives(archives, capsys):
+    assert cli.main([str(archives / 'drop.zip'), '-w', '2']) == 0
+    out, err = capsys.readouterr()
+    assert out.count('!two.txt.gz') == 2
+    assert '3 documents, 4 addresses' in err
+
+
+def test_archives_are_opened_once(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / 'many.zip')
+    with zipfile.ZipFile(path, 'w') as archive:
+        for i in range(20):
+            archive.writestr('{0}.txt'.format(i), TEXT)
+    opened = []
+
+    class ZipFile(zipfile.ZipFile):
+        def __init__(self, *args, **kwargs):
+            opened.append(args[0])
+            super(ZipFile, self).__init__(*args, **kwargs)
+
+    monkeypatch.setattr(readers.zipfile, 'ZipFile', ZipFile)
+    assert len(list(readers.parse_archives([path]))) == 20
+    assert len(opened) == 1
+    assert cli.main([path, '-q']) == 0
+    assert capsys.readouterr()[0].count('many.zip!') == 40
+    assert len(opened) == 2
+    # workers keep the archive they read a member of open
+    assert readers.shared_archive(path) is readers.shared_archive(path)
+    assert len(opened) == 3
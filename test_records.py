@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+""" Test for record-oriented parsing """
+
+import gzip
+import json
+import pytest
+import pyap as ap
+from pyap import records
+
+LINES = [
+    "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062",
+    "",
+    "No address here",
+    " \t8 Wall Street, New York, NY 10005 , ",
+    "xxx 55 Grant Ave, San Francisco, CA 94108 and " +
+    "8 Wall Street, New York, NY 10005",
+]
+
+
+def as_dicts(results):
+    return [(record_id, [a.as_dict() for a in found])
+            for record_id, found in results]
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+def test_batches_equal_parse(batch_size):
+    rp = records.RecordParser(country='US', batch_size=batch_size)
+    assert as_dicts(rp.parse(enumerate(LINES))) == \
+        as_dicts((i, ap.parse(text, country='US'))
+                 for i, text in enumerate(LINES))
+
+
+def test_anchored():
+    rp = records.RecordParser(country='US', anchored=True)
+    found = dict(rp.parse(enumerate(LINES)))
+    assert [len(found[i]) for i in range(len(LINES))] == [1, 0, 0, 1, 0]
+    assert found[3][0].as_dict() == ap.parse(LINES[3], country='US')[0].\
+        as_dict()
+
+
+def test_record_containing_separator():
+    rp = records.RecordParser(country='US')
+    text = "8 Wall Street, New York, NY 10005\x00" + LINES[0]
+    assert [a.full_address for a in dict(rp.parse([(1, text)]))[1]] == \
+        [a.full_address for a in ap.parse(text, country='US')]
+
+
+def test_parse_files(tmp_path):
+    (tmp_path / 'a.txt').write_text('\n'.join(LINES) + '\n')
+    (tmp_path / 'a.csv').write_text(
+        'id,address\n' + ''.join('r{0},"{1}"\n'.format(i, line)
+                                 for i, line in enumerate(LINES)))
+    (tmp_path / 'a.jsonl.gz').write_bytes(gzip.compress(''.join(
+        json.dumps({'doc': {'text': line}, 'n': i}) + '\n'
+        for i, line in enumerate(LINES)).encode('utf-8')))
+    rp = records.RecordParser(country='US', batch_size=2)
+
+    counts = [(record_id, len(found)) for record_id, found in
+              rp.parse_file(str(tmp_path / 'a.txt'))]
+    assert counts == [(1, 1), (2, 0), (3, 0), (4, 1), (5, 2)]
+
+    counts = [(record_id, len(found)) for record_id, found in
+              rp.parse_file(str(tmp_path / 'a.csv'), field='address',
+                            id_field='id')]
+    assert counts == [('r0', 1), ('r1', 0), ('r2', 0), ('r3', 1), ('r4', 2)]
+
+    counts = [(record_id, len(found)) for record_id, found in
+              rp.parse_file(str(tmp_path / 'a.jsonl.gz'), field='doc.text',
+                            id_field='n')]
+    assert counts == [('0', 1), ('1', 0), ('2', 0), ('3', 1), ('4', 2)]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        list(records.iter_records([], format='xml'))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+""" Test for the searchable address index """
+
+import json
+import pytest
+import pyap
+from pyap import search
+from pyap import exceptions as e
+
+DOCUMENTS = [
+    ('a.txt', 'US', "8 Wall Street, New York, NY 10005"),
+    ('b.txt', 'US',
+     "225 E. John Carpenter Freeway, Suite 1500 Irving, Texas 75062"),
+    ('c.txt', 'US', "10 wall st., new york, New York 10005-1234"),
+    ('d.txt', 'GB', "10 Downing Street, London, SW1A 2AA"),
+    ('e.txt', 'CA', "1730 McPherson Crt. Unit 35, Pickering, ON L1W 3E6"),
+]
+
+
+def build():
+    builder = search.SearchIndexBuilder()
+    for document, country, text in DOCUMENTS:
+        for address in pyap.parse(text, country=country):
+            builder.add(document, address)
+    return builder
+
+
+def test_exact_and_prefix_queries():
+    index = build().build()
+    assert len(index) == 5
+    assert index.search(postal_code='10005') == ['a.txt', 'c.txt']
+    assert index.search(postal_code='10005-1234') == ['c.txt']
+    assert index.search(postal_code='1000', prefix=True) == ['a.txt', 'c.txt']
+    assert index.search(postal_code='sw1a', prefix=True) == ['d.txt']
+    assert index.search(street='Wall St') == ['a.txt', 'c.txt']
+    assert index.search(street='east john carpenter fwy') == ['b.txt']
+    assert index.search(street='McPherson Court', country='CA') == ['e.txt']
+    assert index.search(city='New York', region='new york') == \
+        ['a.txt', 'c.txt']
+    assert index.search(city='New York', postal_code='75062') == []
+    assert index.search(postal_code='9', prefix=True) == []
+    assert index.terms('postal_code', '100') == ['10005', '100051234']
+
+
+def test_saved_index_is_memory_mapped(tmpdir):
+    path = str(tmpdir.join('addresses.idx'))
+    build().save(path)
+    with search.SearchIndex.open(path) as index:
+        assert index.search(region='TX') == ['b.txt']
+        assert index.postings('city', 'PICKERING') == [4]
+        assert index.document(4) == 'e.txt'
+    tmpdir.join('empty.idx').write('')
+    tmpdir.join('addresses.idx.bad').write('not an index at all')
+    for name in ('empty.idx', 'addresses.idx.bad'):
+        with pytest.raises(e.SearchIndexInvalid):
+            search.SearchIndex.open(str(tmpdir.join(name)))
+
+
+def test_build_from_command_line_records(tmpdir):
+    lines = tmpdir.join('out.jsonl')
+    records = [
+        {'document': 'x', 'fields': {'postal_code': '75062', 'city': 'Irving',
+                                     'country_id': 'US'}},
+        {'document': 'y', 'start': 0, 'end': 10, 'full_address': '...'},
+        {'document': 'x', 'fields': {'postal_code': '75062',
+                                     'country_id': 'US'}},
+    ]
+    lines.write(''.join(json.dumps(record) + '\n' for record in records))
+    builder = search.SearchIndexBuilder()
+    builder.add_jsonl(str(lines))
+    index = builder.build()
+    assert len(index) == 2
+    assert index.search(postal_code='75062', city='irving') == ['x']